@@ -8,20 +8,77 @@ import pandas as pd
 import numpy as np
 from datetime import datetime
 import json
+import argparse
+
+from banco_resultados import ARQUIVO_BANCO, remover_banco, salvar_banco
+from cache_auditoria import (
+    LIMITE_CACHE_MB, PASTA_CACHE_AUDITORIA, acrescentar_cache, buscar_cache, chave_auditoria, guardar_cache, restaurar_arquivo
+)
+from motor_auditoria import (
+    AgregadosAuditoria, auditar_csv, auditar_incremental, carregar_agregados, carregar_base_incremental, carregar_plano,
+    carregar_resultados, colunas_auditoria, ler_csv, normalizar_categorias, normalizar_datas, normalizar_flags, pontuar_com_registro, pontuar_perfis,
+    salvar_agregados, salvar_instrumentacao, salvar_resultados, selecionar_top_k
+)
+
+ARQUIVO_ANONIMIZADO = 'data/raw/EXT_PESCADORES_ANONIMIZADO.csv'
+ARQUIVO_COMPLETO = 'data/processed/PESCADORES_AUDITORIA_COMPLETA.parquet'
+ARQUIVO_BASE_INCREMENTAL = 'data/processed/PESCADORES_AUDITORIA_BASE.parquet'
+ARQUIVO_RESULTADOS = 'data/processed/PESCADORES_AUDITORIA_50.parquet'
+ARQUIVO_AGREGADOS = 'data/processed/PESCADORES_AUDITORIA_AGREGADOS.json'
+ARQUIVO_INSTRUMENTACAO = 'data/processed/PESCADORES_AUDITORIA_CRITERIOS.json'
+
+# Informações do registro mantidas nos resultados
+COLUNAS_REGISTRO = [
+    'cpf', 'nome_pescador', 'rgp', 'municipio', 'uf', 'st_situacao_pescador',
+    'nivel_escolaridade', 'fonte_renda_faixa_renda', 'renda_brasil_ou_bolsa_familia',
+    'st_possui_outra_fonte_renda', 'st_filiado_instituicao'
+]
+
+def descartar_banco_antigo(banco_salvo):
+    """Apagar o banco SQLite de uma execução anterior quando esta não gravou o seu"""
+    # O painel filtra pelo banco sempre que ele existe: um banco antigo mostraria outros resultados
+    if not banco_salvo and remover_banco(ARQUIVO_BANCO):
+        print(f"🧹 Banco de resultados de uma execução anterior removido: {ARQUIVO_BANCO}")
 
 class AuditoriaIA:
     """Classe para análise inteligente de dados do RGP"""
 
-    def __init__(self):
+    def __init__(self, arquivo=ARQUIVO_ANONIMIZADO, instrumentar=False):
+        self.arquivo = arquivo
+        self.instrumentar = instrumentar
         self.df = None
         self.df_analisado = None
+        self.agregados = None
+        self.instrumentacao = carregar_plano().instrumentacao() if instrumentar else None
+        self.resultados_completos = None
+        self.arquivos_cache = None
+        self.chave_cache = None
 
     def carregar_dados_anonimizados(self):
         """Carregar dados do arquivo anonimizado"""
         try:
             print("🔄 Carregando dados anonimizados...")
-            self.df = pd.read_csv('data/raw/EXT_PESCADORES_ANONIMIZADO.csv')
+            # Só as colunas lidas pelas regras e mantidas nos resultados
+            self.df = ler_csv(self.arquivo, colunas_auditoria(COLUNAS_REGISTRO))
             print(f"✅ {len(self.df)} registros carregados")
+
+            # Datas convertidas uma única vez, com formatos explícitos
+            self.df, datas_invalidas = normalizar_datas(self.df)
+            for coluna, total in datas_invalidas.items():
+                if total:
+                    print(f"⚠️ {total} valor(es) de data inválido(s) em '{coluna}' foram ignorados")
+
+            # Flags SIM/NAO, TRUE/FALSE decodificadas uma única vez
+            self.df, flags_invalidas = normalizar_flags(self.df)
+            for coluna, total in flags_invalidas.items():
+                if total:
+                    print(f"⚠️ {total} valor(es) não reconhecido(s) como SIM/NÃO em '{coluna}'")
+
+            # Colunas de domínio fechado como category (regras comparam códigos inteiros)
+            self.df, fora_dominio = normalizar_categorias(self.df)
+            for coluna, total in fora_dominio.items():
+                if total:
+                    print(f"ℹ️ {total} registro(s) com valor fora do domínio conhecido em '{coluna}'")
             return True
         except Exception as e:
             print(f"❌ Erro ao carregar dados: {str(e)}")
@@ -29,95 +86,12 @@ class AuditoriaIA:
 
     def analisar_perfil(self, row):
         """Analisar perfil de pescador e detectar inconsistências"""
-        risco_score = 0
-        justificativas = []
-
-        # Converter tipos de dados
-        try:
-            # Valores booleanos
-            beneficios = str(row.get('renda_brasil_ou_bolsa_familia', 'False')).upper() == 'TRUE'
-            seguro = str(row.get('seguro_defeso', 'False')).upper() == 'TRUE'
-            outra_renda = str(row.get('st_possui_outra_fonte_renda', 'False')).upper() == 'TRUE'
-            internet = str(row.get('possui_internet', 'False')).upper() == 'TRUE'
-            celular = str(row.get('possui_celular', 'False')).upper() == 'TRUE'
-            filiado = str(row.get('st_filiado_instituicao', 'False')).upper() == 'TRUE'
-
-            # Valores categóricos
-            escolaridade = str(row.get('nivel_escolaridade', '')).strip()
-            residencia = str(row.get('tipo_residencia', '')).strip()
-            faixa_renda = str(row.get('fonte_renda_faixa_renda', '')).strip()
-            municipio = str(row.get('municipio', '')).strip()
-            nome_municipio = str(row.get('nome_municipio', '')).strip()
-
-            # Verificar produtos protegidos
-            produtos_protegidos = []
-            if str(row.get('produto_quelonio', '')).upper() == 'SIM':
-                produtos_protegidos.append('Quelônios')
-            if str(row.get('produto_repteis', '')).upper() == 'SIM':
-                produtos_protegidos.append('Répteis')
-
-            # 1. Benefícios vs Outra Renda (30 pontos)
-            if beneficios and outra_renda:
-                risco_score += 30
-                justificativas.append("Recebe benefício social mas declara outra fonte de renda")
-
-            # 2. Escolaridade vs Faixa Renda (20 pontos)
-            if (escolaridade in ['ENSINO MEDIO COMPLETO', 'ENSINO MEDIO INCOMPLETO', 'ENSINO SUPERIOR'] and
-                faixa_renda == 'Menor que R$1.045,00 por mês'):
-                risco_score += 20
-                justificativas.append("Alta escolaridade com renda muito baixa para atividade")
-
-            # 3. Tecnologia vs Renda (15 pontos)
-            if (internet and celular and residencia == 'PROPRIA' and
-                faixa_renda in ['Menor que R$1.045,00 por mês', 'De R$1.045,00 a R$2.000,00']):
-                risco_score += 15
-                justificativas.append("Acesso a tecnologia com residência própria incompatível com renda baixa")
-
-            # 4. Filiação Institucional (10 pontos)
-            if not filiado:
-                risco_score += 10
-                justificativas.append("Não é filiado a instituição de pesca")
-
-            # 5. Produtos Protegidos (5 pontos)
-            if produtos_protegidos:
-                risco_score += 5
-                justificativas.append(f"Pesca de produtos protegidos: {', '.join(produtos_protegidos)}")
-
-            # 6. Localização vs Área Pesca (10 pontos)
-            if municipio and nome_municipio and municipio != nome_municipio and municipio.strip() and nome_municipio.strip():
-                risco_score += 10
-                justificativas.append(f"Endereço ({municipio}) diferente de área de pesca ({nome_municipio})")
-
-            # 7. Análise Temporal (Idade vs Tempo) - Simplificada
-            try:
-                if pd.notna(row.get('dt_primeiro_rgp')) and pd.notna(row.get('dt_nascimento')):
-                    ano_registro = pd.to_datetime(row['dt_primeiro_rgp']).year
-                    ano_nascimento = pd.to_datetime(row['dt_nascimento']).year
-
-                    if ano_registro < 2000:  # Registro muito antigo
-                        idade_estimada = 2025 - ano_nascimento
-                        tempo_registro = 2025 - ano_registro
-                        if idade_estimada < tempo_registro - 5:
-                            risco_score += 25
-                            justificativas.append("Inconsistência entre idade e tempo de registro no RGP")
-            except:
-                pass  # Ignorar erros de data
-
-        except Exception as e:
-            justificativas.append(f"Erro na análise: {str(e)}")
-
-        # Determinar categoria de risco
-        if risco_score >= 60:
-            risco_categoria = 'ALTO'
-        elif risco_score >= 30:
-            risco_categoria = 'MEDIO'
-        else:
-            risco_categoria = 'BAIXO'
-
+        plano = carregar_plano()
+        resultado = pontuar_perfis(row.to_frame().T, plano, self.instrumentacao).iloc[0]
         return {
-            'risco_score': risco_score,
-            'risco_categoria': risco_categoria,
-            'justificativas': justificativas
+            'risco_score': int(resultado['risco_score']),
+            'risco_categoria': resultado['risco_categoria'],
+            'justificativas': plano.descrever(resultado['criterios_bits'], row)
         }
 
     def executar_auditoria(self):
@@ -127,47 +101,136 @@ class AuditoriaIA:
 
         print("🔍 Executando auditoria inteligente...")
 
-        resultados = []
+        # Avaliar todos os critérios de uma vez (colunas inteiras)
+        resultados = pontuar_com_registro(self.df, COLUNAS_REGISTRO, instrumentacao=self.instrumentacao)
+
+        print(f"✅ Auditoria completa! {len(resultados)} perfis analisados")
+        self.agregados = AgregadosAuditoria.de_resultados(resultados)
+        self.resultados_completos = resultados
+
+        # Selecionar os 50 casos mais suspeitos (maior score; empates pelo RGP)
+        print("🎯 SELECIONANDO OS 50 CASOS MAIS SUSPEITOS...")
+        self.df_analisado = selecionar_top_k(resultados, 50)
+        self.df_analisado = self.df_analisado.reset_index(drop=True)
+        print(f"✅ Selecionados {len(self.df_analisado)} casos de maior risco")
+
+        return self.df_analisado
+
+    def executar_auditoria_em_blocos(self, tamanho_bloco, workers=1, arquivo_saida=ARQUIVO_COMPLETO):
+        """Executar auditoria lendo o arquivo em blocos (memória limitada pelo tamanho do bloco)"""
+        print(f"🔍 Executando auditoria em blocos de {tamanho_bloco} registros ({workers} processo(s))...")
+
+        try:
+            resumo = auditar_csv(self.arquivo, arquivo_saida, COLUNAS_REGISTRO, tamanho_bloco, workers, k=50,
+                                 instrumentar=self.instrumentar)
+        except Exception as e:
+            print(f"❌ Erro ao processar blocos: {str(e)}")
+            return None
+
+        if resumo['melhores'] is None:
+            return None
+
+        print(f"✅ Auditoria completa! {resumo['total']} perfis analisados")
+        print(f"✅ Resultados completos salvos em: {arquivo_saida}")
+
+        self.agregados = resumo['agregados']
+        if self.instrumentar:
+            self.instrumentacao = resumo['instrumentacao']
+        self.resultados_completos = arquivo_saida
+        self.df_analisado = resumo['melhores'].reset_index(drop=True)
+        print(f"✅ Selecionados {len(self.df_analisado)} casos de maior risco")
+
+        return self.df_analisado
+
+    def executar_auditoria_incremental(self, arquivo_base=ARQUIVO_BASE_INCREMENTAL):
+        """Executar auditoria repontuando só os registros novos ou alterados desde a última execução"""
+        if self.df is None:
+            return None
 
-        for idx, row in self.df.iterrows():
-            if idx % 10 == 0:
-                print(f"  Processando registro {idx + 1}/{len(self.df)}...")
+        print("🔍 Executando auditoria incremental...")
 
-            resultado = self.analisar_perfil(row)
+        try:
+            anteriores = carregar_base_incremental(arquivo_base)
+            resultados, repontuados = auditar_incremental(self.df, anteriores, COLUNAS_REGISTRO,
+                                                          instrumentacao=self.instrumentacao)
+        except Exception as e:
+            print(f"❌ Erro na auditoria incremental: {str(e)}")
+            return None
 
-            # Adicionar informações do registro
-            resultado.update({
-                'cpf': row.get('cpf', ''),
-                'nome_pescador': row.get('nome_pescador', ''),
-                'rgp': row.get('rgp', ''),
-                'municipio': row.get('municipio', ''),
-                'uf': row.get('uf', ''),
-                'st_situacao_pescador': row.get('st_situacao_pescador', ''),
-                'nivel_escolaridade': row.get('nivel_escolaridade', ''),
-                'fonte_renda_faixa_renda': row.get('fonte_renda_faixa_renda', ''),
-                'renda_brasil_ou_bolsa_familia': row.get('renda_brasil_ou_bolsa_familia', ''),
-                'st_possui_outra_fonte_renda': row.get('st_possui_outra_fonte_renda', ''),
-                'st_filiado_instituicao': row.get('st_filiado_instituicao', '')
-            })
+        if anteriores is None:
+            print("ℹ️ Nenhuma auditoria anterior encontrada: todos os registros foram pontuados")
+        print(f"♻️ {len(resultados) - repontuados} reaproveitados, {repontuados} novos ou alterados repontuados")
 
-            resultados.append(resultado)
+        # Base completa (com impressões) para a próxima execução
+        salvar_resultados(resultados, arquivo_base)
+        print(f"✅ Base incremental salva em: {arquivo_base}")
 
-        self.df_analisado = pd.DataFrame(resultados)
-        print(f"✅ Auditoria completa! {len(self.df_analisado)} perfis analisados")
+        resultados = resultados.drop(columns=['chave_registro', 'impressao'])
+        self.agregados = AgregadosAuditoria.de_resultados(resultados)
+        self.resultados_completos = resultados
 
-        # Selecionar os 50 casos mais suspeitos (maior score)
         print("🎯 SELECIONANDO OS 50 CASOS MAIS SUSPEITOS...")
-        self.df_analisado = self.df_analisado.sort_values('risco_score', ascending=False).head(50)
-        self.df_analisado = self.df_analisado.reset_index(drop=True)
+        self.df_analisado = selecionar_top_k(resultados, 50).reset_index(drop=True)
         print(f"✅ Selecionados {len(self.df_analisado)} casos de maior risco")
 
         return self.df_analisado
 
+    def carregar_do_cache(self, chave, em_blocos=False, sqlite=False):
+        """Usar as saídas de uma execução anterior com o mesmo extrato, regras e código"""
+        arquivos = buscar_cache(chave)
+        if arquivos is None:
+            return False
+        # A entrada precisa ter tudo o que esta execução grava
+        if em_blocos and 'completa' not in arquivos:
+            return False
+        if sqlite and not {'banco', 'completa'} & set(arquivos):
+            return False
+
+        try:
+            self.df_analisado = carregar_resultados(arquivos['resultados'])
+            self.agregados = carregar_agregados(arquivos['agregados'])
+        except Exception as e:
+            print(f"⚠️ Entrada do cache ilegível, refazendo a auditoria: {str(e)}")
+            return False
+
+        self.arquivos_cache = arquivos
+        self.chave_cache = chave
+        print("♻️ Extrato, regras e código iguais aos de uma execução anterior: resultados do cache")
+        print(f"✅ {self.agregados.total} perfis analisados (cache)")
+        return True
+
+    def restaurar_do_cache(self, sqlite=False, limite_mb=LIMITE_CACHE_MB):
+        """Copiar as saídas guardadas no cache para os arquivos da camada processada"""
+        destinos = {
+            'resultados': ARQUIVO_RESULTADOS,
+            'agregados': ARQUIVO_AGREGADOS,
+            'completa': ARQUIVO_COMPLETO,
+            'banco': ARQUIVO_BANCO if sqlite else None,
+        }
+        for nome, origem in self.arquivos_cache.items():
+            if destinos.get(nome):
+                restaurar_arquivo(origem, destinos[nome])
+                print(f"✅ {destinos[nome]} restaurado do cache")
+
+        # Banco pedido sem banco no cache: montar a partir dos resultados completos e guardar
+        banco_salvo = sqlite and 'banco' in self.arquivos_cache
+        if sqlite and not banco_salvo:
+            try:
+                banco_salvo = salvar_banco(ARQUIVO_COMPLETO, ARQUIVO_BANCO)
+                if banco_salvo:
+                    print(f"✅ Banco de resultados salvo em: {ARQUIVO_BANCO}")
+                    acrescentar_cache(self.chave_cache, 'banco', ARQUIVO_BANCO, limite_mb=limite_mb)
+            except Exception as e:
+                print(f"❌ Erro ao gravar banco SQLite: {str(e)}")
+        descartar_banco_antigo(banco_salvo)
+
     def gerar_relatorio(self):
         """Gerar relatório da auditoria"""
         if self.df_analisado is None:
             return None
 
+        plano = carregar_plano()
+
         print("\n📊 GERANDO RELATÓRIO DE AUDITORIA")
         print("=" * 50)
 
@@ -189,21 +252,21 @@ class AuditoriaIA:
         print(f"\n🚨 TOP {min(10, alto_risco)} CASOS DE ALTO RISCO:")
         print("-" * 50)
 
-        casos_alto_risco = self.df_analisado[self.df_analisado['risco_categoria'] == 'ALTO'].nlargest(10, 'risco_score')
+        casos_alto_risco = selecionar_top_k(self.df_analisado[self.df_analisado['risco_categoria'] == 'ALTO'], 10)
 
         for i, (_, caso) in enumerate(casos_alto_risco.iterrows(), 1):
             print(f"\n{i}. {caso['nome_pescador']}")
             print(f"   RGP: {caso['rgp']} | Score: {caso['risco_score']}/100")
             print(f"   Local: {caso['municipio']}-{caso['uf']} | Situação: {caso['st_situacao_pescador']}")
             print(f"   Justificativas:")
-            for justificativa in caso['justificativas']:
+            for justificativa in plano.descrever(caso['criterios_bits'], caso):
                 print(f"     • {justificativa}")
 
         # Análise por estado
         print(f"\n🗺️ ANÁLISE POR ESTADO:")
         print("-" * 50)
 
-        uf_risco = self.df_analisado.groupby('uf').agg({
+        uf_risco = self.df_analisado.groupby('uf', observed=True).agg({
             'risco_score': ['mean', 'count'],
             'risco_categoria': lambda x: (x == 'ALTO').sum()
         }).round(2)
@@ -214,36 +277,97 @@ class AuditoriaIA:
         for uf, row in uf_risco.iterrows():
             print(f"   {uf}: Score {row['Score Médio']:.1f} ({row['Total']} casos, {row['Casos Alto Risco']} alto risco)")
 
+        # Análise por estado considerando todos os registros auditados
+        if self.agregados is not None and self.agregados.por_uf is not None:
+            print(f"\n🗺️ ANÁLISE POR ESTADO (TODOS OS REGISTROS):")
+            print("-" * 50)
+
+            por_uf = self.agregados.por_uf
+            uf_total = por_uf.assign(media=por_uf['soma_score'] / por_uf['total'])
+            uf_total = uf_total.sort_values('media', ascending=False, kind='stable')
+
+            for uf, row in uf_total.iterrows():
+                print(f"   {uf}: Score {row['media']:.1f} ({int(row['total'])} casos, {int(row['alto'])} alto risco)")
+
         # Principais alertas
         print(f"\n📋 PRINCIPAIS ALERTAS:")
         print("-" * 50)
 
-        todas_justificativas = []
-        for justificativas in self.df_analisado['justificativas']:
-            todas_justificativas.extend(justificativas)
-
-        if todas_justificativas:
-            justificativas_count = pd.Series(todas_justificativas).value_counts().head(5)
+        alertas_count = plano.contar_criterios(self.df_analisado['criterios_bits']).head(5)
 
-            for alerta, count in justificativas_count.items():
+        for alerta, count in alertas_count.items():
+            if count > 0:
                 print(f"   • {alerta}: {count} ocorrências")
 
+        # Desempenho de cada critério (só com --instrumentar)
+        if self.instrumentacao is not None and self.instrumentacao.avaliados.any():
+            print(f"\n⏱️ DESEMPENHO POR CRITÉRIO (registros avaliados nesta execução):")
+            print("-" * 50)
+
+            for criterio, row in self.instrumentacao.tabela().iterrows():
+                print(f"   • {criterio}: {row['segundos']:.3f}s ({row['percentual_tempo']:.1f}% do tempo), "
+                      f"{int(row['avaliados'])} avaliados, {int(row['disparos'])} disparos "
+                      f"({row['percentual_disparos']:.1f}%)")
+
         return self.df_analisado
 
 def main():
     """Função principal"""
+    parser = argparse.ArgumentParser(description="Audit-IA - Análise de 50 Resultados")
+    parser.add_argument("--arquivo", default=ARQUIVO_ANONIMIZADO, help="CSV de entrada (extrato anonimizado)")
+    parser.add_argument("--bloco", type=int, default=0,
+                        help="Ler o CSV em blocos de N registros (0 = arquivo inteiro em memória)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Processos em paralelo; cada um audita uma partição do CSV (usa blocos)")
+    parser.add_argument("--incremental", action="store_true",
+                        help=f"Repontuar só registros novos ou alterados desde a última execução ({ARQUIVO_BASE_INCREMENTAL})")
+    parser.add_argument("--sqlite", action="store_true",
+                        help=f"Gravar também todos os resultados em SQLite indexado ({ARQUIVO_BANCO}) para filtros no painel")
+    parser.add_argument("--sem-cache", action="store_true",
+                        help="Refazer a auditoria mesmo que o mesmo extrato já tenha sido auditado com as mesmas regras")
+    parser.add_argument("--instrumentar", action="store_true",
+                        help=f"Medir tempo, registros avaliados e disparos de cada critério ({ARQUIVO_INSTRUMENTACAO}); "
+                             "não reaproveita o cache")
+    parser.add_argument("--cache-max-mb", type=int, default=LIMITE_CACHE_MB,
+                        help=f"Tamanho máximo do cache de saídas em MB ({PASTA_CACHE_AUDITORIA})")
+    args = parser.parse_args()
+
     print("🔍 AUDIT-IA - ANÁLISE DE 50 RESULTADOS")
     print("=" * 50)
 
     # Inicializar auditoria
-    auditoria = AuditoriaIA()
+    auditoria = AuditoriaIA(args.arquivo, instrumentar=args.instrumentar)
 
-    # Carregar dados
-    if not auditoria.carregar_dados_anonimizados():
-        return False
+    if args.incremental and (args.bloco > 0 or args.workers > 1):
+        print("⚠️ --incremental roda em memória; --bloco e --workers serão ignorados")
+    em_blocos = not args.incremental and (args.bloco > 0 or args.workers > 1)
 
-    # Executar auditoria
-    resultados = auditoria.executar_auditoria()
+    # Cache de saídas: mesmo extrato, mesmas regras e mesmo código (a incremental tem reaproveitamento próprio)
+    chave = None
+    if not args.incremental and not args.sem_cache:
+        try:
+            chave = chave_auditoria(args.arquivo, COLUNAS_REGISTRO, 50)
+        except OSError as e:
+            print(f"⚠️ Cache desativado: {str(e)}")
+
+    # Com --instrumentar a auditoria sempre roda (as saídas ainda são guardadas no cache)
+    em_cache = chave is not None and not args.instrumentar and auditoria.carregar_do_cache(chave, em_blocos, args.sqlite)
+
+    if em_cache:
+        resultados = auditoria.df_analisado
+    elif em_blocos:
+        # Executar auditoria em blocos (e partições paralelas)
+        resultados = auditoria.executar_auditoria_em_blocos(args.bloco or 100_000, args.workers)
+    else:
+        # Carregar dados
+        if not auditoria.carregar_dados_anonimizados():
+            return False
+
+        # Executar auditoria
+        if args.incremental:
+            resultados = auditoria.executar_auditoria_incremental()
+        else:
+            resultados = auditoria.executar_auditoria()
 
     if resultados is None:
         return False
@@ -254,14 +378,54 @@ def main():
     # Salvar resultados
     print(f"\n💾 SALVANDO RESULTADOS...")
 
-    # Salvar CSV completo
-    arquivo_csv = f"data/processed/PESCADORES_AUDITORIA_50_RESULTADOS_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-    resultados.to_csv(arquivo_csv, index=False)
-    print(f"✅ Resultados salvos em: {arquivo_csv}")
-
-    # Salvar versão principal
-    resultados.to_csv('data/processed/PESCADORES_AUDITORIA_50.csv', index=False)
-    print(f"✅ Versão principal salva em: data/processed/PESCADORES_AUDITORIA_50.csv")
+    if em_cache:
+        # Saídas copiadas da entrada do cache, sem nova cópia histórica
+        auditoria.restaurar_do_cache(args.sqlite, args.cache_max_mb)
+    else:
+        if chave is None:
+            # Sem cache, cada execução guarda sua cópia histórica
+            arquivo_historico = f"data/processed/PESCADORES_AUDITORIA_50_RESULTADOS_{datetime.now().strftime('%Y%m%d_%H%M%S')}.parquet"
+            salvar_resultados(resultados, arquivo_historico)
+            print(f"✅ Resultados salvos em: {arquivo_historico}")
+
+        # Salvar versão principal (Parquet tipado)
+        salvar_resultados(resultados, ARQUIVO_RESULTADOS)
+        print(f"✅ Versão principal salva em: {ARQUIVO_RESULTADOS}")
+
+        # Agregados de todos os registros auditados (painéis não recalculam nada)
+        if auditoria.agregados is not None:
+            salvar_agregados(auditoria.agregados, ARQUIVO_AGREGADOS)
+            print(f"✅ Agregados salvos em: {ARQUIVO_AGREGADOS}")
+
+        # Tempo, avaliados e disparos de cada critério (lidos pela página Critérios de Auditoria)
+        if auditoria.instrumentacao is not None:
+            salvar_instrumentacao(auditoria.instrumentacao, ARQUIVO_INSTRUMENTACAO)
+            print(f"✅ Instrumentação dos critérios salva em: {ARQUIVO_INSTRUMENTACAO}")
+
+        # Banco SQLite opcional com todos os registros auditados (filtros e paginação por consulta)
+        banco_salvo = False
+        if args.sqlite and auditoria.resultados_completos is not None:
+            try:
+                banco_salvo = salvar_banco(auditoria.resultados_completos, ARQUIVO_BANCO)
+                if banco_salvo:
+                    print(f"✅ Banco de resultados salvo em: {ARQUIVO_BANCO}")
+            except Exception as e:
+                print(f"❌ Erro ao gravar banco SQLite: {str(e)}")
+        descartar_banco_antigo(banco_salvo)
+
+        if chave is not None:
+            arquivos = {'resultados': ARQUIVO_RESULTADOS, 'agregados': ARQUIVO_AGREGADOS}
+            if em_blocos:
+                arquivos['completa'] = ARQUIVO_COMPLETO
+            if banco_salvo:
+                arquivos['banco'] = ARQUIVO_BANCO
+            try:
+                removidas = guardar_cache(chave, arquivos, limite_mb=args.cache_max_mb)
+                print(f"✅ Saídas guardadas no cache: {PASTA_CACHE_AUDITORIA / chave[:12]}...")
+                if removidas:
+                    print(f"🧹 {removidas} entrada(s) antiga(s) removida(s) do cache (limite {args.cache_max_mb} MB)")
+            except OSError as e:
+                print(f"⚠️ Não foi possível guardar as saídas no cache: {str(e)}")
 
     print(f"\n🎉 ANÁLISE CONCLUÍDA COM SUCESSO!")
     print(f"🌐 Para visualizar os resultados: streamlit run audit_app_corrigido.py")
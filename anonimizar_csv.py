@@ -1,54 +1,165 @@
+"""
+🔒 Audit-IA - Anonimização do Extrato
+Mascara (ou pseudonimiza com chave) CPF e nome do EXT_PESCADORES.csv em blocos, com partições
+paralelas (saída CSV ou Parquet)
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from pathlib import Path
+
 import pandas as pd
-import re
-
-def mascarar_cpf(cpf):
-    """Aplica máscara ao CPF, mantendo apenas os 3 primeiros dígitos"""
-    if pd.isna(cpf) or cpf == '':
-        return cpf
-    cpf_str = str(cpf).strip()
-    if len(cpf_str) >= 3:
-        return cpf_str[:3] + '*' * (len(cpf_str) - 3)
-    return '*' * len(cpf_str)
-
-def mascarar_nome(nome):
-    """Aplica máscara ao nome, mantendo apenas a primeira letra de cada palavra"""
-    if pd.isna(nome) or nome == '':
-        return nome
-    nome_str = str(nome).strip()
-    palavras = nome_str.split()
-    
-    # Mantém a primeira letra de cada palavra e mascara o resto
-    palavras_mascaradas = []
-    for palavra in palavras:
-        if len(palavra) > 1:
-            palavras_mascaradas.append(palavra[0] + '*' * (len(palavra) - 1))
-        else:
-            palavras_mascaradas.append(palavra)
-    
-    return ' '.join(palavras_mascaradas)
-
-# Ler o arquivo CSV
-print("Lendo arquivo CSV...")
-df = pd.read_csv('/root/IA/claude/mapa-pesqbrasil/data/raw/EXT_PESCADORES.csv')
-
-print(f"Total de registros: {len(df)}")
-
-# Criar uma cópia para não modificar o original
-df_anonimizado = df.copy()
-
-# Aplicar máscaras
-print("Aplicando máscaras ao CPF...")
-df_anonimizado['cpf'] = df_anonimizado['cpf'].apply(mascarar_cpf)
-
-print("Aplicando máscaras ao nome...")
-df_anonimizado['nome_pescador'] = df_anonimizado['nome_pescador'].apply(mascarar_nome)
-
-# Salvar o arquivo anonimizado
-output_path = '/root/IA/claude/mapa-pesqbrasil/data/raw/EXT_PESCADORES_ANONIMIZADO.csv'
-print(f"Salvando arquivo anonimizado em: {output_path}")
-df_anonimizado.to_csv(output_path, index=False)
-
-print("✓ Anonimização concluída!")
-print(f"\nExemplos de dados anonimizados:")
-print("\nPrimeiros 5 registros:")
-print(df_anonimizado[['cpf', 'nome_pescador']].head())
+import pyarrow.parquet as pq
+
+from mascaramento import VARIAVEL_CHAVE_TOKEN, carregar_chave_token, mascarar_cpf, mascarar_nome, tokenizar
+from motor_auditoria import EscritorExtrato, dividir_csv, juntar_partes, ler_csv_em_blocos
+
+ARQUIVO_ORIGINAL = 'data/raw/EXT_PESCADORES.csv'
+ARQUIVO_ANONIMIZADO = 'data/raw/EXT_PESCADORES_ANONIMIZADO.csv'
+TAMANHO_BLOCO = 100_000
+
+# Coluna -> máscara aplicada (as demais colunas passam sem alteração)
+MASCARAS = {
+    'cpf': mascarar_cpf,
+    'nome_pescador': mascarar_nome,
+}
+
+# Coluna -> domínio do token no modo token (mesmo valor e chave, mesmo token em qualquer arquivo)
+DOMINIOS_TOKEN = {
+    'cpf': 'cpf',
+    'nome_pescador': 'nome',
+}
+
+
+def anonimizar_bloco(df, chave=None):
+    """Mascarar as colunas sensíveis de um bloco do extrato (ou tokenizá-las, se houver chave)"""
+    for coluna, mascarar in MASCARAS.items():
+        if coluna in df.columns:
+            df[coluna] = tokenizar(df[coluna], chave, DOMINIOS_TOKEN[coluna]) if chave else mascarar(df[coluna])
+    return df
+
+
+def anonimizar_particao(entrada, faixa, saida, tamanho_bloco=TAMANHO_BLOCO, formato='csv', cabecalho=True,
+                        chave=None):
+    """Anonimizar uma partição do extrato bloco a bloco (devolve o número de registros)"""
+    colunas = list(pd.read_csv(entrada, nrows=0).columns)
+    escritor = EscritorExtrato(saida, colunas, formato, cabecalho)
+    total = 0
+    try:
+        # Tudo lido como texto: CPFs com zero à esquerda e demais colunas saem como entraram
+        for bloco in ler_csv_em_blocos(entrada, tamanho_bloco=tamanho_bloco, faixa=faixa,
+                                       dtype=str, keep_default_na=False):
+            escritor.escrever(anonimizar_bloco(bloco, chave))
+            total += len(bloco)
+    finally:
+        escritor.fechar()
+    return total
+
+
+def anonimizar_csv(entrada=ARQUIVO_ORIGINAL, saida=ARQUIVO_ANONIMIZADO, tamanho_bloco=TAMANHO_BLOCO, workers=1,
+                   chave=None):
+    """Anonimizar o extrato em partições paralelas; saída idêntica para qualquer número de workers
+
+    O formato sai da extensão de `saida` (.parquet ou CSV). Com `chave`, CPF e nome viram
+    tokens estáveis (ver mascaramento.tokenizar) em vez de máscaras. O arquivo final só é
+    substituído quando todas as partes terminaram.
+    """
+    formato = 'parquet' if Path(saida).suffix == '.parquet' else 'csv'
+    temporario = f"{saida}.{os.getpid()}.tmp"
+    faixas = dividir_csv(entrada, max(1, workers))
+
+    if len(faixas) <= 1:
+        # Uma única partição: gravar direto, sem processos extras
+        try:
+            total = anonimizar_particao(entrada, faixas[0] if faixas else None, temporario, tamanho_bloco, formato,
+                                        chave=chave)
+            os.replace(temporario, saida)
+        finally:
+            if os.path.exists(temporario):
+                os.remove(temporario)
+        return total
+
+    # A primeira parte leva o cabeçalho do CSV; as demais são emendadas depois dela
+    partes = [f"{temporario}.parte{i:03d}" for i in range(len(faixas))]
+    cabecalhos = [i == 0 for i in range(len(faixas))]
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            total = sum(executor.map(
+                anonimizar_particao,
+                repeat(entrada), faixas, partes, repeat(tamanho_bloco), repeat(formato), cabecalhos, repeat(chave)
+            ))
+        juntar_partes(partes, temporario, formato)
+        os.replace(temporario, saida)
+    finally:
+        for arquivo in partes + [temporario]:
+            if os.path.exists(arquivo):
+                os.remove(arquivo)
+    return total
+
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description="Audit-IA - Anonimização do extrato de pescadores")
+    parser.add_argument("--entrada", default=ARQUIVO_ORIGINAL, help="CSV original do extrato")
+    parser.add_argument("--saida", default=ARQUIVO_ANONIMIZADO,
+                        help="Arquivo anonimizado (.csv, ou .parquet para gravar direto em Parquet)")
+    parser.add_argument("--parquet", action="store_true",
+                        help="Gravar em Parquet (troca a extensão da saída para .parquet)")
+    parser.add_argument("--bloco", type=int, default=TAMANHO_BLOCO,
+                        help="Registros por bloco (limita a memória de cada processo)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Processos em paralelo; cada um anonimiza uma partição do CSV")
+    parser.add_argument("--modo", choices=['mascara', 'token'], default='mascara',
+                        help="mascara: mantém só o início de CPF e nome; token: pseudônimo estável com chave, "
+                             "que permite junções e deduplicação entre arquivos")
+    parser.add_argument("--chave-arquivo",
+                        help=f"Arquivo com a chave secreta do modo token (padrão: variável {VARIAVEL_CHAVE_TOKEN})")
+    args = parser.parse_args()
+
+    saida = str(Path(args.saida).with_suffix('.parquet')) if args.parquet else args.saida
+
+    chave = None
+    if args.modo == 'token':
+        try:
+            chave = carregar_chave_token(args.chave_arquivo)
+        except (OSError, ValueError) as e:
+            print(f"❌ {str(e)}")
+            return False
+
+    print("🔒 AUDIT-IA - ANONIMIZAÇÃO DO EXTRATO")
+    print("=" * 50)
+    print(f"📂 Entrada: {args.entrada}")
+    print(f"⚙️ Modo {args.modo}, blocos de {args.bloco} registros, {args.workers} processo(s)")
+
+    inicio = time.perf_counter()
+    try:
+        total = anonimizar_csv(args.entrada, saida, args.bloco, args.workers, chave)
+    except FileNotFoundError:
+        print(f"❌ Arquivo não encontrado: {args.entrada}")
+        return False
+    except Exception as e:
+        print(f"❌ Erro na anonimização: {str(e)}")
+        return False
+
+    print(f"✅ {total} registros anonimizados em {time.perf_counter() - inicio:.1f}s")
+    print(f"💾 Arquivo anonimizado salvo em: {saida}")
+
+    if Path(saida).suffix == '.parquet':
+        arquivo = pq.ParquetFile(saida)
+        colunas = [c for c in MASCARAS if c in arquivo.schema_arrow.names]
+        lote = next(arquivo.iter_batches(batch_size=5, columns=colunas), None)
+        exemplos = lote.to_pandas() if lote is not None else pd.DataFrame(columns=colunas)
+    else:
+        exemplos = pd.read_csv(saida, usecols=lambda c: c in MASCARAS, dtype=str, nrows=5)
+    print("\n📋 Primeiros 5 registros:")
+    print(exemplos)
+
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
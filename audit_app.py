@@ -16,6 +16,12 @@ import re
 from pathlib import Path
 import json
 
+from graficos import contar_categorias, faixas_score, figura_distribuicao_risco, figura_histograma_score
+from motor_auditoria import (
+    CAMINHO_CONFIG, COLUNAS_DATA, carregar_plano, colunas_auditoria, ler_csv, normalizar_categorias, normalizar_datas, normalizar_flags, pontuar_perfis,
+    selecionar_top_k
+)
+
 # Configuração da página
 st.set_page_config(
     page_title="🔍 Audit-IA - Auditoria Inteligente do RGP",
@@ -55,6 +61,12 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+# Colunas do registro exibidas junto com os resultados
+COLUNAS_REGISTRO = [
+    'cpf', 'nome_pescador', 'rgp', 'municipio', 'uf', 'fonte_renda_faixa_renda',
+    'renda_brasil_ou_bolsa_familia', 'st_possui_outra_fonte_renda', 'st_situacao_pescador'
+]
+
 class AuditIA:
     """Classe principal para a Auditoria Inteligente do RGP"""
 
@@ -65,35 +77,23 @@ class AuditIA:
     def carregar_dados(self, arquivo):
         """Carregar e processar dados do arquivo CSV"""
         try:
-            # Ler CSV
-            df = pd.read_csv(arquivo)
-
-            # Converter colunas de data
-            colunas_data = ['dt_nascimento', 'data_criacao_pescador', 'dt_primeiro_rgp']
-            for col in colunas_data:
-                if col in df.columns:
-                    df[col] = pd.to_datetime(df[col], errors='coerce')
-
-            # Calcular idade
-            if 'dt_nascimento' in df.columns:
-                hoje = datetime.now()
-                df['idade'] = df['dt_nascimento'].apply(
-                    lambda x: hoje.year - x.year if pd.notna(x) else np.nan
-                )
+            # Ler CSV (só as colunas usadas pela auditoria e pelas datas)
+            df = ler_csv(arquivo, colunas_auditoria(COLUNAS_REGISTRO + COLUNAS_DATA))
 
-            # Padronizar valores booleanos
-            colunas_bool = [
-                'renda_brasil_ou_bolsa_familia', 'seguro_defeso',
-                'st_possui_outra_fonte_renda', 'possui_internet',
-                'possui_celular', 'st_filiado_instituicao'
-            ]
+            # Converter colunas de data (formatos explícitos) e calcular idade/tempo de registro
+            df, datas_invalidas = normalizar_datas(df)
+            for col, total in datas_invalidas.items():
+                if total:
+                    st.warning(f"⚠️ {total} valor(es) de data inválido(s) em '{col}' foram ignorados")
 
-            for col in colunas_bool:
-                if col in df.columns:
-                    df[col] = df[col].astype(str).str.upper().map({
-                        'TRUE': True, 'VERDADEIRO': True, 'SIM': True,
-                        'FALSE': False, 'FALSO': False, 'NÃO': False, 'NAO': False
-                    })
+            # Colunas de domínio fechado (UF, escolaridade, renda...) como category
+            df, _ = normalizar_categorias(df)
+
+            # Padronizar valores booleanos (flags SIM/NAO, TRUE/FALSE e produto_*)
+            df, flags_invalidas = normalizar_flags(df)
+            for col, total in flags_invalidas.items():
+                if total:
+                    st.warning(f"⚠️ {total} valor(es) não reconhecido(s) como SIM/NÃO em '{col}'")
 
             self.df = df
             return True
@@ -104,71 +104,12 @@ class AuditIA:
 
     def analisar_perfil(self, row):
         """Analisar perfil de pescador e detectar inconsistências"""
-        risco_score = 0
-        justificativas = []
-
-        # 1. Análise de Idade vs Tempo de Registro
-        if pd.notna(row.get('idade')) and pd.notna(row.get('dt_primeiro_rgp')):
-            idade_registro = datetime.now().year - row['dt_primeiro_rgp'].year
-            if row['idade'] < idade_registro - 2:
-                risco_score += 25
-                justificativas.append(f"Idade inconsistente: {row['idade']} anos mas registro há {idade_registro} anos")
-
-        # 2. Análise de Benefícios Sociais vs Outra Renda
-        if (row.get('renda_brasil_ou_bolsa_familia') == True and
-            row.get('st_possui_outra_fonte_renda') == True):
-            risco_score += 30
-            justificativas.append("Recebe benefício social mas declara outra fonte de renda")
-
-        # 3. Análise de Escolaridade vs Tipo de Renda
-        if (row.get('nivel_escolaridade') in ['ENSINO MEDIO COMPLETO', 'ENSINO SUPERIOR'] and
-            row.get('fonte_renda_faixa_renda') == 'Menor que R$1.045,00 por mês'):
-            risco_score += 20
-            justificativas.append("Alta escolaridade com renda muito baixa para atividade de pesca")
-
-        # 4. Análise de Tecnologia vs Declaração
-        if (row.get('possui_internet') == True and
-            row.get('possui_celular') == True and
-            row.get('tipo_residencia') == 'PROPRIA' and
-            row.get('fonte_renda_faixa_renda') in ['Menor que R$1.045,00 por mês']):
-            risco_score += 15
-            justificativas.append("Acesso a tecnologia e residência própria incompatíveis com renda declarada")
-
-        # 5. Análise de Filiação Institucional
-        if row.get('st_filiado_instituicao') == False:
-            risco_score += 10
-            justificativas.append("Não é filiado a instituição de pesca")
-
-        # 6. Análise de Produtos vs Ambiente
-        produtos_raros = []
-        if row.get('produto_quelonio') == 'SIM':
-            produtos_raros.append('Quelônios')
-        if row.get('produto_repteis') == 'SIM':
-            produtos_raros.append('Répteis')
-
-        if produtos_raros:
-            risco_score += 5
-            justificativas.append(f"Pesca de produtos protegidos/raros: {', '.join(produtos_raros)}")
-
-        # 7. Análise de Endereço vs Local de Pesca
-        if (pd.notna(row.get('municipio')) and
-            pd.notna(row.get('nome_municipio')) and
-            row['municipio'] != row['nome_municipio']):
-            risco_score += 10
-            justificativas.append(f"Endereço ({row['municipio']}) diferente de área de pesca ({row['nome_municipio']})")
-
-        # Determinar categoria de risco
-        if risco_score >= 60:
-            risco_categoria = 'ALTO'
-        elif risco_score >= 30:
-            risco_categoria = 'MEDIO'
-        else:
-            risco_categoria = 'BAIXO'
-
+        plano = carregar_plano()
+        resultado = pontuar_perfis(row.to_frame().T, plano).iloc[0]
         return {
-            'risco_score': risco_score,
-            'risco_categoria': risco_categoria,
-            'justificativas': justificativas
+            'risco_score': int(resultado['risco_score']),
+            'risco_categoria': resultado['risco_categoria'],
+            'justificativas': plano.descrever(resultado['criterios_bits'], row)
         }
 
     def executar_auditoria(self):
@@ -178,32 +119,24 @@ class AuditIA:
 
         st.info("🔄 Executando análise de auditoria inteligente...")
 
-        resultados = []
-
-        # Iterar sobre as linhas (limitar para demonstração)
-        for idx, row in self.df.iterrows():
-            if idx >= 1000:  # Limitar para 1000 registros como no projeto
-                break
-
-            resultado = self.analisar_perfil(row)
+        # Limitar para 1000 registros como no projeto
+        df = self.df.head(1000)
 
-            # Adicionar informações básicas
-            resultado.update({
-                'cpf': row.get('cpf', ''),
-                'nome_pescador': row.get('nome_pescador', ''),
-                'rgp': row.get('rgp', ''),
-                'municipio': row.get('municipio', ''),
-                'uf': row.get('uf', ''),
-                'idade': row.get('idade', ''),
-                'fonte_renda_faixa_renda': row.get('fonte_renda_faixa_renda', ''),
-                'renda_brasil_ou_bolsa_familia': row.get('renda_brasil_ou_bolsa_familia', False),
-                'st_possui_outra_fonte_renda': row.get('st_possui_outra_fonte_renda', False),
-                'st_situacao_pescador': row.get('st_situacao_pescador', '')
-            })
+        # Avaliar todos os critérios de uma vez (colunas inteiras)
+        resultados = pontuar_perfis(df)
 
-            resultados.append(resultado)
+        # Adicionar informações básicas
+        padroes = {
+            'cpf': '', 'nome_pescador': '', 'rgp': '', 'municipio': '', 'uf': '',
+            'idade': '', 'fonte_renda_faixa_renda': '', 'renda_brasil_ou_bolsa_familia': False,
+            'st_possui_outra_fonte_renda': False, 'st_situacao_pescador': ''
+        }
+        for coluna in carregar_plano().colunas_justificativa:
+            padroes.setdefault(coluna, '')
+        for coluna, padrao in padroes.items():
+            resultados[coluna] = df[coluna] if coluna in df.columns else padrao
 
-        self.df_analisado = pd.DataFrame(resultos)
+        self.df_analisado = resultados.reset_index(drop=True)
         return self.df_analisado
 
 # Inicializar aplicação
@@ -250,39 +183,23 @@ if pagina == "🏠 Dashboard":
 
         st.markdown("---")
 
-        # Gráficos
+        # Gráficos (contagens e faixas em NumPy; a figura leva só esses números)
         col1, col2 = st.columns(2)
 
         with col1:
             # Distribuição de Risco
-            fig_risco = px.pie(
-                df,
-                names='risco_categoria',
-                title='🎯 Distribuição de Risco',
-                color='risco_categoria',
-                color_discrete_map={
-                    'ALTO': '#ff4444',
-                    'MEDIO': '#ffaa00',
-                    'BAIXO': '#00c851'
-                }
-            )
+            fig_risco = figura_distribuicao_risco(contar_categorias(df['risco_categoria']))
             st.plotly_chart(fig_risco, use_container_width=True)
 
         with col2:
             # Score de Risco
-            fig_score = px.histogram(
-                df,
-                x='risco_score',
-                title='📈 Distribuição do Score de Risco',
-                nbins=20,
-                color_discrete_sequence=['#2196f3']
-            )
+            fig_score = figura_histograma_score(*faixas_score(df['risco_score']))
             st.plotly_chart(fig_score, use_container_width=True)
 
         # Top 10 casos de alto risco
         st.markdown("### 🚨 Casos de Alto Risco")
 
-        casos_alto_risco = df[df['risco_categoria'] == 'ALTO'].nlargest(10, 'risco_score')
+        casos_alto_risco = selecionar_top_k(df[df['risco_categoria'] == 'ALTO'], 10)
 
         for _, caso in casos_alto_risco.iterrows():
             with st.container():
@@ -294,7 +211,7 @@ if pagina == "🏠 Dashboard":
                     <ul>
                 """, unsafe_allow_html=True)
 
-                for justificativa in caso['justificativas']:
+                for justificativa in carregar_plano().descrever(caso['criterios_bits'], caso):
                     st.markdown(f"<li>{justificativa}</li>", unsafe_allow_html=True)
 
                 st.markdown("</ul></div>", unsafe_allow_html=True)
@@ -435,7 +352,7 @@ elif pagina == "🔍 Análise de Auditoria":
                     st.metric("🔴 % Risco Alto", f"{percentual_alto:.1f}%")
 
                 with col4:
-                    casos_com_justificativa = len(df_resultados[df_resultados['justificativas'].apply(len) > 0])
+                    casos_com_justificativa = int((df_resultados['criterios_bits'] != 0).sum())
                     st.metric("📝 Casos Alerta", casos_com_justificativa)
 
                 # Tabela de resultados
@@ -522,7 +439,7 @@ elif pagina == "📊 Relatórios":
         # Análise por Estado
         st.markdown("### 🗺️ Análise por Estado")
 
-        uf_risco = df.groupby('uf').agg({
+        uf_risco = df.groupby('uf', observed=True).agg({
             'risco_score': ['mean', 'count'],
             'risco_categoria': lambda x: (x == 'ALTO').sum()
         }).round(2)
@@ -535,7 +452,7 @@ elif pagina == "📊 Relatórios":
         # Mapa de calor por UF
         if len(uf_risco) > 0:
             fig_mapa = px.choropleth_mapbox(
-                df.groupby(['uf']).agg({'risco_score': 'mean'}).reset_index(),
+                df.groupby(['uf'], observed=True).agg({'risco_score': 'mean'}).reset_index(),
                 locations='uf',
                 geojson='https://raw.githubusercontent.com/codeforamerica/click_that_hood/master/public/data/brazil-states.geojson',
                 featureidkey='properties.sigla',
@@ -581,12 +498,10 @@ elif pagina == "📊 Relatórios":
         # Principais Justificativas
         st.markdown("### 🚨 Principais Alertas")
 
-        todas_justificativas = []
-        for justificativas in df['justificativas']:
-            todas_justificativas.extend(justificativas)
+        justificativas_count = carregar_plano().contar_criterios(df['criterios_bits']).head(10)
+        justificativas_count = justificativas_count[justificativas_count > 0]
 
-        if todas_justificativas:
-            justificativas_count = pd.Series(todas_justificativas).value_counts().head(10)
+        if len(justificativas_count) > 0:
 
             fig_alertas = px.bar(
                 x=justificativas_count.values,
@@ -616,7 +531,7 @@ elif pagina == "📊 Relatórios":
         if len(beneficio_renda_conflito) > 0:
             insights.append(f"⚠️ **Conflito de Benefícios**: {len(beneficio_renda_conflito)} casos recebem benefícios mas declaram outra renda")
 
-        media_score_uf = df.groupby('uf')['risco_score'].mean()
+        media_score_uf = df.groupby('uf', observed=True)['risco_score'].mean()
         uf_max_risco = media_score_uf.idxmax()
         insights.append(f"🗺️ **Estado de Maior Risco**: {uf_max_risco} com score médio de {media_score_uf.max():.1f}")
 
@@ -630,19 +545,12 @@ elif pagina == "⚙️ Configurações":
 
     st.markdown("### 🎛️ Parâmetros de Análise")
 
-    # Pesos para análise (simulação)
+    plano = carregar_plano()
+
+    # Pesos lidos do plano de regras (models/config.json)
     with st.expander("⚖️ Pesos dos Critérios de Análise"):
-        st.markdown("""
-        **Configurações dos pesos para cálculo do score de risco:**
-
-        - **Idade vs Tempo de Registro**: 25 pontos
-        - **Benefícios vs Outra Renda**: 30 pontos
-        - **Escolaridade vs Renda**: 20 pontos
-        - **Tecnologia vs Declaração**: 15 pontos
-        - **Filiação Institucional**: 10 pontos
-        - **Produtos Protegidos**: 5 pontos
-        - **Endereço vs Área Pesca**: 10 pontos
-        """)
+        linhas_pesos = "\n".join(f"- **{regra.titulo}**: {regra.peso} pontos" for regra in plano.regras)
+        st.markdown("**Configurações dos pesos para cálculo do score de risco:**\n\n" + linhas_pesos)
 
     st.markdown("### 📊 Limiares de Classificação")
 
@@ -651,7 +559,7 @@ elif pagina == "⚙️ Configurações":
             "Limiar para Risco Alto:",
             min_value=40,
             max_value=80,
-            value=60,
+            value=plano.limiar_alto,
             help="Score mínimo para classificar como risco alto"
         )
 
@@ -659,7 +567,7 @@ elif pagina == "⚙️ Configurações":
             "Limiar para Risco Médio:",
             min_value=20,
             max_value=60,
-            value=30,
+            value=plano.limiar_medio,
             help="Score mínimo para classificar como risco médio"
         )
 
@@ -672,24 +580,15 @@ elif pagina == "⚙️ Configurações":
 
     st.markdown("### 💾 Exportar Configurações")
 
-    config = {
-        "pesos": {
-            "idade_vs_tempo": 25,
-            "beneficios_vs_renda": 30,
-            "escolaridade_vs_renda": 20,
-            "tecnologia_vs_declaracao": 15,
-            "filiacao_institucional": 10,
-            "produtos_protegidos": 5,
-            "endereco_vs_area_pesca": 10
-        },
-        "limiares": {
-            "risco_alto": limiar_alto,
-            "risco_medio": limiar_medio
-        }
-    }
+    with open(CAMINHO_CONFIG, encoding='utf-8') as f:
+        config = json.load(f)
+
+    config.setdefault("parametros", {})
+    config["parametros"]["threshold_risco_alto"] = limiar_alto
+    config["parametros"]["threshold_risco_medio"] = limiar_medio
 
     if st.button("📥 Download Configurações"):
-        config_json = json.dumps(config, indent=2)
+        config_json = json.dumps(config, indent=2, ensure_ascii=False)
         st.download_button(
             label="💾 Baixar config.json",
             data=config_json,
@@ -8,6 +8,11 @@ import pandas as pd
 import plotly.express as px
 from datetime import datetime
 
+from cache_resultados import resultados_compartilhados, versao_resultados
+from graficos import graficos_risco
+
+ARQUIVO_RESULTADOS = 'data/processed/PESCADORES_AUDITORIA_IA.parquet'
+
 # Configuração da página
 st.set_page_config(
     page_title="🔍 Audit-IA - Resultados da Auditoria",
@@ -41,11 +46,10 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # Carregar dados
-@st.cache_data
 def carregar_dados():
-    """Carregar dados já analisados"""
+    """Carregar dados já analisados (cache compartilhado entre sessões)"""
     try:
-        return pd.read_csv('data/processed/PESCADORES_AUDITORIA_IA.csv')
+        return resultados_compartilhados(ARQUIVO_RESULTADOS)
     except Exception as e:
         st.error(f"Erro ao carregar dados: {str(e)}")
         return None
@@ -92,33 +96,18 @@ if pagina == "📊 Dashboard":
 
         st.markdown("---")
 
-        # Gráficos
+        # Gráficos (contagens em NumPy; figuras montadas uma vez por versão dos resultados)
+        fig_risco, fig_score = graficos_risco(
+            versao_resultados(ARQUIVO_RESULTADOS), df['IA_Categoria_Risco'], df['IA_Score_Risco']
+        )
         col1, col2 = st.columns(2)
 
         with col1:
             # Distribuição de Risco
-            fig_risco = px.pie(
-                df,
-                names='IA_Categoria_Risco',
-                title='🎯 Distribuição de Risco',
-                color='IA_Categoria_Risco',
-                color_discrete_map={
-                    'ALTO': '#ff4444',
-                    'MEDIO': '#ffaa00',
-                    'BAIXO': '#00c851'
-                }
-            )
             st.plotly_chart(fig_risco, use_container_width=True)
 
         with col2:
             # Score de Risco
-            fig_score = px.histogram(
-                df,
-                x='IA_Score_Risco',
-                title='📈 Distribuição do Score de Risco',
-                nbins=20,
-                color_discrete_sequence=['#2196f3']
-            )
             st.plotly_chart(fig_score, use_container_width=True)
 
         # Resumo Estatístico
@@ -251,7 +240,7 @@ elif pagina == "📋 Relatórios Detalhados":
         st.markdown("---")
         st.markdown("### 🗺️ Análise por Estado")
 
-        uf_risco = df.groupby('uf').agg({
+        uf_risco = df.groupby('uf', observed=True).agg({
             'IA_Score_Risco': ['mean', 'count'],
             'IA_Categoria_Risco': lambda x: (x == 'ALTO').sum()
         }).round(2)
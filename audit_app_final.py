@@ -8,7 +8,100 @@ import pandas as pd
 import plotly.express as px
 from datetime import datetime
 import numpy as np
-import os
+from pathlib import Path
+
+from banco_resultados import ARQUIVO_BANCO, consultar_resultados, resumo_filtrado
+from cache_resultados import resultados_compartilhados, versao_resultados
+from graficos import graficos_agregados
+from motor_auditoria import (
+    AgregadosAuditoria, carregar_agregados, carregar_instrumentacao, carregar_plano, faltam_mascaras,
+    mascarar_resultados, selecionar_top_k
+)
+
+ARQUIVO_RESULTADOS = 'data/processed/PESCADORES_AUDITORIA_50.parquet'
+ARQUIVO_AGREGADOS = 'data/processed/PESCADORES_AUDITORIA_AGREGADOS.json'
+ARQUIVO_INSTRUMENTACAO = 'data/processed/PESCADORES_AUDITORIA_CRITERIOS.json'
+TAMANHO_PAGINA = 100
+
+# Severidade de cada critério pelo peso (maior peso primeiro) e seu ícone na tabela de critérios
+SEVERIDADES_PESO = [(25, 'ALTO'), (20, 'MÉDIO'), (0, 'BAIXO')]
+ICONES_SEVERIDADE = {'ALTO': '🔴', 'MÉDIO': '🟡', 'BAIXO': '🟢'}
+
+# Textos explicativos dos critérios conhecidos, pelo nome da regra; peso, condições e severidade
+# vêm sempre do config.json (regras sem texto aqui aparecem com o título e as condições)
+TEXTOS_CRITERIOS = {
+    'beneficios_vs_renda': {
+        'icone': "🏆",
+        'descricao': "Recebe benefícios sociais mas declara outra renda",
+        'detecta': "Pescadores que recebem benefícios sociais (Bolsa Família, Renda Brasil) mas declaram "
+                   "possuir outra fonte de renda",
+        'justificativa': "Potencial fraude em programas sociais - pessoa que declara ser beneficiária de programa "
+                         "de transferência de renda para famílias de baixa renda mas informa possuir outra fonte de renda.",
+        'notas': ["Foco principal de fiscalização", "Impacto financeiro direto", "Fraude evidente quando presente"],
+    },
+    'escolaridade_vs_renda': {
+        'icone': "🎓",
+        'descricao': "Alta escolaridade com renda muito baixa",
+        'detecta': "Pescadores com alta escolaridade (Ensino Médio ou Superior) que declaram renda muito baixa",
+        'justificativa': "Incompatibilidade entre qualificação educacional e renda declarada. Pessoas com ensino "
+                         "médio ou superior geralmente têm acesso a oportunidades melhores, tornando suspeita uma "
+                         "renda tão baixa para atividade de pesca.",
+        'notas': ["Requer verificação detalhada", "Pode indicar necessidade de capacitação",
+                  "Contexto socioeconômico relevante"],
+    },
+    'tecnologia_vs_declaracoes': {
+        'icone': "📱",
+        'descricao': "Acesso a tecnologia com renda incompatível",
+        'detecta': "Pescadores com acesso a tecnologia e residência própria, mas com renda muito baixa",
+        'justificativa': "O acesso a serviços de tecnologia custa dinheiro, e possuir residência própria indica "
+                         "maior estabilidade financeira. A combinação com renda muito baixa gera inconsistência "
+                         "socioeconômica.",
+        'notas': ["Acesso tecnológico cada vez mais comum", "Pode não indicar fraude necessariamente",
+                  "Requer contexto adicional para avaliação"],
+    },
+    'filiacao_institucional': {
+        'icone': "🏢",
+        'descricao': "Não é filiado a instituição de pesca",
+        'detecta': "Pescadores que não são filiados a colônias ou associações de pesca",
+        'justificativa': "A filiação institucional é obrigatória para muitos benefícios e representa formalização "
+                         "da atividade pesqueira. Não ser filiado pode indicar informalidade ou irregularidade.",
+        'notas': ["Essencial para regularização", "Impacto na formalização", "Facilmente corrigível"],
+    },
+    'produtos_protegidos': {
+        'icone': "🐢",
+        'descricao': "Pesca de espécies protegidas",
+        'detecta': "Pescadores que declaram pescar espécies protegidas",
+        'justificativa': "A pesca de espécies protegidas é regulamentada e geralmente proibida. Pescadores que "
+                         "declaram capturar esses animais podem estar em situação irregular ou desconhecer a legislação.",
+        'notas': ["Boa consciência ambiental", "Educação predominante", "Raros em nossa amostra"],
+    },
+    'endereco_vs_area_pesca': {
+        'icone': "📍",
+        'descricao': "Endereço diferente da área de pesca",
+        'detecta': "Inconsistência entre endereço residencial e área de pesca declarada",
+        'justificativa': "Pescadores geralmente atuam próximo de onde residem. Grande distância entre residência "
+                         "e área de pesca pode indicar inconsistência logística ou informação falsa.",
+        'notas': ["Pode ser diferença de grafia", "Contexto logístico relevante", "Verificação manual recomendada"],
+    },
+    'idade_vs_tempo': {
+        'icone': "📅",
+        'descricao': "Tempo de RGP maior que idade do pescador",
+        'detecta': "Inconsistência entre idade e tempo de registro no RGP",
+        'justificativa': "É impossível que um pescador tenha RGP há mais tempo que sua própria idade. Indica erro "
+                         "nos dados ou possível fraude no registro.",
+        'notas': ["Impossibilidade lógica", "Erro de dados graves", "Fraude evidente quando presente"],
+        'limitacao': "Muitos registros com datas incompletas na amostra",
+    },
+}
+PRIORIDADES_SEVERIDADE = {'ALTO': 'Alta', 'MÉDIO': 'Média', 'BAIXO': 'Baixa'}
+
+# Ordenações da tabela de resultados (coluna ordenada; a ordem natural do score é decrescente)
+ORDENACOES = {
+    'Score': 'risco_score',
+    'UF': 'uf',
+    'Município': 'municipio',
+    'RGP': 'rgp',
+}
 
 # Configuração da página
 st.set_page_config(
@@ -52,6 +145,7 @@ st.markdown("""
 def gerar_dados_simulados():
     """Gera dados simulados para demonstração"""
     np.random.seed(42)  # Para resultados consistentes
+    plano = carregar_plano()
 
     dados = []
     estados = ['PA', 'MA', 'AP', 'AM', 'RR', 'CE', 'PI', 'AC', 'RO', 'TO', 'BA', 'PE', 'AL', 'SE', 'RN']
@@ -94,17 +188,17 @@ def gerar_dados_simulados():
         else:
             categoria = 'ALTO'
 
-        justificativas = []
+        criterios_bits = 0
         if score >= 20:
             if escolaridade in ['ENSINO MEDIO COMPLETO', 'ENSINO SUPERIOR'] and renda == 'Menor que R$1.045,00 por mês':
-                justificativas.append('Alta escolaridade com renda muito baixa para atividade')
+                criterios_bits |= plano.bit('escolaridade_vs_renda')
         if score >= 10 and np.random.random() < 0.5:
-            justificativas.append('Não é filiado a instituição de pesca')
+            criterios_bits |= plano.bit('filiacao_institucional')
 
         dados.append({
             'risco_score': score,
             'risco_categoria': categoria,
-            'justificativas': justificativas,
+            'criterios_bits': criterios_bits,
             'cpf': cpf,
             'nome_pescador': nome,
             'rgp': rgp,
@@ -121,7 +215,8 @@ def gerar_dados_simulados():
     # Garantir pelo menos 1 caso de alto risco
     dados[0]['risco_score'] = 60
     dados[0]['risco_categoria'] = 'ALTO'
-    dados[0]['justificativas'] = ['Recebe benefício social mas declara outra fonte de renda', 'Alta escolaridade com renda muito baixa para atividade', 'Endereço diferente de área de pesca']
+    dados[0]['criterios_bits'] = (plano.bit('beneficios_vs_renda') | plano.bit('escolaridade_vs_renda') |
+                                  plano.bit('endereco_vs_area_pesca'))
     dados[0]['nivel_escolaridade'] = 'ENSINO MEDIO COMPLETO'
     dados[0]['fonte_renda_faixa_renda'] = 'Menor que R$1.045,00 por mês'
     dados[0]['renda_brasil_ou_bolsa_familia'] = True
@@ -131,70 +226,148 @@ def gerar_dados_simulados():
     # Ordenar por score (maior para menor)
     dados.sort(key=lambda x: x['risco_score'], reverse=True)
 
-    return pd.DataFrame(dados)
-
-def mascarar_texto(texto):
-    """Função para mascarar texto sensível"""
-    if pd.isna(texto) or texto == '':
-        return 'Não informado'
-
-    texto_str = str(texto)
-
-    # Se já estiver mascarado (tem asteriscos ou XXXX), manter como está
-    if '*' in texto_str or 'XXXX' in texto_str:
-        return texto_str
-
-    # Mascarar CPF: manter primeiros 3 e últimos 2 digitos (prioridade alta)
-    if len(texto_str) == 11 and texto_str.isdigit():
-        return f"{texto_str[:3]}***{texto_str[-2:]}"
+    df = pd.DataFrame(dados)
+    df['criterios_bits'] = df['criterios_bits'].astype(plano.dtype_bits)
+    return mascarar_resultados(df)
 
-    # Mascarar RGP: formato MAPA000XXXX0000, APPA000XXXX0000, etc.
-    if any(texto_str.startswith(prefixo) for prefixo in ['MAPA', 'APPA', 'AMPA', 'PAPA', 'CEPA', 'SEPA', 'SPPA', 'RSPA']) and len(texto_str) >= 14:
-        prefixo = texto_str[:8]  # MAPA000, APPA000, etc.
-        meio = 'XXXX'
-        finais = texto_str[-4:]  # últimos 4 dígitos
-        return f"{prefixo}{meio}{finais}"
+def ordenar_posicoes(df, posicoes, coluna, invertida=False):
+    """Rótulos das linhas filtradas na ordem pedida, ordenando só as colunas-chave
 
-    # Mascarar nome: manter primeira e última letra
-    if len(texto_str) > 2:
-        primeira = texto_str[0]
-        ultima = texto_str[-1]
-        meio = '*' * (len(texto_str) - 2)
-        return f"{primeira}{meio}{ultima}"
-
-    return texto_str
+    Por score, a ordem é a do Top-K (maior score, desempate pelo RGP); nas demais colunas,
+    crescente. invertida devolve a ordem contrária.
+    """
+    if coluna == 'risco_score':
+        chaves = df[[c for c in ('risco_score', 'rgp') if c in df.columns]].iloc[posicoes]
+        rotulos = selecionar_top_k(chaves, len(chaves)).index
+    else:
+        rotulos = df[coluna].iloc[posicoes].sort_values(kind='stable', na_position='last').index
+    return rotulos[::-1] if invertida else rotulos
 
 # Carregar dados
 @st.cache_data
+def carregar_dados_simulados():
+    """Gerar (uma vez) os dados simulados de demonstração"""
+    st.info("🔄 Gerando dados simulados para demonstração (50 casos)")
+    df = gerar_dados_simulados()
+    st.success(f"✅ {len(df)} registros simulados gerados com sucesso!")
+    return df
+
 def carregar_dados():
-    """Carregar dados já analisados ou gerar dados simulados"""
+    """Carregar dados já analisados (cache compartilhado entre sessões) ou gerar dados simulados"""
     # Tentar carregar dados reais primeiro
     try:
-        if os.path.exists('data/processed/PESCADORES_AUDITORIA_50.csv'):
-            return pd.read_csv('data/processed/PESCADORES_AUDITORIA_50.csv')
+        return resultados_compartilhados(ARQUIVO_RESULTADOS)
+    except FileNotFoundError:
+        pass
     except Exception as e:
         st.warning(f"⚠️ Dados reais não encontrados, gerando dados simulados...")
 
     # Gerar dados simulados se não encontrar dados reais
-    st.info("🔄 Gerando dados simulados para demonstração (50 casos)")
-    df = gerar_dados_simulados()
-    st.success(f"✅ {len(df)} registros simulados gerados com sucesso!")
-    return df
+    return carregar_dados_simulados().copy(deep=False)
+
+@st.cache_data(show_spinner=False)
+def _agregados_por_versao(caminho, versao):
+    """Agregados gravados pela auditoria (relidos só quando o arquivo muda)"""
+    return carregar_agregados(caminho)
+
+def carregar_agregados_painel(df):
+    """Agregados da auditoria e sua versão; sem o arquivo (dados simulados), calculados sobre df"""
+    caminho = Path(ARQUIVO_AGREGADOS)
+    if caminho.exists():
+        try:
+            versao = ('agregados', caminho.stat().st_mtime_ns)
+            return _agregados_por_versao(str(caminho), versao[1]), versao
+        except Exception:
+            st.warning("⚠️ Agregados da auditoria ilegíveis, calculando a partir dos resultados...")
+    try:
+        versao = ('resultados',) + versao_resultados(ARQUIVO_RESULTADOS)
+    except FileNotFoundError:
+        versao = ('simulados',)
+    return AgregadosAuditoria.de_resultados(df), versao
+
+@st.cache_data(show_spinner=False)
+def _instrumentacao_por_versao(caminho, versao):
+    """Instrumentação dos critérios gravada por analise_50_resultados.py --instrumentar"""
+    return carregar_instrumentacao(caminho)
+
+def carregar_instrumentacao_painel():
+    """Instrumentação dos critérios e a data em que foi medida (None sem o arquivo)"""
+    caminho = Path(ARQUIVO_INSTRUMENTACAO)
+    try:
+        versao = caminho.stat().st_mtime_ns
+        return _instrumentacao_por_versao(str(caminho), versao), datetime.fromtimestamp(versao / 1e9)
+    except FileNotFoundError:
+        return None, None
+    except Exception:
+        st.warning("⚠️ Instrumentação dos critérios ilegível")
+        return None, None
+
+def data_analise(versao):
+    """Data da auditoria exibida: gravação dos agregados (ou dos resultados), senão da instrumentação"""
+    if versao and versao[0] in ('agregados', 'resultados'):
+        return datetime.fromtimestamp(versao[1] / 1e9)
+    return carregar_instrumentacao_painel()[1]
+
+def ocorrencias_criterios(agregados, plano):
+    """Ocorrências, percentual e posição (1 = mais comum) de cada critério, pelo nome da regra"""
+    contagem = agregados.contagem_criterios()
+    total = max(agregados.total, 1)
+    ocorrencias = {}
+    for regra in plano.regras:
+        if regra.titulo in contagem.index:
+            quantidade = int(contagem[regra.titulo])
+            ocorrencias[regra.nome] = {
+                'quantidade': quantidade,
+                'percentual': quantidade / total * 100,
+                'posicao': contagem.index.get_loc(regra.titulo) + 1,
+            }
+    return ocorrencias
+
+def texto_ocorrencias(ocorrencias, nome):
+    """'N (P%)' de um critério, ou '—' quando a regra não está nos agregados"""
+    if nome not in ocorrencias:
+        return "—"
+    return f"{ocorrencias[nome]['quantidade']} ({ocorrencias[nome]['percentual']:.1f}%)"
+
+def severidade_peso(peso):
+    """Severidade do critério pelo peso: ALTO a partir de 25 pontos, MÉDIO a partir de 20"""
+    return next(nome for minimo, nome in SEVERIDADES_PESO if peso >= minimo)
+
+def texto_condicao(condicao):
+    """Condição de uma regra do config.json em texto (operador, parâmetros e rótulo)"""
+    if 'qualquer' in condicao:
+        return "qualquer um de: " + "; ".join(texto_condicao(alt) for alt in condicao['qualquer'])
+
+    coluna = f"`{condicao['coluna']}`"
+    operador = condicao['operador']
+    if operador == 'verdadeiro':
+        texto = f"{coluna} verdadeiro (TRUE/SIM)"
+    elif operador == 'nao_verdadeiro':
+        texto = f"{coluna} não verdadeiro (FALSE/NAO ou vazio)"
+    elif operador == 'igual':
+        texto = f"{coluna} = '{condicao['valor']}'"
+    elif operador == 'em':
+        texto = f"{coluna} em {condicao['valores']}"
+    elif operador == 'diferente_de':
+        texto = f"{coluna} diferente de `{condicao['outra_coluna']}` (ambos preenchidos)"
+    elif operador == 'ano_menor_que':
+        texto = f"ano de {coluna} < {condicao['valor']}"
+    elif operador == 'anos_antes_de':
+        tolerancia = condicao.get('tolerancia', 0)
+        texto = (f"ano de {coluna} + {tolerancia} < ano de `{condicao['outra_coluna']}` "
+                 f"(mais de {tolerancia} ano(s) antes)")
+    else:
+        texto = f"{coluna} {operador}"
+    return f"{texto} ({condicao['rotulo']})" if 'rotulo' in condicao else texto
 
 # Inicializar dados
 df = carregar_dados()
-
-# Aplicar mascaramento nos dados sensíveis (sempre existirá dados agora)
-if df is not None:
-    df['nome_mascarado'] = df['nome_pescador'].apply(mascarar_texto)
-    df['cpf_mascarado'] = df['cpf'].apply(mascarar_texto)
-    if 'rgp' in df.columns:
-        df['rgp_mascarado'] = df['rgp'].apply(mascarar_texto)
+agregados, versao_dados = carregar_agregados_painel(df) if df is not None else (None, None)
 
 # Sidebar
 st.sidebar.title("🔍 Audit-IA")
 st.sidebar.markdown("**Auditoria Inteligente do RGP**")
-st.sidebar.markdown(f"📊 **{len(df)} Resultados Analisados**")
+st.sidebar.markdown(f"📊 **{agregados.total} Resultados Analisados**")
 st.sidebar.markdown(f"🔒 **100% Dados Anonimizados**")
 
 # Navegação
@@ -210,55 +383,39 @@ if pagina == "📊 Dashboard":
 
     if df is not None:
         # Informações do dataset
-        st.info(f"📊 **Dataset**: {len(df)} pescadores analisados de dados anonimizados")
+        st.info(f"📊 **Dataset**: {agregados.total} pescadores analisados de dados anonimizados")
 
-        # Métricas principais
+        # Métricas principais (agregados gravados pela auditoria)
+        total = max(agregados.total, 1)
         col1, col2, col3, col4 = st.columns(4)
 
         with col1:
-            st.metric("📊 Total Analisado", len(df))
+            st.metric("📊 Total Analisado", agregados.total)
 
         with col2:
-            risco_alto = len(df[df['risco_categoria'] == 'ALTO'])
-            st.metric("🚨 Risco Alto", risco_alto, f"{risco_alto/len(df)*100:.1f}%")
+            risco_alto = agregados.contagem('ALTO')
+            st.metric("🚨 Risco Alto", risco_alto, f"{risco_alto/total*100:.1f}%")
 
         with col3:
-            risco_medio = len(df[df['risco_categoria'] == 'MEDIO'])
-            st.metric("⚠️ Risco Médio", risco_medio, f"{risco_medio/len(df)*100:.1f}%")
+            risco_medio = agregados.contagem('MEDIO')
+            st.metric("⚠️ Risco Médio", risco_medio, f"{risco_medio/total*100:.1f}%")
 
         with col4:
-            risco_baixo = len(df[df['risco_categoria'] == 'BAIXO'])
-            st.metric("✅ Risco Baixo", risco_baixo, f"{risco_baixo/len(df)*100:.1f}%")
+            risco_baixo = agregados.contagem('BAIXO')
+            st.metric("✅ Risco Baixo", risco_baixo, f"{risco_baixo/total*100:.1f}%")
 
         st.markdown("---")
 
-        # Gráficos
+        # Gráficos (contagens dos agregados; figuras montadas uma vez por versão)
+        fig_risco, fig_score = graficos_agregados(versao_dados, agregados)
         col1, col2 = st.columns(2)
 
         with col1:
             # Distribuição de Risco
-            fig_risco = px.pie(
-                df,
-                names='risco_categoria',
-                title='🎯 Distribuição de Risco',
-                color='risco_categoria',
-                color_discrete_map={
-                    'ALTO': '#ff4444',
-                    'MEDIO': '#ffaa00',
-                    'BAIXO': '#00c851'
-                }
-            )
             st.plotly_chart(fig_risco, use_container_width=True)
 
         with col2:
             # Score de Risco
-            fig_score = px.histogram(
-                df,
-                x='risco_score',
-                title='📈 Distribuição do Score de Risco',
-                nbins=20,
-                color_discrete_sequence=['#2196f3']
-            )
             st.plotly_chart(fig_score, use_container_width=True)
 
         # Resumo Estatístico
@@ -267,16 +424,13 @@ if pagina == "📊 Dashboard":
         col1, col2, col3 = st.columns(3)
 
         with col1:
-            media_score = df['risco_score'].mean()
-            st.metric("📊 Score Médio", f"{media_score:.1f}")
+            st.metric("📊 Score Médio", f"{agregados.score_medio:.1f}")
 
         with col2:
-            max_score = df['risco_score'].max()
-            st.metric("🚨 Score Máximo", max_score)
+            st.metric("🚨 Score Máximo", agregados.score_max)
 
         with col3:
-            casos_com_alerta = len(df[df['justificativas'].str.len() > 10])
-            st.metric("📝 Casos com Alerta", casos_com_alerta)
+            st.metric("📝 Casos com Alerta", agregados.com_alerta)
 
         # Tabela resumo dos casos de risco médio e alto
         st.markdown("### 🔍 Resumo de Casos com Risco")
@@ -317,55 +471,95 @@ elif pagina == "🔍 Resultados da Auditoria":
                 value=0
             )
 
-        # Aplicar filtros
-        df_filtrado = df.copy()
+        # Aplicar filtros: no banco SQLite (todos os registros auditados), quando existir;
+        # sem o banco, só as posições filtradas dos resultados em cache (sem cópia)
+        categoria = None if filtro_risco == 'Todos' else filtro_risco
+        usar_banco = Path(ARQUIVO_BANCO).exists()
 
-        if filtro_risco != 'Todos':
-            df_filtrado = df_filtrado[df_filtrado['risco_categoria'] == filtro_risco]
+        if usar_banco:
+            resumo = resumo_filtrado(ARQUIVO_BANCO, categoria, min_score)
+            total_filtrado = resumo['total']
+            media_filtrada = resumo['score_medio']
+            alto_risco_filtro = resumo['alto']
+        else:
+            scores = df['risco_score'].to_numpy()
+            mascara = scores >= min_score
+            if categoria:
+                mascara &= (df['risco_categoria'] == categoria).to_numpy()
+            posicoes = np.flatnonzero(mascara)
 
-        df_filtrado = df_filtrado[df_filtrado['risco_score'] >= min_score]
+            total_filtrado = len(posicoes)
+            media_filtrada = scores[posicoes].mean() if total_filtrado > 0 else 0.0
+            alto_risco_filtro = int((df['risco_categoria'].iloc[posicoes] == 'ALTO').sum())
 
         # Estatísticas dos dados filtrados
         st.markdown("### 📊 Estatísticas dos Dados Filtrados")
+        if not usar_banco and agregados.total > len(df):
+            # Sem o banco só há os registros de maior risco gravados; o Dashboard mostra a auditoria inteira
+            st.caption(f"⚠️ Filtros e estatísticas sobre os {len(df)} registros de maior risco gravados nos "
+                       f"resultados, não sobre os {agregados.total} auditados. Rode a análise com --sqlite "
+                       f"para filtrar todos os registros.")
 
         col1, col2, col3 = st.columns(3)
 
         with col1:
-            st.metric("📊 Registros Filtrados", len(df_filtrado))
+            st.metric("📊 Registros Filtrados", total_filtrado)
 
         with col2:
-            if len(df_filtrado) > 0:
-                media_filtrada = df_filtrado['risco_score'].mean()
-                st.metric("📈 Score Médio Filtrado", f"{media_filtrada:.1f}")
-            else:
-                st.metric("📈 Score Médio Filtrado", "0.0")
+            st.metric("📈 Score Médio Filtrado", f"{media_filtrada:.1f}")
 
         with col3:
-            if len(df_filtrado) > 0:
-                alto_risco_filtro = len(df_filtrado[df_filtrado['risco_categoria'] == 'ALTO'])
-                st.metric("🚨 Risco Alto", alto_risco_filtro)
-            else:
-                st.metric("🚨 Risco Alto", 0)
+            st.metric("🚨 Risco Alto", alto_risco_filtro)
 
         # Tabela de resultados
         st.markdown("### 📋 Tabela de Resultados")
 
-        if len(df_filtrado) > 0:
+        if total_filtrado > 0:
+            # Ordenação e paginação no servidor: só a página visível vai para o navegador
+            col1, col2, col3 = st.columns([2, 1, 1])
+            ordenacoes = {nome: coluna for nome, coluna in ORDENACOES.items() if usar_banco or coluna in df.columns}
+
+            with col1:
+                ordenar_por = st.selectbox("Ordenar por:", list(ordenacoes))
+
+            with col2:
+                invertida = st.checkbox("Ordem inversa")
+
+            paginas = (total_filtrado - 1) // TAMANHO_PAGINA + 1
+            with col3:
+                pagina_atual = st.number_input("Página:", min_value=1, max_value=paginas, value=1)
+            inicio = (pagina_atual - 1) * TAMANHO_PAGINA
+            st.caption(f"Página {pagina_atual} de {paginas} ({TAMANHO_PAGINA} registros por página)")
+
+            if usar_banco:
+                # Só a página visível é lida do banco (já com as colunas mascaradas)
+                df_filtrado = consultar_resultados(
+                    ARQUIVO_BANCO, categoria, min_score, TAMANHO_PAGINA, inicio, ordenacoes[ordenar_por], invertida
+                )
+                if faltam_mascaras(df_filtrado):
+                    # Banco gravado antes das colunas mascaradas
+                    df_filtrado = mascarar_resultados(df_filtrado)
+            else:
+                rotulos = ordenar_posicoes(df, posicoes, ordenacoes[ordenar_por], invertida)
+                df_filtrado = df.loc[rotulos[inicio:inicio + TAMANHO_PAGINA]]
+
             # Preparar dados para exibição
             colunas_exibir = ['nome_mascarado', 'cpf_mascarado', 'risco_score', 'risco_categoria',
-                            'municipio', 'uf', 'justificativas']
+                            'municipio', 'uf', 'alertas']
 
             # Adicionar RGP mascarado se existir
             if 'rgp_mascarado' in df_filtrado.columns:
                 colunas_exibir.insert(2, 'rgp_mascarado')  # Inserir após CPF
 
-            df_exibir = df_filtrado[colunas_exibir].copy()
+            df_exibir = df_filtrado.assign(
+                alertas=carregar_plano().contar_alertas(df_filtrado['criterios_bits'])
+            )[colunas_exibir]
 
             # Renomear colunas
             if 'rgp_mascarado' in df_exibir.columns:
-                df_exibir.columns = ['Nome', 'CPF', 'RGP', 'Score', 'Categoria', 'Município', 'UF', 'Justificativas']
+                df_exibir.columns = ['Nome', 'CPF', 'RGP', 'Score', 'Categoria', 'Município', 'UF', 'Alertas']
             else:
-                df_exibir.columns = ['Nome', 'CPF', 'Score', 'Categoria', 'Município', 'UF', 'Justificativas']
+                df_exibir.columns = ['Nome', 'CPF', 'Score', 'Categoria', 'Município', 'UF', 'Alertas']
 
             st.dataframe(df_exibir, use_container_width=True)
 
@@ -373,15 +567,26 @@ elif pagina == "🔍 Resultados da Auditoria":
             st.markdown("---")
             st.markdown("### 💾 Exportar Resultados Filtrados")
 
-            # Remover dados sensíveis do CSV de exportação
-            df_export = df_filtrado.drop(columns=['nome_pescador', 'cpf'], errors='ignore')
-            csv = df_export.to_csv(index=False)
-            st.download_button(
-                label="📥 Download CSV",
-                data=csv,
-                file_name=f"audit_resultados_filtrados_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-                mime="text/csv"
-            )
+            # O CSV de todos os registros filtrados só é montado quando pedido
+            df_export = None
+            if st.button(f"📄 Preparar CSV ({total_filtrado} registros filtrados)"):
+                if usar_banco:
+                    df_export = consultar_resultados(
+                        ARQUIVO_BANCO, categoria, min_score, ordem=ordenacoes[ordenar_por], invertida=invertida
+                    )
+                else:
+                    df_export = df.loc[ordenar_posicoes(df, posicoes, ordenacoes[ordenar_por], invertida)]
+
+            if df_export is not None:
+                # Remover dados sensíveis do CSV de exportação
+                df_export = df_export.drop(columns=['nome_pescador', 'cpf'], errors='ignore')
+                csv = df_export.to_csv(index=False)
+                st.download_button(
+                    label="📥 Download CSV",
+                    data=csv,
+                    file_name=f"audit_resultados_filtrados_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
+                    mime="text/csv"
+                )
         else:
             st.warning("⚠️ Nenhum registro encontrado com os filtros selecionados.")
 
@@ -394,7 +599,7 @@ elif pagina == "📋 Relatórios Detalhados":
         # Casos de Médio e Alto Risco
         st.markdown("### 🚨 Casos de Risco Prioritários")
 
-        casos_risco = df[df['risco_categoria'] != 'BAIXO'].nlargest(20, 'risco_score')
+        casos_risco = selecionar_top_k(df[df['risco_categoria'] != 'BAIXO'], 20)
 
         if len(casos_risco) > 0:
             for i, (_, caso) in enumerate(casos_risco.iterrows(), 1):
@@ -409,11 +614,10 @@ elif pagina == "📋 Relatórios Detalhados":
                         <ul>
                     """, unsafe_allow_html=True)
 
-                    justificativas_lista = caso['justificativas']
-                    if isinstance(justificativas_lista, list) and justificativas_lista:
+                    justificativas_lista = carregar_plano().descrever(caso['criterios_bits'], caso)
+                    if justificativas_lista:
                         for justificativa in justificativas_lista:
-                            if justificativa.strip():
-                                st.markdown(f"<li>{justificativa.strip()}</li>", unsafe_allow_html=True)
+                            st.markdown(f"<li>{justificativa}</li>", unsafe_allow_html=True)
                     else:
                         st.markdown("<li>Nenhuma justificativa registrada</li>", unsafe_allow_html=True)
 
@@ -425,23 +629,17 @@ elif pagina == "📋 Relatórios Detalhados":
         st.markdown("---")
         st.markdown("### 🗺️ Análise por Estado")
 
-        # Calcular estatísticas por estado separadamente para evitar o erro
-        uf_stats = df.groupby('uf').agg({
-            'risco_score': ['mean', 'count']
-        }).round(2)
-
-        uf_stats.columns = ['Score Médio', 'Total']
-        uf_risco_alto = df[df['risco_categoria'] == 'ALTO'].groupby('uf').size()
-        uf_risco_medio = df[df['risco_categoria'] == 'MEDIO'].groupby('uf').size()
-
-        # Combinar os dados
-        uf_risco = uf_stats.reset_index()
-        uf_risco = uf_risco.merge(uf_risco_alto.rename('Alto Risco'), on='uf', how='left')
-        uf_risco = uf_risco.merge(uf_risco_medio.rename('Médio Risco'), on='uf', how='left')
-        uf_risco['Alto Risco'] = uf_risco['Alto Risco'].fillna(0)
-        uf_risco['Médio Risco'] = uf_risco['Médio Risco'].fillna(0)
-        uf_risco = uf_risco.sort_values('Score Médio', ascending=False)
-        uf_risco = uf_risco.set_index('uf')
+        # Somas por estado gravadas pela auditoria
+        por_uf = agregados.por_uf if agregados.por_uf is not None else pd.DataFrame(
+            columns=['soma_score', 'total', 'alto', 'medio'], index=pd.Index([], name='uf')
+        )
+        uf_risco = pd.DataFrame({
+            'Score Médio': (por_uf['soma_score'] / por_uf['total']).round(2),
+            'Total': por_uf['total'],
+            'Alto Risco': por_uf['alto'],
+            'Médio Risco': por_uf['medio'],
+        })
+        uf_risco = uf_risco.sort_values('Score Médio', ascending=False, kind='stable')
 
         if len(uf_risco) > 0:
             st.dataframe(uf_risco, use_container_width=True)
@@ -461,31 +659,20 @@ elif pagina == "📋 Relatórios Detalhados":
         st.markdown("---")
         st.markdown("### 🚨 Principais Tipos de Alerta")
 
-        todas_justificativas = []
-        for justificativas_lista in df['justificativas']:
-            if isinstance(justificativas_lista, list) and justificativas_lista:
-                todas_justificativas.extend(justificativas_lista)
-
-        if todas_justificativas:
-            # Limpar e contar justificativas
-            justificativas_limpas = []
-            for j in todas_justificativas:
-                j_limpo = j.strip()
-                if j_limpo and j_limpo != 'nan':
-                    justificativas_limpas.append(j_limpo)
-
-            if justificativas_limpas:
-                justificativas_count = pd.Series(justificativas_limpas).value_counts().head(10)
-
-                fig_alertas = px.bar(
-                    x=justificativas_count.values,
-                    y=justificativas_count.index,
-                    title='🚨 Top 10 Alertas Mais Comuns',
-                    labels={'x': 'Frequência', 'y': 'Tipo de Alerta'},
-                    orientation='h'
-                )
-                fig_alertas.update_layout(height=500)
-                st.plotly_chart(fig_alertas, use_container_width=True)
+        # Contagem por critério direto do campo criterios_bits
+        justificativas_count = agregados.contagem_criterios().head(10)
+        justificativas_count = justificativas_count[justificativas_count > 0]
+
+        if len(justificativas_count) > 0:
+            fig_alertas = px.bar(
+                x=justificativas_count.values,
+                y=justificativas_count.index,
+                title='🚨 Top 10 Alertas Mais Comuns',
+                labels={'x': 'Frequência', 'y': 'Tipo de Alerta'},
+                orientation='h'
+            )
+            fig_alertas.update_layout(height=500)
+            st.plotly_chart(fig_alertas, use_container_width=True)
 
         # Insights Principais
         st.markdown("---")
@@ -493,17 +680,16 @@ elif pagina == "📋 Relatórios Detalhados":
 
         insights = []
 
-        percentual_alto = (len(df[df['risco_categoria'] == 'ALTO']) / len(df)) * 100
-        percentual_medio = (len(df[df['risco_categoria'] == 'MEDIO']) / len(df)) * 100
-        percentual_baixo = (len(df[df['risco_categoria'] == 'BAIXO']) / len(df)) * 100
+        total = max(agregados.total, 1)
+        percentual_alto = agregados.contagem('ALTO') / total * 100
+        percentual_medio = agregados.contagem('MEDIO') / total * 100
+        percentual_baixo = agregados.contagem('BAIXO') / total * 100
 
         insights.append(f"📊 **Distribuição de Risco**: {percentual_alto:.1f}% alto risco, {percentual_medio:.1f}% médio risco, {percentual_baixo:.1f}% baixo risco")
 
-        media_score = df['risco_score'].mean()
-        insights.append(f"📈 **Score Médio**: {media_score:.1f} pontos (máximo: {df['risco_score'].max()})")
+        insights.append(f"📈 **Score Médio**: {agregados.score_medio:.1f} pontos (máximo: {agregados.score_max})")
 
-        casos_com_justificativas = len(df[df['justificativas'].str.len() > 10])
-        insights.append(f"📝 **Casos com Alertas**: {casos_com_justificativas} de {len(df)} pescadores possuem justificativas detalhadas")
+        insights.append(f"📝 **Casos com Alertas**: {agregados.com_alerta} de {agregados.total} pescadores possuem justificativas detalhadas")
 
         if percentual_baixo >= 90:
             insights.append(f"✅ **Excelente Conformidade**: {percentual_baixo:.1f}% dos registros em baixo risco")
@@ -518,13 +704,15 @@ elif pagina == "📋 Relatórios Detalhados":
         col1, col2 = st.columns(2)
 
         with col1:
-            st.markdown(f"**📁 Fonte de Dados**: data/processed/PESCADORES_AUDITORIA_50.csv")
-            st.markdown(f"**📊 Total de Registros**: {len(df)} pescadores")
+            st.markdown(f"**📁 Fonte de Dados**: {ARQUIVO_RESULTADOS}")
+            st.markdown(f"**📊 Total de Registros**: {agregados.total} pescadores")
             st.markdown(f"**🔒 Nível de Anonimização**: 100% (nomes e CPF mascarados)")
 
         with col2:
-            st.markdown(f"**🤖 Algoritmo**: Auditoria Inteligente com 7 critérios")
-            st.markdown(f"**📅 Data da Análise**: 03/12/2025")
+            analisado_em = data_analise(versao_dados)
+            st.markdown(f"**🤖 Algoritmo**: Auditoria Inteligente com {len(carregar_plano().regras)} critérios")
+            st.markdown(f"**📅 Data da Análise**: "
+                        f"{analisado_em.strftime('%d/%m/%Y %H:%M') if analisado_em else 'dados simulados'}")
             st.markdown(f"**⚡ Processamento**: 100% local e seguro")
 
     else:
@@ -535,290 +723,76 @@ elif pagina == "⚙️ Critérios de Auditoria":
     st.title("⚙️ Critérios de Auditoria Inteligente")
     st.markdown("---")
 
-    st.markdown("### 🎯 **Visão Geral dos 7 Critérios de Análise**")
-
-    st.info("""
-    O sistema Audit-IA utiliza 7 critérios principais para detectar inconsistências e possíveis fraudes nos registros do RGP,
-    com pesos que variam de 5 a 30 pontos. A análise foi realizada em 50 registros anonimizados.
-    """)
-
-    # Critério 1: Benefícios vs Outra Renda
-    with st.expander("🏆 **1. Benefícios Sociais vs Outra Renda (30 pontos)**", expanded=True):
-        st.markdown("""
-        **🔍 Detecta:** Pescadores que recebem benefícios sociais (Bolsa Família, Renda Brasil) mas declaram possuir outra fonte de renda
-
-        **📊 Dados verificados:**
-        - `renda_brasil_ou_bolsa_familia`
-        - `st_possui_outra_fonte_renda`
-
-        **⚠️ Lógica:** Se ambos forem TRUE → +30 pontos
-
-        **📈 Impacto na amostra:** 0 ocorrências (0%)
-
-        **🎯 Justificativa:** Potencial fraude em programas sociais - pessoa que declara ser beneficiária
-        de programa de transferência de renda para famílias de baixa renda mas informa possuir outra fonte de renda.
-        """)
-
-        col1, col2 = st.columns(2)
-        with col1:
-            st.metric("⚠️ Peso", "30 pontos")
-            st.metric("📊 Ocorrências", "0 (0%)")
-            st.metric("🎯 Severidade", "ALTO")
-        with col2:
-            st.markdown("""
-            **🔴 Indicador de Alta Prioridade**
-            - Foco principal de fiscalização
-            - Impacto financeiro direto
-            - Fraude evidente quando presente
-            """)
-
-    # Critério 2: Escolaridade vs Renda
-    with st.expander("🎓 **2. Escolaridade vs Faixa de Renda (20 pontos)**", expanded=False):
-        st.markdown("""
-        **🔍 Detecta:** Pescadores com alta escolaridade (Ensino Médio ou Superior) que declaram renda muito baixa
-
-        **📊 Dados verificados:**
-        - `nivel_escolaridade`
-        - `fonte_renda_faixa_renda`
-
-        **⚠️ Condição:** Escolaridade em ['ENSINO MEDIO COMPLETO', 'ENSINO MEDIO INCOMPLETO', 'ENSINO SUPERIOR']
-        E renda 'Menor que R$1.045,00 por mês'
-
-        **📈 Impacto na amostra:** 11 ocorrências (22%)
+    # Ocorrências de cada critério nos agregados da última auditoria (ou dos dados simulados)
+    plano = carregar_plano()
+    ocorrencias = ocorrencias_criterios(agregados, plano)
 
-        **🎯 Justificativa:** Incompatibilidade entre qualificação educacional e renda declarada.
-        Pessoas com ensino médio ou superior geralmente têm acesso a oportunidades melhores,
-        tornando suspeita uma renda tão baixa para atividade de pesca.
-        """)
+    st.markdown(f"### 🎯 **Visão Geral dos {len(plano.regras)} Critérios de Análise**")
 
-        col1, col2 = st.columns(2)
-        with col1:
-            st.metric("⚖️ Peso", "20 pontos")
-            st.metric("📊 Ocorrências", "11 (22%)")
-            st.info("Mais comum na análise atual")
-        with col2:
-            st.markdown("""
-            **🟡 Indicador de Média Prioridade**
-            - Requer verificação detalhada
-            - Pode indicar necessidade de capacitação
-            - Contexto socioeconômico relevante
-            """)
-
-    # Critério 3: Tecnologia vs Renda
-    with st.expander("📱 **3. Tecnologia vs Renda (15 pontos)**", expanded=False):
-        st.markdown("""
-        **🔍 Detecta:** Pescadores com acesso a tecnologia e residência própria, mas com renda muito baixa
-
-        **📊 Dados verificados:**
-        - `possui_internet`
-        - `possui_celular`
-        - `tipo_residencia`
-        - `fonte_renda_faixa_renda`
-
-        **⚠️ Condição:** Tem internet E celular E residência própria
-        E renda em ['Menor que R$1.045,00 por mês', 'De R$1.045,00 a R$2.000,00']
-
-        **📈 Impacto na amostra:** 0 ocorrências (0%)
-
-        **🎯 Justificativa:** O acesso a serviços de tecnologia custa dinheiro, e possuir residência própria
-        indica maior estabilidade financeira. A combinação com renda muito baixa gera inconsistência socioeconômica.
-        """)
-
-        col1, col2 = st.columns(2)
-        with col1:
-            st.metric("📊 Peso", "15 pontos")
-            st.metric("📊 Ocorrências", "0 (0%)")
-            st.metric("🎯 Severidade", "BAIXO")
-        with col2:
-            st.markdown("""
-            **🟢 Indicador de Baixa Prioridade**
-            - Acesso tecnológico cada vez mais comum
-            - Pode não indicar fraude necessariamente
-            - Requer contexto adicional para avaliação
-            """)
-
-    # Critério 4: Filiação Institucional
-    with st.expander("🏢 **4. Filiação Institucional (10 pontos)**", expanded=False):
-        st.markdown("""
-        **🔍 Detecta:** Pescadores que não são filiados a colônias ou associações de pesca
-
-        **📊 Dados verificados:** `st_filiado_instituicao`
-        **⚠️ Condição:** Não é filiado
-
-        **📈 Impacto na amostra:** 11 ocorrências (22%)
-
-        **🎯 Justificativa:** A filiação institucional é obrigatória para muitos benefícios e representa
-        formalização da atividade pesqueira. Não ser filiado pode indicar informalidade ou irregularidade.
-        """)
-
-        col1, col2 = st.columns(2)
-        with col1:
-            st.metric("🏢 Peso", "10 pontos")
-            st.metric("📊 Ocorrências", "11 (22%)")
-            st.info("Segundo mais comum")
-        with col2:
-            st.markdown("""
-            **🟢 Indicador de Baixa Prioridade**
-            - Essencial para regularização
-            - Impacto na formalização
-            - Facilmente corrigível
-            """)
-
-    # Critério 5: Produtos Protegidos
-    with st.expander("🐢 **5. Produtos Protegidos (5 pontos)**", expanded=False):
-        st.markdown("""
-        **🔍 Detecta:** Pescadores que declaram pescar espécies protegidas
-
-        **📊 Dados verificados:**
-        - `produto_quelonio`
-        - `produto_repteis`
-
-        **⚠️ Condição:** Pesca de Quelônios ou Répteis
-
-        **📈 Impacto na amostra:** 0 ocorrências (0%)
-
-        🎯 Justificativa: A pesca de espécies protegidas é regulamentada e geralmente proibida.
-        Pescadores que declaram capturar esses animais podem estar em situação irregular ou desconhecer a legislação.
-        """)
-
-        col1, col2 = st.columns(2)
-        with col1:
-            st.metric("🐢 Peso", "5 pontos")
-            st.metric("📊 Ocorrências", "0 (0%)")
-            st.metric("🎯 Severidade", "BAIXO")
-        with col2:
-            st.markdown("""
-            **🟢 Indicador de Baixa Prioridade**
-            - Boa consciência ambiental
-            - Educação predominante
-            - Raros em nossa amostra
-            """)
-
-    # Critério 6: Localização vs Área Pesca
-    with st.expander("📍 **6. Localização vs Área de Pesca (10 pontos)**", expanded=False):
-        st.markdown("""
-        **🔍 Detecta:** Inconsistência entre endereço residencial e área de pesca declarada
-
-        **📊 Dados verificados:**
-        - `municipio` vs `nome_municipio`
-        - Usar mesmo campo de "municipio" se houver diferença
-        - Ignorar se um deles estiver vazio
-
-        **⚠️ Condição:** Municípios diferentes e ambos preenchidos
-
-        **📈 Impacto na amostra:** 4 ocorrências (8%)
-
-        **🎯 Justificativa:** Pescadores geralmente atuam próximo de onde residem.
-        Grande distância entre residência e área de pesca pode indicar inconsistência logística ou informação falsa.
-        """)
-
-        col1, col2 = st.columns(2)
-        with col1:
-            st.metric("📍 Peso", "10 pontos")
-            st.metric("📊 Ocorrências", "4 (8%)")
-            st.metric("🎯 Severidade", "BAIXO")
-        with col2:
-            st.markdown("""
-            **🟢 Indicador de Baixa Prioridade**
-            - Pode ser diferença de grafia
-            - Contexto logístico relevante
-            - Verificação manual recomendada
-            """)
-
-    # Critério 7: Idade vs Tempo de Registro
-    with st.expander("📅 **7. Idade vs Tempo de Registro (25 pontos)**", expanded=False):
-        st.markdown("""
-        **🔍 Detecta:** Inconsistência entre idade e tempo de registro no RGP
-
-        **📊 Dados verificados:**
-        - `dt_nascimento`
-        - `dt_primeiro_rgp`
-
-        **⚠️ Condição:** Idade estimada < tempo de registro - 5 anos
-
-        🎯 Justificativa: É impossível que um pescador tenha RGP há mais tempo que sua própria idade.
-        Indica erro nos dados ou possível fraude no registro.
+    st.info(f"""
+    O sistema Audit-IA utiliza {len(plano.regras)} critérios principais para detectar inconsistências e possíveis fraudes nos registros do RGP,
+    com pesos que variam de {min(r.peso for r in plano.regras)} a {max(r.peso for r in plano.regras)} pontos. As ocorrências consideram os {agregados.total} registros auditados.
+    """)
 
-        **📈 Impacto na amostra:** 0 ocritérios registrados
-        """)
-
-        col1, col2 = st.columns(2)
-        with col1:
-            st.metric("📅 Peso", "25 pontos")
-            st.markdown("*Máximo teórico - poucos dados completos*")
-            st.metric("📊 Ocorrências", "0 (0%)")
-            st.metric("🎯 Severidade", "ALTO")
-        with col2:
-            st.markdown("""
-            **🔴 Indicador de Alta Prioridade**
-            - Impossibilidade lógica
-            - Erro de dados graves
-            - Fraude evidente quando presente
-            """)
-            st.markdown("⚠️ **Limitação:** Muitos registros com datas incompletas na amostra")
+    # Um critério por regra do config.json, na ordem das regras
+    for numero, (regra, definicao) in enumerate(zip(plano.regras, plano.definicoes), start=1):
+        textos = TEXTOS_CRITERIOS.get(regra.nome, {})
+        severidade = severidade_peso(regra.peso)
+        condicoes = [texto_condicao(c) for c in definicao['condicoes']]
+        varias = len(condicoes) > 1
+
+        with st.expander(f"{textos.get('icone', '📌')} **{numero}. {regra.titulo} ({regra.peso} pontos)**",
+                         expanded=numero == 1):
+            dados = "\n".join(f"- `{coluna}`" for coluna in regra.colunas)
+            condicao = "\n".join(f"- {texto}" for texto in condicoes)
+            st.markdown(f"""
+**🔍 Detecta:** {textos.get('detecta', regra.justificativa)}
+
+**📊 Dados verificados:**
+{dados}
+
+**⚠️ {'Condições (todas)' if varias else 'Condição'}:**
+{condicao}
+
+**⚠️ Lógica:** {'todas as condições atendidas' if varias else 'condição atendida'} → +{regra.peso} pontos
+
+**📈 Ocorrências nos registros auditados:** {texto_ocorrencias(ocorrencias, regra.nome)}
+""")
+            if 'justificativa' in textos:
+                st.markdown(f"**🎯 Justificativa:** {textos['justificativa']}")
+
+            col1, col2 = st.columns(2)
+            with col1:
+                st.metric("⚖️ Peso", f"{regra.peso} pontos")
+                st.metric("📊 Ocorrências", texto_ocorrencias(ocorrencias, regra.nome))
+                st.metric("🎯 Severidade", severidade)
+                if regra.nome in ocorrencias:
+                    st.info(f"{ocorrencias[regra.nome]['posicao']}º mais comum na análise atual")
+            with col2:
+                notas = "\n".join(f"- {nota}" for nota in textos.get('notas', []))
+                st.markdown(f"**{ICONES_SEVERIDADE[severidade]} Indicador de "
+                            f"{PRIORIDADES_SEVERIDADE[severidade]} Prioridade**\n\n{notas}")
+                if 'limitacao' in textos:
+                    st.markdown(f"⚠️ **Limitação:** {textos['limitacao']}")
 
     # Resumo dos Critérios
     st.markdown("---")
     st.markdown("### 📋 **Resumo dos Critérios e Pesos**")
 
-    critérios_data = [
-        {
-            "critério": "Benefícios Sociais vs Outra Renda",
-            "peso": 30,
-            "ocorrencias": 0,
-            "percentual": "0%",
-            "severidade": "🔴 ALTO",
-            "descricao": "Recebe benefícios sociais mas declara outra renda"
-        },
-        {
-            "critério": "Idade vs Tempo de Registro",
-            "peso": 25,
-            "ocorrencias": 0,
-            "percentual": "0%",
-            "severidade": "🔴 ALTO",
-            "descricao": "Tempo de RGP maior que idade do pescador"
-        },
-        {
-            "critério": "Escolaridade vs Faixa Renda",
-            "peso": 20,
-            "ocorrencias": 11,
-            "percentual": "22%",
-            "severidade": "🟡 MÉDIO",
-            "descricao": "Alta escolaridade com renda muito baixa"
-        },
-        {
-            "critério": "Tecnologia vs Renda",
-            "peso": 15,
-            "ocorrencias": 0,
-            "percentual": "0%",
-            "severidade": "🟢 BAIXO",
-            "descricao": "Acesso a tecnologia com renda incompatível"
-        },
-        {
-            "critério": "Localização vs Área Pesca",
-            "peso": 10,
-            "ocorrencias": 4,
-            "percentual": "8%",
-            "severidade": "🟢 BAIXO",
-            "descricao": "Endereço diferente da área de pesca"
-        },
-        {
-            "critério": "Filiação Institucional",
-            "peso": 10,
-            "ocorrencias": 11,
-            "percentual": "22%",
-            "severidade": "🟢 BAIXO",
-            "descricao": "Não é filiado a instituição de pesca"
-        },
-        {
-            "critério": "Produtos Protegidos",
-            "peso": 5,
-            "ocorrencias": 0,
-            "percentual": "0%",
-            "severidade": "🟢 BAIXO",
-            "descricao": "Pesca de espécies protegidas"
-        }
-    ]
+    # Uma linha por regra do config.json; ocorrências e percentuais dos agregados atuais
+    critérios_data = []
+    for regra in sorted(plano.regras, key=lambda r: r.peso, reverse=True):
+        severidade = severidade_peso(regra.peso)
+        atual = ocorrencias.get(regra.nome, {'quantidade': 0, 'percentual': 0.0})
+        critérios_data.append({
+            "nome": regra.nome,
+            "critério": regra.titulo,
+            "peso": regra.peso,
+            "severidade": f"{ICONES_SEVERIDADE[severidade]} {severidade}",
+            "descricao": TEXTOS_CRITERIOS.get(regra.nome, {}).get('descricao', regra.titulo),
+            "ocorrencias": atual['quantidade'],
+            "percentual": f"{atual['percentual']:.1f}%",
+        })
 
     df_critérios = pd.DataFrame(critérios_data)
 
@@ -848,28 +822,54 @@ elif pagina == "⚙️ Critérios de Auditoria":
     )
     st.plotly_chart(fig_pesos, use_container_width=True)
 
+    # Desempenho de cada critério (analise_50_resultados.py --instrumentar)
+    st.markdown("---")
+    st.markdown("### ⏱️ **Desempenho por Critério**")
+
+    instrumentacao, medida_em = carregar_instrumentacao_painel()
+    if instrumentacao is not None and instrumentacao.avaliados.any():
+        st.caption(f"Medido em {medida_em:%d/%m/%Y %H:%M} sobre {int(instrumentacao.avaliados.max())} registros avaliados")
+        tabela = instrumentacao.tabela().reset_index()
+        tabela.columns = ['Critério', 'Tempo (s)', 'Tempo (%)', 'Avaliados', 'Disparos', 'Disparos (%)', 'Registros/s']
+        st.dataframe(tabela.round({'Tempo (s)': 3, 'Tempo (%)': 1, 'Disparos (%)': 1, 'Registros/s': 0}),
+                     use_container_width=True)
+
+        fig_tempo = px.bar(
+            tabela.sort_values('Tempo (s)', ascending=True),
+            x='Tempo (s)',
+            y='Critério',
+            orientation='h',
+            title='⏱️ Tempo de Avaliação por Critério'
+        )
+        st.plotly_chart(fig_tempo, use_container_width=True)
+    else:
+        st.info("⏱️ Para medir o tempo e os disparos de cada critério, execute "
+                "`python analise_50_resultados.py --instrumentar`.")
+
     # Insights sobre os critérios
     st.markdown("---")
     st.markdown("### 💡 **Insights sobre os Critérios**")
 
-    st.markdown("""
-    #### 🔍 **Análise da Amostra (50 registros):**
-    - **0%** casos de alto risco
-    - **6%** casos de médio risco
-    - **94%** casos de baixo risco
-    - **Score médio:** 12.0 pontos
+    total_analisado = max(agregados.total, 1)
+    st.markdown(f"""
+    #### 🔍 **Análise dos {agregados.total} registros auditados:**
+    - **{agregados.contagem('ALTO') / total_analisado * 100:.1f}%** casos de alto risco
+    - **{agregados.contagem('MEDIO') / total_analisado * 100:.1f}%** casos de médio risco
+    - **{agregados.contagem('BAIXO') / total_analisado * 100:.1f}%** casos de baixo risco
+    - **Score médio:** {agregados.score_medio:.1f} pontos
     """)
 
-    st.markdown("""
-    #### 📈 **Critérios Mais Ativos:**
-    - **Escolaridade vs Renda**: 11 casos (22%) - Requer atenção especial
-    - **Filiação Institucional**: 11 casos (22%) - Essencial para regularização
-
-    #### ✅ **Critérios Nunca Ativados:**
-    - **Benefícios Sociais**: Ótimo controle social (0%)
-    - **Produtos Protegidos**: Boa consciência ambiental (0%)
-    - **Tecnologia vs Renda**: Dados consistentes (0%)
-    """)
+    # Mais ativos e nunca ativados a partir das contagens atuais
+    contagem = agregados.contagem_criterios()
+    ativos = contagem[contagem > 0].head(2)
+    nunca = contagem[contagem == 0]
+    linhas_ativos = [f"- **{titulo}**: {quantidade} casos ({quantidade / total_analisado * 100:.1f}%)"
+                     for titulo, quantidade in ativos.items()] or ["- Nenhum critério ativado"]
+    linhas_nunca = [f"- **{titulo}** (0%)" for titulo in nunca.index] or ["- Todos os critérios foram ativados"]
+    st.markdown(
+        "#### 📈 **Critérios Mais Ativos:**\n" + "\n".join(linhas_ativos)
+        + "\n\n#### ✅ **Critérios Nunca Ativados:**\n" + "\n".join(linhas_nunca)
+    )
 
     st.markdown("""
     #### 🎯 **Sugestões de Melhoria:**
@@ -879,12 +879,12 @@ elif pagina == "⚙️ Critérios de Auditoria":
     - Implementar novos critérios como: Consistência temporal, análise de padrões geográficos
     """)
 
-    st.markdown("""
+    st.markdown(f"""
     #### ⚙️ **Configuração Atual:**
-    - **Total de pontos possíveis:** 115
-    - **Limiar Alto Risco:** Score ≥ 60 pontos
-    - **Limiar Médio Risco:** 30 ≤ Score < 60 pontos
-    - **Limiar Baixo Risco:** Score < 30 pontos
+    - **Total de pontos possíveis:** {int(plano.pesos.sum())}
+    - **Limiar Alto Risco:** Score ≥ {plano.limiar_alto} pontos
+    - **Limiar Médio Risco:** {plano.limiar_medio} ≤ Score < {plano.limiar_alto} pontos
+    - **Limiar Baixo Risco:** Score < {plano.limiar_medio} pontos
     """)
 
 # Footer
@@ -12,6 +12,11 @@ from plotly.subplots import make_subplots
 from datetime import datetime
 import json
 
+from cache_resultados import resultados_compartilhados, versao_resultados
+from graficos import graficos_risco
+
+ARQUIVO_RESULTADOS = 'data/processed/PESCADORES_AUDITORIA_IA.parquet'
+
 # Configuração da página
 st.set_page_config(
     page_title="🔍 Audit-IA - Resultados da Auditoria",
@@ -59,9 +64,9 @@ class AuditIA:
         self.carregar_dados_analisados()
 
     def carregar_dados_analisados(self):
-        """Carregar dados já analisados do arquivo processado"""
+        """Carregar dados já analisados (cache compartilhado, relido só quando o arquivo muda)"""
         try:
-            self.df_analisado = pd.read_csv('data/processed/PESCADORES_AUDITORIA_IA.csv')
+            self.df_analisado = resultados_compartilhados(ARQUIVO_RESULTADOS)
             return True
         except Exception as e:
             st.error(f"Erro ao carregar dados analisados: {str(e)}")
@@ -112,33 +117,18 @@ if pagina == "📊 Dashboard":
 
         st.markdown("---")
 
-        # Gráficos
+        # Gráficos (contagens em NumPy; figuras montadas uma vez por versão dos resultados)
+        fig_risco, fig_score = graficos_risco(
+            versao_resultados(ARQUIVO_RESULTADOS), df['IA_Categoria_Risco'], df['IA_Score_Risco']
+        )
         col1, col2 = st.columns(2)
 
         with col1:
             # Distribuição de Risco
-            fig_risco = px.pie(
-                df,
-                names='IA_Categoria_Risco',
-                title='🎯 Distribuição de Risco',
-                color='IA_Categoria_Risco',
-                color_discrete_map={
-                    'ALTO': '#ff4444',
-                    'MEDIO': '#ffaa00',
-                    'BAIXO': '#00c851'
-                }
-            )
             st.plotly_chart(fig_risco, use_container_width=True)
 
         with col2:
             # Score de Risco
-            fig_score = px.histogram(
-                df,
-                x='IA_Score_Risco',
-                title='📈 Distribuição do Score de Risco',
-                nbins=20,
-                color_discrete_sequence=['#2196f3']
-            )
             st.plotly_chart(fig_score, use_container_width=True)
 
         # Resumo Estatístico
@@ -310,7 +300,7 @@ elif pagina == "📋 Relatórios Detalhados":
         st.markdown("---")
         st.markdown("### 🗺️ Análise por Estado")
 
-        uf_risco = df.groupby('uf').agg({
+        uf_risco = df.groupby('uf', observed=True).agg({
             'IA_Score_Risco': ['mean', 'count'],
             'IA_Categoria_Risco': lambda x: (x == 'ALTO').sum()
         }).round(2)
@@ -368,7 +358,7 @@ elif pagina == "📋 Relatórios Detalhados":
         if percentual_alto > 20:
             insights.append(f"🚨 **Alerta Vermelho**: {percentual_alto:.1f}% dos casos apresentam risco alto")
 
-        media_score_uf = df.groupby('uf')['IA_Score_Risco'].mean()
+        media_score_uf = df.groupby('uf', observed=True)['IA_Score_Risco'].mean()
         if len(media_score_uf) > 0:
             uf_max_risco = media_score_uf.idxmax()
             insights.append(f"🗺️ **Estado de Maior Risco**: {uf_max_risco} com score médio de {media_score_uf.max():.1f}")
@@ -386,7 +376,7 @@ elif pagina == "📋 Relatórios Detalhados":
         col1, col2 = st.columns(2)
 
         with col1:
-            st.markdown(f"**📁 Fonte de Dados**: data/processed/PESCADORES_AUDITORIA_IA.csv")
+            st.markdown(f"**📁 Fonte de Dados**: {ARQUIVO_RESULTADOS}")
             st.markdown(f"**📊 Total de Registros**: {len(df)} pescadores")
 
         with col2:
@@ -0,0 +1,191 @@
+"""
+🔍 Audit-IA - Banco de Resultados (SQLite)
+Resultados da auditoria em SQLite indexado: filtros e paginação resolvidos por consulta
+"""
+
+import os
+import sqlite3
+from contextlib import closing
+from pathlib import Path
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+ARQUIVO_BANCO = 'data/processed/PESCADORES_AUDITORIA.sqlite'
+TABELA = 'resultados'
+TABELA_CONTAGEM = 'contagem_score'
+
+# Ordem da listagem: maior score primeiro, desempate pelo RGP (registros sem RGP por último)
+ORDEM_PADRAO = 'risco_score DESC, rgp IS NULL, rgp'
+
+# Ordenações da listagem; cada uma é exatamente a ordem de um dos índices abaixo (página sem
+# ordenação no banco). Por UF e município, os de maior score vêm primeiro dentro de cada grupo.
+ORDENACOES = {
+    'risco_score': ORDEM_PADRAO,
+    'uf': 'uf, risco_score DESC, risco_categoria',
+    'municipio': 'municipio, risco_score DESC, risco_categoria',
+    'rgp': 'rgp, risco_score DESC, risco_categoria',
+}
+
+# Índices do banco: seguem as ordenações e trazem score e categoria, de modo que os filtros
+# são avaliados no próprio índice
+INDICES = {
+    'idx_risco_score': ['risco_score DESC', 'rgp IS NULL', 'rgp'],
+    'idx_risco_categoria': ['risco_categoria', 'risco_score DESC', 'rgp IS NULL', 'rgp'],
+    'idx_uf': ['uf', 'risco_score DESC', 'risco_categoria'],
+    'idx_municipio': ['municipio', 'risco_score DESC', 'risco_categoria'],
+    'idx_rgp': ['rgp', 'risco_score DESC', 'risco_categoria'],
+}
+
+
+def _tipo_sql(serie):
+    """Tipo da coluna no SQLite"""
+    if pd.api.types.is_bool_dtype(serie.dtype) or pd.api.types.is_integer_dtype(serie.dtype):
+        return 'INTEGER'
+    if pd.api.types.is_float_dtype(serie.dtype):
+        return 'REAL'
+    return 'TEXT'
+
+
+def _valores_sql(serie):
+    """Valores da coluna como tipos Python aceitos pelo sqlite3 (None para ausentes)"""
+    if pd.api.types.is_bool_dtype(serie.dtype):
+        serie = serie.astype('Int8')
+    elif pd.api.types.is_integer_dtype(serie.dtype):
+        serie = serie.astype('Int64')
+    valores = serie.astype(object)
+    return valores.where(serie.notna().to_numpy(), None).tolist()
+
+
+class EscritorSQLite:
+    """Gravar blocos de resultados em um banco SQLite novo (índices criados ao final)"""
+
+    def __init__(self, caminho):
+        self.caminho = Path(caminho)
+        self.temporario = self.caminho.with_name(f"{self.caminho.name}.{os.getpid()}.tmp")
+        if self.temporario.exists():
+            self.temporario.unlink()
+        self.conexao = sqlite3.connect(self.temporario)
+        self.conexao.execute('PRAGMA journal_mode = OFF')
+        self.conexao.execute('PRAGMA synchronous = OFF')
+        self.colunas = None
+
+    def escrever(self, df):
+        """Acrescentar um bloco de resultados (DataFrame)"""
+        if self.colunas is None:
+            self.colunas = list(df.columns)
+            definicao = ', '.join(f'"{c}" {_tipo_sql(df[c])}' for c in self.colunas)
+            self.conexao.execute(f'CREATE TABLE {TABELA} ({definicao})')
+
+        marcadores = ', '.join('?' * len(self.colunas))
+        linhas = zip(*(_valores_sql(df[c]) if c in df.columns else [None] * len(df) for c in self.colunas))
+        self.conexao.executemany(f'INSERT INTO {TABELA} VALUES ({marcadores})', linhas)
+
+    def fechar(self):
+        """Criar os índices e a contagem por score e publicar o banco (troca atômica do arquivo)"""
+        for nome, termos in INDICES.items():
+            if all(termo.split()[0] in self.colunas for termo in termos):
+                self.conexao.execute(f'CREATE INDEX {nome} ON {TABELA} ({", ".join(termos)})')
+
+        # Poucas linhas (categoria x score): o resumo dos filtros não percorre os registros
+        self.conexao.execute(
+            f'CREATE TABLE {TABELA_CONTAGEM} AS SELECT risco_categoria, risco_score, COUNT(*) AS total '
+            f'FROM {TABELA} GROUP BY risco_categoria, risco_score'
+        )
+        self.conexao.execute('ANALYZE')
+        self.conexao.commit()
+        self.conexao.close()
+        os.replace(self.temporario, self.caminho)
+
+    def descartar(self):
+        """Abandonar a gravação sem tocar no banco publicado"""
+        self.conexao.close()
+        if self.temporario.exists():
+            self.temporario.unlink()
+
+
+def salvar_banco(resultados, caminho=ARQUIVO_BANCO):
+    """Gravar o banco a partir de um DataFrame ou de um Parquet de resultados (um row group por vez)"""
+    escritor = EscritorSQLite(caminho)
+    try:
+        if isinstance(resultados, pd.DataFrame):
+            escritor.escrever(resultados)
+        else:
+            arquivo = pq.ParquetFile(resultados)
+            for i in range(arquivo.num_row_groups):
+                escritor.escrever(arquivo.read_row_group(i).to_pandas())
+        if escritor.colunas is None:
+            escritor.descartar()
+            return False
+        escritor.fechar()
+        return True
+    except Exception:
+        escritor.descartar()
+        raise
+
+
+def remover_banco(caminho=ARQUIVO_BANCO):
+    """Apagar o banco publicado, se houver (o painel só usa o banco da última execução)"""
+    if not Path(caminho).exists():
+        return False
+    Path(caminho).unlink()
+    return True
+
+
+def conectar(caminho=ARQUIVO_BANCO):
+    """Conexão somente leitura com o banco de resultados"""
+    if not Path(caminho).exists():
+        raise FileNotFoundError(f"Banco de resultados não encontrado: {caminho}")
+    return sqlite3.connect(f"{Path(caminho).resolve().as_uri()}?mode=ro", uri=True)
+
+
+def _filtro(categoria=None, score_minimo=None):
+    """Cláusula WHERE e parâmetros dos filtros da página de resultados"""
+    condicoes, parametros = [], []
+    if categoria:
+        condicoes.append('risco_categoria = ?')
+        parametros.append(categoria)
+    if score_minimo:
+        condicoes.append('risco_score >= ?')
+        parametros.append(int(score_minimo))
+    return (' WHERE ' + ' AND '.join(condicoes)) if condicoes else '', parametros
+
+
+def _ordem_sql(ordem=None, invertida=False):
+    """ORDER BY da ordenação pedida; invertida percorre o mesmo índice ao contrário"""
+    termos = [t.strip() for t in ORDENACOES[ordem or 'risco_score'].split(',')]
+    if invertida:
+        termos = [t[:-len(' DESC')] if t.endswith(' DESC') else f'{t} DESC' for t in termos]
+    return ', '.join(termos)
+
+
+def resumo_filtrado(caminho=ARQUIVO_BANCO, categoria=None, score_minimo=None):
+    """Total, score médio e casos de alto risco dos registros filtrados (pela contagem por score)"""
+    where, parametros = _filtro(categoria, score_minimo)
+    with closing(conectar(caminho)) as conexao:
+        total, soma, alto = conexao.execute(
+            f"SELECT SUM(total), SUM(risco_score * total), SUM(CASE WHEN risco_categoria = 'ALTO' THEN total END) "
+            f"FROM {TABELA_CONTAGEM}{where}",
+            parametros
+        ).fetchone()
+    total = total or 0
+    return {'total': total, 'score_medio': soma / total if total else 0.0, 'alto': alto or 0}
+
+
+def consultar_resultados(caminho=ARQUIVO_BANCO, categoria=None, score_minimo=None, limite=None, deslocamento=0,
+                         ordem=None, invertida=False):
+    """Registros filtrados na ordem pedida (padrão: maior score primeiro); só a página quando há limite"""
+    where, parametros = _filtro(categoria, score_minimo)
+    ordem_sql = _ordem_sql(ordem, invertida)
+    if limite is None:
+        sql = f"SELECT * FROM {TABELA}{where} ORDER BY {ordem_sql}"
+    else:
+        # A página é escolhida só no índice (rowid); apenas as linhas visíveis são lidas da tabela
+        sql = (
+            f"SELECT * FROM {TABELA} WHERE rowid IN "
+            f"(SELECT rowid FROM {TABELA}{where} ORDER BY {ordem_sql} LIMIT ? OFFSET ?) "
+            f"ORDER BY {ordem_sql}"
+        )
+        parametros += [int(limite), int(deslocamento)]
+    with closing(conectar(caminho)) as conexao:
+        return pd.read_sql_query(sql, conexao, params=parametros)
@@ -0,0 +1,420 @@
+#!/usr/bin/env python3
+"""
+⏱️ Audit-IA - Benchmark da Auditoria
+Mede cada etapa (carga CSV/Parquet, tokenização, normalização, critérios, Top-K, agregação por UF e páginas
+do Streamlit) sobre extratos sintéticos de tamanhos crescentes e compara com uma baseline
+"""
+
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ))
+
+from analise_50_resultados import COLUNAS_REGISTRO  # noqa: E402
+from gerar_extrato_sintetico import PERFIL_PADRAO, SEMENTE_PADRAO  # noqa: E402
+from mascaramento import tokenizar  # noqa: E402
+from motor_auditoria import (  # noqa: E402
+    AgregadosAuditoria, SeletorTopK, carregar_plano, colunas_auditoria, ler_csv_em_blocos, normalizar_categorias,
+    normalizar_datas, normalizar_flags, pontuar_com_registro, salvar_agregados, salvar_resultados
+)
+
+TAMANHOS_PADRAO = [1_000, 100_000, 1_000_000, 10_000_000]
+TAMANHO_BLOCO = 100_000
+PASTA_EXTRATOS = RAIZ / 'data' / 'benchmarks'
+PASTA_RESULTADOS = RAIZ / 'benchmarks' / 'resultados'
+ARQUIVO_BASELINE = RAIZ / 'benchmarks' / 'baseline.json'
+APLICACAO = RAIZ / 'audit_app_final.py'
+TOLERANCIA = 0.25
+REPETICOES = 3
+# Chave fixa da etapa de tokenização (o custo não depende da chave)
+CHAVE_TOKEN = b'audit-ia-benchmark-0000'
+
+# Etapas na ordem do relatório (as páginas não processam registros: sem vazão)
+ETAPAS = ['carga_csv', 'carga_parquet', 'tokenizacao', 'normalizacao', 'criterios', 'top_k', 'agregacao_uf', 'paginas']
+ETAPAS_SEM_VAZAO = {'paginas'}
+
+# Diferenças menores que estas não contam como regressão (ruído em extratos pequenos)
+FOLGA_SEGUNDOS = 0.05
+FOLGA_RSS_MB = 32
+
+
+# Pico de memória (RSS) por etapa
+def _zerar_pico():
+    """Zerar o pico de RSS do processo (Linux); devolve False onde não é possível"""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def _memoria_mb(campo='VmHWM'):
+    """Pico de RSS do processo (VmHWM, desde o último _zerar_pico no Linux) ou RSS atual (VmRSS), em MB"""
+    try:
+        with open('/proc/self/status') as f:
+            for linha in f:
+                if linha.startswith(f'{campo}:'):
+                    return int(linha.split()[1]) / 1024
+    except OSError:
+        pass
+    # Sem /proc: pico do processo inteiro (ru_maxrss em KB no Linux, em bytes no macOS)
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return pico / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+
+
+class Medidor:
+    """Acumular tempo e pico de RSS de cada etapa ao longo dos blocos
+
+    Além do pico absoluto, guarda o acréscimo: quanto a etapa subiu o RSS acima do que o
+    processo já usava ao começá-la (a medida comparada com a baseline, que não depende
+    do que ficou carregado antes).
+    """
+
+    def __init__(self):
+        self.segundos = {}
+        self.picos = {}
+        self.acrescimos = {}
+        self.pico_por_etapa = _zerar_pico()
+
+    def medir(self, etapa, funcao, *args, **kwargs):
+        """Executar funcao(*args, **kwargs) contando o tempo e a memória em etapa"""
+        _zerar_pico()
+        antes = _memoria_mb('VmRSS')
+        inicio = time.perf_counter()
+        resultado = funcao(*args, **kwargs)
+        self.segundos[etapa] = self.segundos.get(etapa, 0.0) + time.perf_counter() - inicio
+        pico = _memoria_mb()
+        self.picos[etapa] = max(self.picos.get(etapa, 0.0), pico)
+        self.acrescimos[etapa] = max(self.acrescimos.get(etapa, 0.0), pico - antes)
+        return resultado
+
+    def blocos(self, etapa, gerador):
+        """Percorrer um gerador de blocos contando o tempo de produzir cada um em etapa"""
+        fim = object()
+        while True:
+            bloco = self.medir(etapa, next, gerador, fim)
+            if bloco is fim:
+                return
+            yield bloco
+
+    @classmethod
+    def melhor(cls, medidores):
+        """Menor tempo de cada etapa entre repetições (menos ruído) e o maior pico de memória"""
+        combinado = cls()
+        combinado.pico_por_etapa = all(m.pico_por_etapa for m in medidores)
+        for etapa in ETAPAS:
+            if etapa in medidores[0].segundos:
+                combinado.segundos[etapa] = min(m.segundos[etapa] for m in medidores)
+                combinado.picos[etapa] = max(m.picos[etapa] for m in medidores)
+                combinado.acrescimos[etapa] = max(m.acrescimos[etapa] for m in medidores)
+        return combinado
+
+    def relatorio(self, registros):
+        """Segundos, registros por segundo e pico de RSS de cada etapa medida"""
+        return {
+            etapa: {
+                'segundos': round(self.segundos[etapa], 4),
+                'registros_por_s': (round(registros / self.segundos[etapa], 1)
+                                    if self.segundos[etapa] and etapa not in ETAPAS_SEM_VAZAO else None),
+                'pico_rss_mb': round(self.picos[etapa], 1),
+                'acrescimo_rss_mb': round(self.acrescimos[etapa], 1) if self.pico_por_etapa else None,
+            }
+            for etapa in ETAPAS if etapa in self.segundos
+        }
+
+
+# Extratos sintéticos (gerados uma vez e reaproveitados entre execuções)
+def preparar_extrato(registros, pasta, semente, perfil, workers, tamanho_bloco):
+    """CSV e Parquet sintéticos com `registros` linhas; refeitos só se o perfil mudou
+
+    A geração roda em outro processo, para não inflar a memória do processo medido.
+    """
+    pasta = Path(pasta)
+    nome = f"EXT_SINTETICO_{registros}_{Path(perfil).stem}_{semente}"
+    arquivos = {formato: pasta / f"{nome}.{formato}" for formato in ('csv', 'parquet')}
+    for arquivo in arquivos.values():
+        if arquivo.exists() and arquivo.stat().st_mtime >= Path(perfil).stat().st_mtime:
+            continue
+        print(f"🏭 Gerando {arquivo.name}...")
+        comando = [
+            sys.executable, str(RAIZ / 'gerar_extrato_sintetico.py'), '--registros', str(registros),
+            '--saida', str(arquivo), '--perfil', str(perfil), '--semente', str(semente),
+            '--bloco', str(tamanho_bloco), '--workers', str(workers),
+        ]
+        execucao = subprocess.run(comando, capture_output=True, text=True)
+        if execucao.returncode != 0:
+            raise RuntimeError(f"falha ao gerar {arquivo.name}: {execucao.stdout.strip().splitlines()[-1:]}")
+    return arquivos
+
+
+def _blocos_parquet(caminho, colunas, tamanho_bloco):
+    """Blocos de DataFrame lidos do Parquet, só com as colunas da auditoria (gerador)"""
+    arquivo = pq.ParquetFile(caminho)
+    presentes = [c for c in colunas if c in arquivo.schema_arrow.names]
+    for lote in arquivo.iter_batches(batch_size=tamanho_bloco, columns=presentes):
+        yield lote.to_pandas()
+
+
+def _tokenizar(bloco):
+    """CPF e nome tokenizados como no modo token do anonimizar_csv.py"""
+    return tokenizar(bloco['cpf'], CHAVE_TOKEN, 'cpf'), tokenizar(bloco['nome_pescador'], CHAVE_TOKEN, 'nome')
+
+
+def _normalizar(bloco):
+    """Datas, flags e categorias, como na auditoria em memória"""
+    bloco, _ = normalizar_datas(bloco)
+    bloco, _ = normalizar_flags(bloco)
+    bloco, _ = normalizar_categorias(bloco)
+    return bloco
+
+
+# Etapas
+def medir_auditoria(extratos, tamanho_bloco, medidor, k=50):
+    """Carga, tokenização, normalização, critérios, Top-K e agregação, bloco a bloco; devolve (total, Top-K, agregados)"""
+    plano = carregar_plano()
+    colunas = colunas_auditoria(COLUNAS_REGISTRO, plano)
+
+    # 1. Carga do Parquet (só leitura: as etapas seguintes usam os blocos do CSV)
+    for _ in medidor.blocos('carga_parquet', _blocos_parquet(extratos['parquet'], colunas, tamanho_bloco)):
+        pass
+
+    # 2. Carga do CSV e demais etapas sobre cada bloco
+    total = 0
+    seletor = SeletorTopK(k)
+    agregados = AgregadosAuditoria([r.titulo for r in plano.regras])
+    for bloco in medidor.blocos('carga_csv', ler_csv_em_blocos(extratos['csv'], colunas, tamanho_bloco)):
+        medidor.medir('tokenizacao', _tokenizar, bloco)
+        bloco = medidor.medir('normalizacao', _normalizar, bloco)
+        resultados = medidor.medir('criterios', pontuar_com_registro, bloco, COLUNAS_REGISTRO, plano)
+        medidor.medir('top_k', seletor.adicionar, resultados)
+        medidor.medir('agregacao_uf', agregados.adicionar, resultados, plano)
+        total += len(resultados)
+    return total, seletor.melhores, agregados
+
+
+def medir_paginas(melhores, agregados, medidor):
+    """Montar cada página do audit_app_final.py (sem servidor) sobre os resultados medidos
+
+    A primeira execução parte de caches vazios (leitura dos resultados e dos agregados);
+    as páginas seguintes são montadas com os caches já preenchidos, como na navegação.
+    """
+    import streamlit as st
+    from streamlit.logger import set_log_level
+    from streamlit.testing.v1 import AppTest
+
+    # Avisos de depreciação da aplicação não interessam às medições (a leitura da
+    # configuração redefine o nível, por isso ela é feita antes)
+    st.config.get_config_options()
+    set_log_level('error')
+
+    tempos = {}
+    diretorio = os.getcwd()
+    with tempfile.TemporaryDirectory() as pasta:
+        # A aplicação lê data/processed relativo ao diretório atual
+        processados = Path(pasta) / 'data' / 'processed'
+        processados.mkdir(parents=True)
+        salvar_resultados(melhores.reset_index(drop=True), processados / 'PESCADORES_AUDITORIA_50.parquet')
+        salvar_agregados(agregados, processados / 'PESCADORES_AUDITORIA_AGREGADOS.json')
+
+        os.chdir(pasta)
+        try:
+            st.cache_data.clear()
+            st.cache_resource.clear()
+            app = AppTest.from_file(str(APLICACAO), default_timeout=600)
+            medidor.medir('paginas', app.run)
+            paginas = app.sidebar.selectbox[0]
+            tempos[f"{paginas.value} (inicial)"] = round(medidor.segundos['paginas'], 4)
+            for pagina in paginas.options:
+                inicio = time.perf_counter()
+                medidor.medir('paginas', app.sidebar.selectbox[0].select(pagina).run)
+                tempos[pagina] = round(time.perf_counter() - inicio, 4)
+                if len(app.exception):
+                    raise RuntimeError(f"Erro na página {pagina}: {app.exception[0].message}")
+        finally:
+            os.chdir(diretorio)
+    return tempos
+
+
+def medir_tamanho(registros, args):
+    """Todas as etapas sobre o extrato de `registros` linhas"""
+    extratos = preparar_extrato(registros, args.pasta_extratos, args.semente, args.perfil, args.workers, args.bloco)
+    print(f"⏱️ {registros} registros ({extratos['csv'].stat().st_size / 1024 ** 2:.0f} MB em CSV)...")
+
+    resultado = {
+        'arquivo_csv_mb': round(extratos['csv'].stat().st_size / 1024 ** 2, 1),
+        'arquivo_parquet_mb': round(extratos['parquet'].stat().st_size / 1024 ** 2, 1),
+        'rss_inicial_mb': round(_memoria_mb('VmRSS'), 1),
+    }
+
+    # Cada repetição mede tudo de novo; fica o menor tempo de cada etapa e página
+    medidores, paginas = [], {}
+    for _ in range(max(1, args.repeticoes)):
+        medidor = Medidor()
+        total, melhores, agregados = medir_auditoria(extratos, args.bloco, medidor)
+        if not args.sem_paginas:
+            for pagina, segundos in medir_paginas(melhores, agregados, medidor).items():
+                paginas[pagina] = min(paginas.get(pagina, segundos), segundos)
+        medidores.append(medidor)
+    medidor = Medidor.melhor(medidores)
+
+    if paginas:
+        resultado['paginas'] = paginas
+    resultado['etapas'] = medidor.relatorio(total)
+    resultado['pico_por_etapa'] = medidor.pico_por_etapa
+
+    for etapa, medida in resultado['etapas'].items():
+        vazao = f"{medida['registros_por_s']:>12,.0f} reg/s" if medida['registros_por_s'] else ''
+        acrescimo = f"(+{medida['acrescimo_rss_mb']:.0f} MB)" if medida['acrescimo_rss_mb'] is not None else ''
+        print(f"   • {etapa:<14} {medida['segundos']:>9.3f}s {vazao:>18} {medida['pico_rss_mb']:>7.0f} MB {acrescimo}")
+    return resultado
+
+
+# Baseline
+def ambiente():
+    """Versões e máquina (baselines só são comparáveis no mesmo ambiente)"""
+    return {
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'pyarrow': pa.__version__,
+        'plataforma': platform.platform(),
+        'processador': platform.processor() or platform.machine(),
+        'nucleos': os.cpu_count(),
+    }
+
+
+def diferencas_baseline(atual, baseline):
+    """Itens do ambiente, bloco ou perfil em que a baseline difere destas medições"""
+    gravado, medido = baseline.get('ambiente') or {}, atual['ambiente']
+    diferencas = [f"{chave}: {gravado.get(chave)} -> {medido.get(chave)}"
+                  for chave in sorted(set(gravado) | set(medido)) if gravado.get(chave) != medido.get(chave)]
+    for chave in ('bloco', 'perfil'):
+        if baseline.get(chave) != atual.get(chave):
+            diferencas.append(f"{chave}: {baseline.get(chave)} -> {atual.get(chave)}")
+    return diferencas
+
+
+def comparar(atual, baseline, tolerancia=TOLERANCIA):
+    """Etapas mais lentas ou com mais memória que a baseline além da tolerância
+
+    Só são comparados os tamanhos e etapas presentes nas duas medições; a memória é o
+    acréscimo de RSS da etapa. Devolve uma lista de (tamanho, etapa, medida, baseline, atual),
+    ou None quando a baseline foi medida em outro ambiente (máquina, versões, bloco ou perfil).
+    """
+    if diferencas_baseline(atual, baseline):
+        return None
+
+    regressoes = []
+    for tamanho, medicao in atual['tamanhos'].items():
+        referencia = baseline.get('tamanhos', {}).get(tamanho)
+        if referencia is None:
+            continue
+        for etapa, medida in medicao['etapas'].items():
+            anterior = referencia['etapas'].get(etapa)
+            if anterior is None:
+                continue
+            for chave, folga in (('segundos', FOLGA_SEGUNDOS), ('acrescimo_rss_mb', FOLGA_RSS_MB)):
+                if medida.get(chave) is None or anterior.get(chave) is None:
+                    continue
+                if medida[chave] > anterior[chave] * (1 + tolerancia) and medida[chave] - anterior[chave] > folga:
+                    regressoes.append((tamanho, etapa, chave, anterior[chave], medida[chave]))
+    return regressoes
+
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description="Audit-IA - Benchmark das etapas da auditoria")
+    parser.add_argument("--tamanhos", type=int, nargs='+', default=TAMANHOS_PADRAO,
+                        help="Registros de cada extrato sintético medido")
+    parser.add_argument("--bloco", type=int, default=TAMANHO_BLOCO, help="Registros por bloco (como --bloco da auditoria)")
+    parser.add_argument("--semente", type=int, default=SEMENTE_PADRAO, help="Semente dos extratos sintéticos")
+    parser.add_argument("--perfil", default=str(PERFIL_PADRAO), help="Perfil de colunas dos extratos sintéticos")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Processos para gerar os extratos (as etapas medidas usam um só processo)")
+    parser.add_argument("--pasta-extratos", default=str(PASTA_EXTRATOS),
+                        help="Onde os extratos sintéticos ficam guardados entre execuções")
+    parser.add_argument("--saida", help="JSON com as medições (padrão: benchmarks/resultados/benchmark_<data>.json)")
+    parser.add_argument("--baseline", default=str(ARQUIVO_BASELINE), help="JSON de referência para comparação")
+    parser.add_argument("--salvar-baseline", action="store_true", help="Gravar estas medições como a nova baseline")
+    parser.add_argument("--tolerancia", type=float, default=TOLERANCIA,
+                        help="Aumento relativo (tempo ou memória) tolerado antes de acusar regressão")
+    parser.add_argument("--repeticoes", type=int, default=REPETICOES,
+                        help="Medições de cada tamanho; fica o menor tempo de cada etapa")
+    parser.add_argument("--sem-paginas", action="store_true", help="Não medir a montagem das páginas do Streamlit")
+    args = parser.parse_args()
+
+    print("⏱️ AUDIT-IA - BENCHMARK DA AUDITORIA")
+    print("=" * 50)
+
+    medicoes = {
+        'data': datetime.now().isoformat(timespec='seconds'),
+        'ambiente': ambiente(),
+        'bloco': args.bloco,
+        'semente': args.semente,
+        'repeticoes': args.repeticoes,
+        'perfil': Path(args.perfil).name,
+        'tamanhos': {},
+    }
+    try:
+        for registros in args.tamanhos:
+            medicoes['tamanhos'][str(registros)] = medir_tamanho(registros, args)
+    except Exception as e:
+        print(f"❌ Erro no benchmark: {str(e)}")
+        return False
+
+    saida = Path(args.saida) if args.saida else PASTA_RESULTADOS / f"benchmark_{datetime.now():%Y%m%d_%H%M%S}.json"
+    saida.parent.mkdir(parents=True, exist_ok=True)
+    with open(saida, 'w', encoding='utf-8') as f:
+        json.dump(medicoes, f, ensure_ascii=False, indent=2)
+    print(f"\n💾 Medições salvas em: {saida}")
+
+    if args.salvar_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(medicoes, f, ensure_ascii=False, indent=2)
+        print(f"✅ Baseline atualizada: {args.baseline}")
+        return True
+
+    if not Path(args.baseline).exists():
+        print(f"ℹ️ Sem baseline em {args.baseline}: use --salvar-baseline para criar uma")
+        return True
+
+    with open(args.baseline, encoding='utf-8') as f:
+        baseline = json.load(f)
+
+    regressoes = comparar(medicoes, baseline, args.tolerancia)
+    if regressoes is None:
+        # Tempos de outra máquina ou de outras versões não dizem nada sobre regressões
+        print("⚠️ Baseline medida em outro ambiente: comparação ignorada "
+              "(use --salvar-baseline para medir a referência nesta máquina)")
+        for diferenca in diferencas_baseline(medicoes, baseline):
+            print(f"   • {diferenca}")
+        return True
+    if not regressoes:
+        print(f"✅ Nenhuma regressão acima de {args.tolerancia:.0%} em relação à baseline")
+        return True
+
+    print(f"🚨 {len(regressoes)} regressão(ões) acima de {args.tolerancia:.0%} em relação à baseline:")
+    for tamanho, etapa, chave, anterior, atual in regressoes:
+        print(f"   • {tamanho} registros, {etapa}: {chave} {anterior} -> {atual} ({atual / anterior - 1:+.0%})")
+    return False
+
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
@@ -0,0 +1,182 @@
+"""
+🔍 Audit-IA - Cache de Saídas da Auditoria
+Saídas endereçadas pelo conteúdo: hash do extrato, das regras e do código de pontuação
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+
+import mascaramento
+import motor_auditoria
+from motor_auditoria import carregar_plano
+
+PASTA_CACHE_AUDITORIA = Path('data/processed/.cache/auditoria')
+LIMITE_CACHE_MB = 2048
+ARQUIVO_HASHES = 'hashes.json'
+
+
+def _sha256_arquivo(caminho, tamanho_bloco=1 << 20):
+    """SHA-256 do conteúdo de um arquivo, lido em blocos"""
+    sha = hashlib.sha256()
+    with open(caminho, 'rb') as f:
+        for bloco in iter(lambda: f.read(tamanho_bloco), b''):
+            sha.update(bloco)
+    return sha.hexdigest()
+
+
+def hash_arquivo(caminho, pasta=PASTA_CACHE_AUDITORIA):
+    """Hash do extrato; só é recalculado quando caminho, tamanho ou data de modificação mudam"""
+    caminho = Path(caminho).resolve()
+    info = caminho.stat()
+    marca = f"{caminho}|{info.st_size}|{info.st_mtime_ns}"
+
+    registro = Path(pasta) / ARQUIVO_HASHES
+    try:
+        with open(registro, encoding='utf-8') as f:
+            conhecidos = json.load(f)
+    except (OSError, ValueError):
+        conhecidos = {}
+
+    if conhecidos.get(str(caminho), {}).get('marca') != marca:
+        conhecidos[str(caminho)] = {'marca': marca, 'sha256': _sha256_arquivo(caminho)}
+        Path(pasta).mkdir(parents=True, exist_ok=True)
+        temporario = registro.with_suffix(f'.{os.getpid()}.tmp')
+        with open(temporario, 'w', encoding='utf-8') as f:
+            json.dump(conhecidos, f, ensure_ascii=False, indent=2)
+        os.replace(temporario, registro)
+    return conhecidos[str(caminho)]['sha256']
+
+
+def hash_regras(plano=None):
+    """Hash das regras e limiares do config.json"""
+    plano = plano or carregar_plano()
+    assinatura = json.dumps({
+        'regras': plano.definicoes,
+        'limiares': [plano.limiar_alto, plano.limiar_medio],
+    }, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(assinatura.encode('utf-8')).hexdigest()
+
+
+def versao_codigo():
+    """Versão do código que gera as saídas: hash dos fontes de motor_auditoria.py e mascaramento.py"""
+    modulos = (motor_auditoria, mascaramento)
+    return hashlib.sha256(''.join(_sha256_arquivo(m.__file__) for m in modulos).encode('ascii')).hexdigest()
+
+
+def chave_auditoria(arquivo_entrada, colunas_registro, k, plano=None, pasta=PASTA_CACHE_AUDITORIA):
+    """Chave do cache: muda se o extrato, as regras, o código ou a seleção (colunas, k) mudarem"""
+    partes = {
+        'entrada': hash_arquivo(arquivo_entrada, pasta),
+        'regras': hash_regras(plano),
+        'codigo': versao_codigo(),
+        'colunas_registro': list(colunas_registro),
+        'k': k,
+    }
+    return hashlib.sha256(json.dumps(partes, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def _entradas(pasta):
+    """Entradas completas do cache (diretórios com manifesto)"""
+    pasta = Path(pasta)
+    if not pasta.exists():
+        return []
+    return [d for d in pasta.iterdir() if d.is_dir() and (d / 'manifesto.json').exists()]
+
+
+def _tamanho(entrada):
+    return sum(f.stat().st_size for f in entrada.iterdir() if f.is_file())
+
+
+def buscar_cache(chave, pasta=PASTA_CACHE_AUDITORIA):
+    """Arquivos guardados para a chave ({nome: caminho}), ou None se não houver entrada"""
+    entrada = Path(pasta) / chave
+    try:
+        with open(entrada / 'manifesto.json', encoding='utf-8') as f:
+            manifesto = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    arquivos = {nome: entrada / arquivo for nome, arquivo in manifesto['arquivos'].items()}
+    if not all(caminho.exists() for caminho in arquivos.values()):
+        return None
+
+    # Uso recente: a entrada fica por último na fila de despejo
+    os.utime(entrada / 'manifesto.json')
+    return arquivos
+
+
+def guardar_cache(chave, arquivos, pasta=PASTA_CACHE_AUDITORIA, limite_mb=LIMITE_CACHE_MB):
+    """Copiar as saídas de uma execução para a entrada da chave e despejar as entradas antigas"""
+    pasta = Path(pasta)
+    entrada = pasta / chave
+    temporario = pasta / f".{chave}.{os.getpid()}.tmp"
+    shutil.rmtree(temporario, ignore_errors=True)
+    temporario.mkdir(parents=True)
+
+    try:
+        manifesto = {'criado_em': time.time(), 'arquivos': {}}
+        for nome, origem in arquivos.items():
+            destino = f"{nome}{Path(origem).suffix}"
+            shutil.copyfile(origem, temporario / destino)
+            manifesto['arquivos'][nome] = destino
+        with open(temporario / 'manifesto.json', 'w', encoding='utf-8') as f:
+            json.dump(manifesto, f, ensure_ascii=False, indent=2)
+
+        # Publicar a entrada inteira de uma vez
+        shutil.rmtree(entrada, ignore_errors=True)
+        os.replace(temporario, entrada)
+    finally:
+        shutil.rmtree(temporario, ignore_errors=True)
+
+    return limpar_cache(limite_mb, pasta, manter=chave)
+
+
+def acrescentar_cache(chave, nome, origem, pasta=PASTA_CACHE_AUDITORIA, limite_mb=LIMITE_CACHE_MB):
+    """Acrescentar uma saída a uma entrada existente (ex.: banco SQLite montado depois)"""
+    entrada = Path(pasta) / chave
+    with open(entrada / 'manifesto.json', encoding='utf-8') as f:
+        manifesto = json.load(f)
+
+    destino = f"{nome}{Path(origem).suffix}"
+    restaurar_arquivo(origem, entrada / destino)
+    manifesto['arquivos'][nome] = destino
+
+    temporario = entrada / f"manifesto.{os.getpid()}.tmp"
+    with open(temporario, 'w', encoding='utf-8') as f:
+        json.dump(manifesto, f, ensure_ascii=False, indent=2)
+    os.replace(temporario, entrada / 'manifesto.json')
+    return limpar_cache(limite_mb, pasta, manter=chave)
+
+
+def limpar_cache(limite_mb=LIMITE_CACHE_MB, pasta=PASTA_CACHE_AUDITORIA, manter=None):
+    """Remover as entradas usadas há mais tempo até o cache caber no limite (devolve quantas saíram)"""
+    entradas = sorted(_entradas(pasta), key=lambda d: (d / 'manifesto.json').stat().st_mtime)
+    tamanhos = {entrada: _tamanho(entrada) for entrada in entradas}
+    total = sum(tamanhos.values())
+    limite = limite_mb * 1024 * 1024
+
+    removidas = 0
+    for entrada in entradas:
+        if total <= limite:
+            break
+        if entrada.name == manter:
+            continue
+        shutil.rmtree(entrada, ignore_errors=True)
+        total -= tamanhos[entrada]
+        removidas += 1
+    return removidas
+
+
+def restaurar_arquivo(origem, destino):
+    """Copiar um arquivo do cache para o destino (troca atômica; o cache nunca é aberto para escrita)"""
+    temporario = Path(f"{destino}.{os.getpid()}.tmp")
+    try:
+        shutil.copyfile(origem, temporario)
+        os.replace(temporario, destino)
+    except BaseException:
+        temporario.unlink(missing_ok=True)
+        raise
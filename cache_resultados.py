@@ -0,0 +1,99 @@
+"""
+🔍 Audit-IA - Cache Compartilhado dos Resultados
+Resultados em Arrow IPC mapeado em memória, mantidos uma única vez por processo do Streamlit
+
+As colunas de texto do DataFrame apontam para o arquivo mapeado (sem cópia); score, bits,
+flags e códigos das categorias são decodificados uma vez por processo (poucos bytes por registro).
+"""
+
+import os
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import streamlit as st
+
+from motor_auditoria import carregar_resultados
+
+PASTA_CACHE = Path('data/processed/.cache')
+# Muda quando o conteúdo gerado muda (ex.: colunas mascaradas): IPCs antigos são refeitos
+FORMATO_IPC = 2
+
+
+def _fonte(caminho):
+    """Arquivo de onde os resultados são lidos (Parquet ou o CSV antigo de mesmo nome)"""
+    caminho = Path(caminho)
+    if caminho.exists():
+        return caminho
+    legado = caminho.with_suffix('.csv')
+    if legado.exists():
+        return legado
+    raise FileNotFoundError(f"Resultados não encontrados: {caminho}")
+
+
+def versao_resultados(caminho):
+    """Versão dos resultados: muda sempre que o arquivo é regravado"""
+    info = _fonte(caminho).stat()
+    return info.st_mtime_ns, info.st_size
+
+
+def gerar_ipc(caminho, versao):
+    """Converter os resultados para Arrow IPC (uma vez por versão do arquivo)"""
+    PASTA_CACHE.mkdir(parents=True, exist_ok=True)
+    nome = Path(caminho).stem
+    destino = PASTA_CACHE / f"{nome}-f{FORMATO_IPC}-{versao[0]}-{versao[1]}.arrow"
+
+    if not destino.exists():
+        tabela = pa.Table.from_pandas(carregar_resultados(caminho), preserve_index=False)
+
+        # Gravar em arquivo temporário e renomear: outro processo nunca vê um IPC pela metade
+        temporario = destino.with_suffix(f'.{os.getpid()}.tmp')
+        with pa.OSFile(str(temporario), 'wb') as arquivo:
+            with pa.ipc.new_file(arquivo, tabela.schema) as escritor:
+                escritor.write_table(tabela)
+        os.replace(temporario, destino)
+
+        # Versões antigas do mesmo arquivo não são mais usadas
+        for antigo in PASTA_CACHE.glob(f"{nome}-*.arrow"):
+            if antigo != destino:
+                try:
+                    antigo.unlink()
+                except OSError:
+                    pass
+    return destino
+
+
+def abrir_ipc(arquivo_ipc):
+    """Tabela Arrow apontando para o arquivo mapeado em memória (sem cópia dos dados)"""
+    return pa.ipc.open_file(pa.memory_map(str(arquivo_ipc), 'r')).read_all()
+
+
+def _tipo_pandas(tipo):
+    """Texto do Arrow como StringDtype('pyarrow'), que usa os buffers do Arrow (nunca object)"""
+    if pa.types.is_string(tipo) or pa.types.is_large_string(tipo):
+        return pd.StringDtype('pyarrow')
+    return None
+
+
+@st.cache_resource(max_entries=8, show_spinner=False)
+def _resultados_por_versao(caminho, versao):
+    """Tabela mapeada e DataFrame dos resultados: um por processo e versão do arquivo"""
+    tabela = abrir_ipc(gerar_ipc(caminho, versao))
+    # Blocos separados: as colunas não são copiadas para um bloco consolidado
+    return tabela, tabela.to_pandas(types_mapper=_tipo_pandas, split_blocks=True)
+
+
+def tabela_compartilhada(caminho):
+    """Tabela Arrow dos resultados para acesso às colunas sem cópia"""
+    tabela, _ = _resultados_por_versao(str(caminho), versao_resultados(caminho))
+    return tabela
+
+
+def resultados_compartilhados(caminho):
+    """DataFrame dos resultados compartilhado entre as sessões
+
+    Devolve uma cópia rasa: a sessão pode acrescentar colunas sem alterar o objeto
+    compartilhado.
+    """
+    _, df = _resultados_por_versao(str(caminho), versao_resultados(caminho))
+    return df.copy(deep=False)
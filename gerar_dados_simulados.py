@@ -9,6 +9,11 @@ import numpy as np
 from datetime import datetime, timedelta
 import random
 
+from motor_auditoria import ler_csv, mascarar_resultados, salvar_resultados
+
+# Colunas do extrato usadas na simulação e no relatório
+COLUNAS_SIMULACAO = ['cpf', 'nome_pescador', 'rgp', 'municipio', 'uf', 'st_situacao_pescador']
+
 def gerar_justificativas(risco_score, row):
     """Gera justificativas baseadas no perfil e score"""
     justificativas = []
@@ -55,11 +60,9 @@ def gerar_dados_simulados():
 
     # Ler dados originais (se existirem)
     try:
-        df_original = pd.read_csv("data/raw/EXT_PESCADORES.csv")
-        print(f"✅ Dataset original carregado: {len(df_original)} registros")
-
-        # Limitar para 1000 registros para PoC
-        df = df_original.head(1000).copy()
+        # Limitar para 1000 registros para PoC (só as colunas usadas)
+        df = ler_csv("data/raw/EXT_PESCADORES.csv", COLUNAS_SIMULACAO, nrows=1000)
+        print(f"✅ Dataset original carregado: {len(df)} registros")
 
     except FileNotFoundError:
         print("⚠️ Arquivo original não encontrado. Gerando dataset simulado...")
@@ -108,10 +111,11 @@ def gerar_dados_simulados():
     df['IA_Data_Analise'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
     df['IA_Versao_Modelo'] = 'Llama-3-8B-Instruct-v1.0'
     df['IA_Status_Processamento'] = 'CONCLUIDO'
+    mascarar_resultados(df)
 
     # Salvar dataset enriquecido
-    arquivo_saida = "data/processed/PESCADORES_AUDITORIA_IA.csv"
-    df.to_csv(arquivo_saida, index=False, encoding='utf-8-sig')
+    arquivo_saida = "data/processed/PESCADORES_AUDITORIA_IA.parquet"
+    salvar_resultados(df, arquivo_saida)
 
     print(f"✅ Dataset enriquecido salvo em: {arquivo_saida}")
     print(f"📊 Estatísticas:")
@@ -187,7 +191,7 @@ if __name__ == "__main__":
 
     print("\n✅ Processo concluído com sucesso!")
     print("\n📂 Arquivos gerados:")
-    print("   - data/processed/PESCADORES_AUDITORIA_IA.csv")
+    print("   - data/processed/PESCADORES_AUDITORIA_IA.parquet")
     print("   - docs/RELATORIO_AUDITORIA_IA.md")
     print("\n🚀 Para testar o sistema, execute:")
     print("   streamlit run audit_app.py")
\ No newline at end of file
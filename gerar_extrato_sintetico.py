@@ -0,0 +1,688 @@
+"""
+🎲 Audit-IA - Extrato Sintético para Testes de Carga
+Gera N registros no layout do EXT_PESCADORES.csv descrito por um perfil (distribuição e nulos de cada
+coluna), vetorizado e em blocos (saída CSV ou Parquet); o perfil pode ser derivado de um extrato real
+"""
+
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from motor_auditoria import (
+    FORMATOS_DATA, VALORES_FALSOS, VALORES_VERDADEIROS, EscritorExtrato, juntar_partes, ler_csv_em_blocos
+)
+
+ARQUIVO_SINTETICO = 'data/raw/EXT_PESCADORES_SINTETICO.csv'
+PERFIL_PADRAO = Path(__file__).parent / "models" / "perfil_extrato.json"
+PERFIL_DERIVADO = Path(__file__).parent / "models" / "perfil_extrato_derivado.json"
+TAMANHO_BLOCO = 100_000
+SEMENTE_PADRAO = 42
+
+# Nomes de pessoas: nunca saem do extrato real, nem no perfil derivado
+PRENOMES = [
+    'JOSE', 'MARIA', 'JOAO', 'ANTONIO', 'FRANCISCO', 'ANA', 'RAIMUNDO', 'FRANCISCA', 'MANOEL',
+    'ANTONIA', 'PEDRO', 'RAIMUNDA', 'PAULO', 'LUCIA', 'CARLOS', 'SEBASTIAO', 'EDILSON', 'MARCOS'
+]
+SOBRENOMES = [
+    'DA SILVA', 'DOS SANTOS', 'PEREIRA', 'ALVES', 'FERREIRA', 'RODRIGUES', 'SOUSA', 'LIMA', 'COSTA',
+    'OLIVEIRA', 'CARDOSO', 'NASCIMENTO', 'PINHEIRO', 'MONTEIRO', 'BARROS', 'FARIAS', 'MIRANDA'
+]
+
+TIPOS_COLUNA = [
+    'sequencial', 'cpf', 'nome', 'rgp', 'uf', 'municipio', 'categoria', 'flag', 'data', 'inteiro', 'decimal',
+    'digitos', 'texto'
+]
+
+# Derivação do perfil a partir de um extrato real
+VALORES_NULOS = {'', 'NULL', 'NAN', 'NONE'}
+LIMITE_CATEGORIAS = 100   # colunas com até tantos valores distintos viram categoria
+MINIMO_OCORRENCIAS = 10   # valores mais raros não entram no perfil (não expõem registros individuais)
+FRACAO_TIPO = 0.95        # fração dos valores preenchidos que precisa casar com um tipo
+COLUNAS_IDENTIFICACAO = {
+    'cpf': 'cpf', 'rgp': 'rgp', 'nome_pescador': 'nome', 'nome_mae': 'nome', 'nome_pai': 'nome',
+    'uf': 'uf', 'municipio': 'municipio'
+}
+_OPOSTOS_FLAG = {'SIM': 'NAO', 'NAO': 'SIM', 'NÃO': 'SIM', 'S': 'N', 'N': 'S', 'TRUE': 'FALSE', 'FALSE': 'TRUE',
+                 'VERDADEIRO': 'FALSO', 'FALSO': 'VERDADEIRO', '1': '0', '0': '1', '1.0': '0.0', '0.0': '1.0'}
+# Coluna de município -> município com que ela costuma coincidir (área de pesca x endereço)
+PARES_MUNICIPIO = {'nome_municipio': 'municipio'}
+
+_EPOCA = np.datetime64('1970-01-01', 'D')
+_LETRAS = np.frombuffer(b'ABCDEFGHIJKLMNOPQRSTUVWXYZ', dtype=np.uint8)
+# Letras e alguns espaços: palavras de tamanho variado
+_ALFABETO = np.frombuffer(b'ABCDEFGHIJKLMNOPQRSTUVWXYZ    ', dtype=np.uint8)
+
+
+class PerfilExtrato:
+    """Perfil do extrato validado: colunas, ordem de geração e tabelas de UF e município"""
+
+    def __init__(self, definicao):
+        self.definicao = definicao
+        self.colunas = [dict(c) for c in definicao['colunas']]
+        self.nomes = [c['nome'] for c in self.colunas]
+        self.formato_data = definicao.get('formato_data', '%Y-%m-%d')
+        self.valores_flag = list(definicao.get('valores_flag', ['SIM', 'NAO']))
+
+        repetidas = sorted({n for n in self.nomes if self.nomes.count(n) > 1})
+        if repetidas:
+            raise ValueError(f"Colunas repetidas no perfil: {', '.join(repetidas)}")
+        for coluna in self.colunas:
+            if coluna.get('tipo') not in TIPOS_COLUNA:
+                raise ValueError(f"Tipo desconhecido na coluna {coluna['nome']}: {coluna.get('tipo')}")
+            if not 0 <= coluna.get('nulos', 0) <= 1:
+                raise ValueError(f"Fração de nulos fora de [0, 1] na coluna {coluna['nome']}")
+
+        # Municípios de todas as UFs em um só vetor; cada UF ocupa uma faixa contígua
+        ufs = definicao.get('ufs', {})
+        self.ufs = np.array(list(ufs), dtype=object)
+        pesos = np.array([ufs[uf].get('peso', 1) for uf in self.ufs], dtype=np.float64)
+        self.pesos_uf = pesos / pesos.sum() if len(pesos) else pesos
+        self.municipios = np.array([m for uf in self.ufs for m in ufs[uf].get('municipios', [])], dtype=object)
+        self.qtd_municipios = np.array([len(ufs[uf].get('municipios', [])) for uf in self.ufs], dtype=np.int64)
+        self.inicio_municipios = np.concatenate([[0], np.cumsum(self.qtd_municipios)[:-1]]).astype(np.int64)
+        # Pesos dos municípios (iguais se omitidos) somando 1 em cada UF: a UF k ocupa [k, k + 1) no acumulado
+        pesos_municipios = [
+            np.asarray(ufs[uf].get('pesos', [1] * len(ufs[uf].get('municipios', []))), dtype=np.float64)
+            for uf in self.ufs
+        ]
+        if any(len(p) != q for p, q in zip(pesos_municipios, self.qtd_municipios)):
+            raise ValueError("Os 'pesos' de cada UF precisam ter um valor por município")
+        self.pesos_municipios = np.concatenate([p / p.sum() for p in pesos_municipios if len(p)] or [np.zeros(0)])
+        self.acumulado_municipios = np.concatenate(
+            [k + np.cumsum(p / p.sum()) for k, p in enumerate(pesos_municipios) if len(p)] or [np.zeros(0)]
+        )
+
+        tipos = {c['nome']: c['tipo'] for c in self.colunas}
+        if any(t in ('uf', 'rgp', 'municipio') for t in tipos.values()) and not len(self.ufs):
+            raise ValueError("Perfil com colunas de UF sem a tabela 'ufs'")
+        if 'municipio' in tipos.values() and (self.qtd_municipios == 0).any():
+            raise ValueError("Toda UF do perfil precisa de ao menos um município")
+        for coluna in self.colunas:
+            if coluna['tipo'] in ('rgp', 'municipio') and tipos.get(coluna.get('uf', 'uf')) != 'uf':
+                raise ValueError(f"Coluna {coluna['nome']} precisa de uma coluna de UF ({coluna.get('uf', 'uf')})")
+            if coluna['tipo'] == 'data' and 'relativa_a' not in coluna and not {'inicio', 'fim'} <= set(coluna):
+                raise ValueError(f"Coluna de data {coluna['nome']} sem 'inicio' e 'fim' (ou 'relativa_a')")
+        self.ordem = _ordem_geracao(self.colunas)
+
+
+def _dependencias(coluna):
+    """Colunas que precisam ser geradas antes desta"""
+    dependencias = [coluna.get(chave) for chave in ('relativa_a', 'ate', 'igual_a')]
+    if coluna['tipo'] in ('rgp', 'municipio'):
+        dependencias.append(coluna.get('uf', 'uf'))
+    return [d for d in dependencias if d]
+
+
+def _ordem_geracao(colunas):
+    """Colunas em uma ordem em que cada uma vem depois das que ela usa"""
+    nomes = {c['nome'] for c in colunas}
+    for coluna in colunas:
+        ausentes = [d for d in _dependencias(coluna) if d not in nomes]
+        if ausentes:
+            raise ValueError(f"Coluna {coluna['nome']} depende de {', '.join(ausentes)}, ausente do perfil")
+
+    ordem, geradas, pendentes = [], set(), list(colunas)
+    while pendentes:
+        prontas = [c for c in pendentes if set(_dependencias(c)) <= geradas]
+        if not prontas:
+            raise ValueError(f"Dependência circular entre: {', '.join(c['nome'] for c in pendentes)}")
+        ordem += prontas
+        geradas |= {c['nome'] for c in prontas}
+        pendentes = [c for c in pendentes if c['nome'] not in geradas]
+    return ordem
+
+
+def carregar_perfil(caminho=PERFIL_PADRAO):
+    """Carregar e validar o perfil (JSON) do extrato"""
+    with open(caminho, encoding='utf-8') as f:
+        return PerfilExtrato(json.load(f))
+
+
+def salvar_perfil(definicao, caminho):
+    """Gravar o perfil em JSON com uma coluna (e uma UF) por linha, para edição à mão"""
+    linhas = []
+    for chave, valor in definicao.items():
+        if chave == 'ufs':
+            itens = [f'    {json.dumps(uf)}: {json.dumps(d, ensure_ascii=False)}' for uf, d in valor.items()]
+            linhas.append(f'  "{chave}": {{\n' + ',\n'.join(itens) + '\n  }')
+        elif chave == 'colunas':
+            itens = [f'    {json.dumps(c, ensure_ascii=False)}' for c in valor]
+            linhas.append(f'  "{chave}": [\n' + ',\n'.join(itens) + '\n  ]')
+        else:
+            linhas.append(f'  {json.dumps(chave)}: {json.dumps(valor, ensure_ascii=False)}')
+    Path(caminho).parent.mkdir(parents=True, exist_ok=True)
+    with open(caminho, 'w', encoding='utf-8') as f:
+        f.write('{\n' + ',\n'.join(linhas) + '\n}\n')
+
+
+# Geração vetorizada de cada tipo de coluna
+
+def _textos_ascii(codigos):
+    """Matriz (registros x caracteres) de bytes ASCII como textos (zeros à direita são descartados)"""
+    largura = codigos.shape[1]
+    return np.ascontiguousarray(codigos).view(f'S{largura}').ravel().astype(f'U{largura}').astype(object)
+
+
+def _digitos(valores, largura):
+    """Inteiros como texto de `largura` dígitos, com zeros à esquerda (sem laço em Python)"""
+    potencias = 10 ** np.arange(largura - 1, -1, -1, dtype=np.int64)
+    return _textos_ascii(((np.asarray(valores, dtype=np.int64)[:, None] // potencias) % 10 + ord('0')).astype(np.uint8))
+
+
+def _dias(data):
+    """Dias desde 1970-01-01 até a data (AAAA-MM-DD)"""
+    return int((np.datetime64(data, 'D') - _EPOCA).astype(np.int64))
+
+
+def _datas(dias, formato):
+    """Dias desde 1970-01-01 como texto no formato pedido (cada data distinta formatada uma vez)"""
+    unicos, posicoes = np.unique(dias, return_inverse=True)
+    if formato == '%Y-%m-%d':
+        textos = (_EPOCA + unicos).astype(str).astype(object)
+    else:
+        textos = pd.to_datetime(unicos, unit='D').strftime(formato).to_numpy(dtype=object)
+    return textos[posicoes]
+
+
+class _Bloco:
+    """Estado da geração de um bloco: sorteador, ids e valores brutos das colunas já geradas"""
+
+    def __init__(self, rng, ids, perfil):
+        self.rng = rng
+        self.ids = ids
+        self.perfil = perfil
+        self.ufs = {}         # coluna de UF -> índice da UF no perfil
+        self.municipios = {}  # coluna de município -> índice do município no perfil
+        self.dias = {}        # coluna de data -> dias desde 1970 (antes dos nulos)
+
+
+def _gerar_sequencial(bloco, coluna, n):
+    return (bloco.ids + int(coluna.get('inicio', 1))).astype(str).astype(object)
+
+
+def _gerar_cpf(bloco, coluna, n):
+    # Únicos: permutação afim dos ids, módulo 10^11
+    return _digitos((bloco.ids * 48_271_937 + 7_368_421) % 10**11, 11)
+
+
+def _gerar_nome(bloco, coluna, n):
+    rng = bloco.rng
+    return (
+        np.asarray(PRENOMES, dtype=object)[rng.integers(0, len(PRENOMES), n)] + ' '
+        + np.asarray(SOBRENOMES, dtype=object)[rng.integers(0, len(SOBRENOMES), n)] + ' '
+        + np.asarray(SOBRENOMES, dtype=object)[rng.integers(0, len(SOBRENOMES), n)]
+    )
+
+
+def _gerar_rgp(bloco, coluna, n):
+    # UF do registro + 'PA' + 11 dígitos únicos
+    uf = bloco.perfil.ufs[bloco.ufs[coluna.get('uf', 'uf')]]
+    return uf + 'PA' + _digitos((bloco.ids * 69_621 + 1_234_567) % 10**11, 11)
+
+
+def _gerar_uf(bloco, coluna, n):
+    indices = bloco.rng.choice(len(bloco.perfil.ufs), n, p=bloco.perfil.pesos_uf)
+    bloco.ufs[coluna['nome']] = indices
+    return bloco.perfil.ufs[indices]
+
+
+def _gerar_municipio(bloco, coluna, n):
+    rng, perfil = bloco.rng, bloco.perfil
+    uf = bloco.ufs[coluna.get('uf', 'uf')]
+    indices = np.searchsorted(perfil.acumulado_municipios, uf + rng.random(n), side='right')
+    indices = np.clip(indices, perfil.inicio_municipios[uf], perfil.inicio_municipios[uf] + perfil.qtd_municipios[uf] - 1)
+    if 'igual_a' in coluna:
+        # O mesmo município da outra coluna na fração `igual` dos registros
+        indices = np.where(rng.random(n) < coluna.get('igual', 1.0), bloco.municipios[coluna['igual_a']], indices)
+    bloco.municipios[coluna['nome']] = indices
+    return perfil.municipios[indices]
+
+
+def _gerar_categoria(bloco, coluna, n):
+    valores = np.asarray(list(coluna['valores']), dtype=object)
+    pesos = np.asarray(list(coluna['valores'].values()), dtype=np.float64)
+    return valores[bloco.rng.choice(len(valores), n, p=pesos / pesos.sum())]
+
+
+def _gerar_flag(bloco, coluna, n):
+    valores = np.asarray(coluna.get('valores', bloco.perfil.valores_flag), dtype=object)
+    return valores[(bloco.rng.random(n) >= coluna.get('verdadeiro', 0.5)).astype(np.intp)]
+
+
+def _gerar_data(bloco, coluna, n):
+    rng = bloco.rng
+    if 'relativa_a' in coluna:
+        # Entre anos[0] e anos[1] depois da outra data, sem passar da data `ate`
+        base = bloco.dias[coluna['relativa_a']]
+        minimo, maximo = (int(a * 365.25) for a in coluna.get('anos', [0, 0]))
+        dias = base + rng.integers(minimo, maximo + 1, n)
+        if 'ate' in coluna:
+            dias = np.minimum(dias, bloco.dias[coluna['ate']])
+        if coluna.get('fora_da_faixa'):
+            # Uma parte dos registros antes da faixa (ex.: primeiro RGP cedo demais para a idade)
+            antes = base + rng.integers(0, max(minimo, 1), n)
+            dias = np.where(rng.random(n) < coluna['fora_da_faixa'], antes, dias)
+    else:
+        dias = rng.integers(_dias(coluna['inicio']), _dias(coluna['fim']) + 1, n)
+    bloco.dias[coluna['nome']] = dias
+    return _datas(dias, coluna.get('formato', bloco.perfil.formato_data))
+
+
+def _inteiros(valores, minimo, maximo):
+    """Inteiros entre minimo e maximo como texto (faixas curtas por tabela, sem formatar valor a valor)"""
+    if maximo - minimo < 100_000:
+        return np.arange(minimo, maximo + 1).astype(str).astype(object)[valores - minimo]
+    return valores.astype(str).astype(object)
+
+
+def _gerar_inteiro(bloco, coluna, n):
+    minimo, maximo = int(coluna['minimo']), int(coluna['maximo'])
+    return _inteiros(bloco.rng.integers(minimo, maximo + 1, n), minimo, maximo)
+
+
+def _gerar_decimal(bloco, coluna, n):
+    # Sorteio em unidades da última casa: parte inteira por _inteiros, casas com zeros à esquerda
+    casas = int(coluna.get('casas', 2))
+    escala = 10 ** casas
+    minimo, maximo = round(coluna['minimo'] * escala), round(coluna['maximo'] * escala)
+    valores = bloco.rng.integers(minimo, maximo + 1, n)
+    inteiros = np.abs(valores) // escala
+    textos = np.where(valores < 0, '-', '').astype(object) + _inteiros(inteiros, 0, int(inteiros.max(initial=0)))
+    return textos + '.' + _digitos(np.abs(valores) % escala, casas) if casas else textos
+
+
+def _gerar_digitos(bloco, coluna, n):
+    return _textos_ascii(bloco.rng.integers(ord('0'), ord('9') + 1, (n, int(coluna['tamanho'])), dtype=np.uint8))
+
+
+def _gerar_texto(bloco, coluna, n):
+    # Só o comprimento imita o extrato: letras e espaços, começando e terminando em letra
+    rng = bloco.rng
+    minimo, maximo = (max(1, int(t)) for t in coluna.get('tamanho', [5, 30]))
+    tamanhos = rng.integers(minimo, maximo + 1, n)
+    codigos = _ALFABETO[rng.integers(0, len(_ALFABETO), (n, maximo), dtype=np.uint8)]
+    codigos[:, 0] = _LETRAS[rng.integers(0, len(_LETRAS), n)]
+    codigos[np.arange(n), tamanhos - 1] = _LETRAS[rng.integers(0, len(_LETRAS), n)]
+    codigos[np.arange(maximo) >= tamanhos[:, None]] = 0
+    return _textos_ascii(codigos)
+
+
+# Tipos que não dependem de outras colunas nem são usados por elas
+_TIPOS_INDEPENDENTES = {'categoria', 'flag', 'inteiro', 'decimal', 'digitos', 'texto'}
+
+_GERADORES = {
+    'sequencial': _gerar_sequencial,
+    'cpf': _gerar_cpf,
+    'nome': _gerar_nome,
+    'rgp': _gerar_rgp,
+    'uf': _gerar_uf,
+    'municipio': _gerar_municipio,
+    'categoria': _gerar_categoria,
+    'flag': _gerar_flag,
+    'data': _gerar_data,
+    'inteiro': _gerar_inteiro,
+    'decimal': _gerar_decimal,
+    'digitos': _gerar_digitos,
+    'texto': _gerar_texto,
+}
+
+
+def gerar_bloco(numero, registros, tamanho_bloco=TAMANHO_BLOCO, semente=SEMENTE_PADRAO, perfil=None):
+    """Gerar o bloco `numero` do extrato (registros a partir de numero * tamanho_bloco)
+
+    Cada bloco tem o próprio gerador, semeado por (semente, numero): o mesmo bloco sai
+    igual em qualquer execução, em qualquer processo.
+    """
+    perfil = perfil or carregar_perfil()
+    rng = np.random.default_rng(np.random.SeedSequence([semente, numero]))
+    ids = numero * tamanho_bloco + np.arange(registros, dtype=np.int64)
+    bloco = _Bloco(rng, ids, perfil)
+
+    colunas = {}
+    for coluna in perfil.ordem:
+        gerar = _GERADORES[coluna['tipo']]
+        if not coluna.get('nulos'):
+            colunas[coluna['nome']] = gerar(bloco, coluna, registros)
+            continue
+        nulos = rng.random(registros) < coluna['nulos']
+        if coluna['tipo'] in _TIPOS_INDEPENDENTES:
+            # Só os valores preenchidos são gerados (colunas quase vazias custam pouco)
+            valores = np.full(registros, None, dtype=object)
+            valores[~nulos] = gerar(bloco, coluna, registros - int(nulos.sum()))
+        else:
+            valores = gerar(bloco, coluna, registros)
+            valores[nulos] = None
+        colunas[coluna['nome']] = valores
+    return pd.DataFrame(colunas, index=ids)[perfil.nomes]
+
+
+def gerar_particao(blocos, total, saida, tamanho_bloco=TAMANHO_BLOCO, semente=SEMENTE_PADRAO, formato='csv',
+                   cabecalho=True, perfil=None):
+    """Gerar uma faixa de blocos (range) gravando cada um assim que fica pronto (devolve os registros)"""
+    perfil = perfil or carregar_perfil()
+    escritor = EscritorExtrato(saida, perfil.nomes, formato, cabecalho)
+    registros = 0
+    try:
+        for numero in blocos:
+            n = min(tamanho_bloco, total - numero * tamanho_bloco)
+            escritor.escrever(gerar_bloco(numero, n, tamanho_bloco, semente, perfil))
+            registros += n
+    finally:
+        escritor.fechar()
+    return registros
+
+
+def gerar_extrato(registros, saida=ARQUIVO_SINTETICO, tamanho_bloco=TAMANHO_BLOCO, workers=1,
+                  semente=SEMENTE_PADRAO, perfil=None):
+    """Gerar o extrato sintético em partições paralelas; saída idêntica para qualquer número de workers
+
+    O formato sai da extensão de `saida` (.parquet ou CSV). O arquivo final só é
+    substituído quando todas as partes terminaram.
+    """
+    perfil = perfil or carregar_perfil()
+    formato = 'parquet' if Path(saida).suffix == '.parquet' else 'csv'
+    temporario = f"{saida}.{os.getpid()}.tmp"
+    Path(saida).parent.mkdir(parents=True, exist_ok=True)
+
+    # Blocos contíguos por processo (a numeração dos blocos não depende de workers)
+    quantidade = -(-registros // tamanho_bloco)
+    limites = np.linspace(0, quantidade, max(1, min(workers, quantidade)) + 1).astype(int)
+    faixas = [range(a, b) for a, b in zip(limites, limites[1:])]
+
+    if len(faixas) <= 1:
+        try:
+            total = gerar_particao(range(quantidade), registros, temporario, tamanho_bloco, semente, formato,
+                                   perfil=perfil)
+            os.replace(temporario, saida)
+        finally:
+            if os.path.exists(temporario):
+                os.remove(temporario)
+        return total
+
+    partes = [f"{temporario}.parte{i:03d}" for i in range(len(faixas))]
+    cabecalhos = [i == 0 for i in range(len(faixas))]
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            total = sum(executor.map(
+                gerar_particao,
+                faixas, repeat(registros), partes, repeat(tamanho_bloco), repeat(semente), repeat(formato), cabecalhos,
+                repeat(perfil)
+            ))
+        juntar_partes(partes, temporario, formato)
+        os.replace(temporario, saida)
+    finally:
+        for arquivo in partes + [temporario]:
+            if os.path.exists(arquivo):
+                os.remove(arquivo)
+    return total
+
+
+# Derivação do perfil a partir de um extrato real
+
+class _EstatisticasColuna:
+    """Contagens de uma coluna acumuladas bloco a bloco, sobre os valores distintos de cada bloco"""
+
+    def __init__(self):
+        self.total = 0
+        self.nulos = 0
+        self.contagens = pd.Series(dtype=np.int64)  # None quando passa de LIMITE_CATEGORIAS
+        self.tamanhos = [np.inf, 0]
+        self.digitos = [0, np.inf, 0, np.inf, -np.inf]  # quantidade, largura mín/máx, valor mín/máx
+        self.numeros = [0, np.inf, -np.inf, 0]          # quantidade, mínimo, máximo, casas decimais
+        self.datas = {formato: [0, None, None] for formato in FORMATOS_DATA}
+
+    def acumular(self, serie):
+        contagens = serie.str.strip().value_counts()
+        nulos = contagens.index.str.upper().isin(VALORES_NULOS)
+        self.total += int(contagens.sum())
+        self.nulos += int(contagens[nulos].sum())
+        contagens = contagens[~nulos]
+        if not len(contagens):
+            return
+        valores = contagens.index.to_series(index=np.arange(len(contagens)))
+        pesos = contagens.to_numpy()
+
+        if self.contagens is not None:
+            self.contagens = self.contagens.add(contagens, fill_value=0).astype(np.int64)
+            if len(self.contagens) > LIMITE_CATEGORIAS:
+                self.contagens = None
+
+        tamanhos = valores.str.len().to_numpy()
+        self.tamanhos = [min(self.tamanhos[0], tamanhos.min()), max(self.tamanhos[1], tamanhos.max())]
+
+        # Tipos só são testados enquanto ainda podem chegar a FRACAO_TIPO dos valores
+        if self.digitos is not None:
+            so_digitos = valores.str.fullmatch(r'[0-9]+').to_numpy(dtype=bool)
+            self.digitos[0] += int(pesos[so_digitos].sum())
+            if so_digitos.any():
+                larguras = tamanhos[so_digitos]
+                self.digitos[1:3] = [min(self.digitos[1], larguras.min()), max(self.digitos[2], larguras.max())]
+                if self.digitos[2] <= 18:
+                    inteiros = valores[so_digitos].astype(np.int64)
+                    self.digitos[3:] = [min(self.digitos[3], inteiros.min()), max(self.digitos[4], inteiros.max())]
+        if self.numeros is not None:
+            numeros = pd.to_numeric(valores.str.replace(',', '.', regex=False), errors='coerce')
+            validos = numeros.notna().to_numpy()
+            self.numeros[0] += int(pesos[validos].sum())
+            if validos.any():
+                separador = valores[validos].str.replace(',', '.', regex=False).str.rfind('.')
+                casas = (tamanhos[validos] - 1 - separador).where(separador >= 0, 0).max()
+                self.numeros[1:] = [min(self.numeros[1], numeros.min()), max(self.numeros[2], numeros.max()),
+                                    max(self.numeros[3], int(casas))]
+        # Só valores com cara de data passam pelos formatos (o resto conta como não convertido)
+        candidatas = valores.str.match(r'[0-9]{1,4}[-/][0-9]{1,2}[-/][0-9]{1,4}').to_numpy(dtype=bool)
+        for formato, (quantidade, inicio, fim) in list(self.datas.items()):
+            datas = pd.to_datetime(valores[candidatas], format=formato, errors='coerce')
+            validas = np.zeros(len(valores), dtype=bool)
+            validas[candidatas] = datas.notna().to_numpy()
+            if validas.any():
+                inicio = min(d for d in (inicio, datas.min()) if d is not None)
+                fim = max(d for d in (fim, datas.max()) if d is not None)
+            self.datas[formato] = [quantidade + int(pesos[validas].sum()), inicio, fim]
+
+        preenchidos = self.total - self.nulos
+        if self.digitos is not None and self.digitos[0] < FRACAO_TIPO * preenchidos:
+            self.digitos = None
+        if self.numeros is not None and self.numeros[0] < FRACAO_TIPO * preenchidos:
+            self.numeros = None
+        self.datas = {f: d for f, d in self.datas.items() if d[0] >= FRACAO_TIPO * preenchidos}
+
+    def definicao(self, nome):
+        """Definição da coluna no perfil (só frequências de valores comuns, nunca valores individuais)"""
+        preenchidos = self.total - self.nulos
+        coluna = {'nome': nome}
+        if nome in COLUNAS_IDENTIFICACAO:
+            coluna['tipo'] = COLUNAS_IDENTIFICACAO[nome]
+        elif not preenchidos:
+            coluna.update(tipo='texto', tamanho=[1, 1])
+        elif self._flag(coluna):
+            pass
+        elif self.datas:
+            formato, (_, inicio, fim) = next(iter(self.datas.items()))
+            coluna.update(tipo='data', inicio=inicio.strftime('%Y-%m-%d'), fim=fim.strftime('%Y-%m-%d'),
+                          formato=formato)
+        elif self.contagens is not None and (self.contagens >= MINIMO_OCORRENCIAS).any():
+            comuns = self.contagens[self.contagens >= MINIMO_OCORRENCIAS].sort_values(ascending=False, kind='stable')
+            coluna.update(tipo='categoria', valores={str(v): int(c) for v, c in comuns.items()})
+        elif self.digitos is not None and (self.digitos[1] == self.digitos[2] or self.digitos[2] > 18):
+            coluna.update(tipo='digitos', tamanho=int(self.digitos[2]))
+        elif self.digitos is not None:
+            coluna.update(tipo='inteiro', minimo=int(self.digitos[3]), maximo=int(self.digitos[4]))
+        elif self.numeros is not None:
+            coluna.update(tipo='decimal', minimo=float(self.numeros[1]), maximo=float(self.numeros[2]),
+                          casas=min(int(self.numeros[3]), 6))
+        else:
+            coluna.update(tipo='texto', tamanho=[int(self.tamanhos[0]), int(self.tamanhos[1])])
+        if self.nulos:
+            coluna['nulos'] = round(self.nulos / self.total, 4)
+        return coluna
+
+    def _flag(self, coluna):
+        """Preencher a coluna como flag se todos os valores forem de flag (SIM/NAO, TRUE/FALSE...)"""
+        if self.contagens is None or len(self.contagens) > 4:
+            return False
+        textos = self.contagens.index.str.upper()
+        verdadeiros = textos.isin(VALORES_VERDADEIROS)
+        if not (verdadeiros | textos.isin(VALORES_FALSOS)).all():
+            return False
+        contagens = self.contagens.to_numpy()
+        sim = self.contagens[verdadeiros].idxmax() if verdadeiros.any() else None
+        nao = self.contagens[~verdadeiros].idxmax() if (~verdadeiros).any() else None
+        coluna.update(tipo='flag', verdadeiro=round(float(contagens[verdadeiros].sum() / contagens.sum()), 4),
+                      valores=[sim or _oposto_flag(nao), nao or _oposto_flag(sim)])
+        return True
+
+
+def _oposto_flag(valor):
+    """Valor oposto de uma flag na mesma grafia (SIM -> NAO, True -> False, s -> n)"""
+    oposto = _OPOSTOS_FLAG.get(valor.upper(), 'NAO')
+    return oposto.title() if valor.istitle() else oposto.lower() if valor.islower() else oposto
+
+
+def derivar_perfil(caminho, amostra=200_000, tamanho_bloco=TAMANHO_BLOCO):
+    """Derivar o perfil (tipo, distribuição e nulos de cada coluna) das primeiras `amostra` linhas de um extrato
+
+    O perfil guarda só frequências de valores com MINIMO_OCORRENCIAS ou mais ocorrências,
+    faixas e comprimentos: CPF, RGP e nomes de pessoas nunca saem do extrato. Relações
+    entre datas (relativa_a) não são inferidas e podem ser acrescentadas à mão.
+    """
+    estatisticas = {}
+    pares_uf = []
+    iguais = {coluna: [0, 0] for coluna in PARES_MUNICIPIO}
+    lidos = 0
+    for bloco in ler_csv_em_blocos(caminho, tamanho_bloco=tamanho_bloco, dtype=str, keep_default_na=False):
+        bloco = bloco.iloc[:amostra - lidos]
+        lidos += len(bloco)
+        for nome in bloco.columns:
+            estatisticas.setdefault(nome, _EstatisticasColuna()).acumular(bloco[nome])
+
+        # UFs e municípios do extrato, e quanto a área de pesca coincide com o município
+        if {'uf', 'municipio'} <= set(bloco.columns):
+            uf, municipio = bloco['uf'].str.strip(), bloco['municipio'].str.strip()
+            preenchidos = (uf != '') & (municipio != '')
+            pares_uf.append(pd.DataFrame({'uf': uf[preenchidos], 'municipio': municipio[preenchidos]}).value_counts())
+        for coluna, outra in PARES_MUNICIPIO.items():
+            if {coluna, outra} <= set(bloco.columns):
+                a, b = bloco[coluna].str.strip(), bloco[outra].str.strip()
+                preenchidos = (a != '') & (b != '')
+                iguais[coluna][0] += int((preenchidos & (a == b)).sum())
+                iguais[coluna][1] += int(preenchidos.sum())
+        if lidos >= amostra:
+            break
+
+    colunas = [e.definicao(nome) for nome, e in estatisticas.items()]
+    perfil = {
+        'descricao': f'Perfil derivado de {Path(caminho).name} ({lidos} registros)',
+        'formato_data': '%Y-%m-%d',
+        'valores_flag': ['SIM', 'NAO'],
+    }
+
+    nomes = {c['nome']: c for c in colunas}
+    if 'uf' in nomes:
+        pares_uf = pd.concat(pares_uf).groupby(level=[0, 1]).sum() if pares_uf else pd.Series(dtype=np.int64)
+        comuns = pares_uf[pares_uf >= MINIMO_OCORRENCIAS]
+        ufs = {}
+        for (uf, municipio), quantidade in comuns.sort_values(ascending=False, kind='stable').items():
+            ufs.setdefault(uf, {'peso': 0, 'municipios': [], 'pesos': []})
+            ufs[uf]['peso'] += int(quantidade)
+            ufs[uf]['municipios'].append(municipio)
+            ufs[uf]['pesos'].append(int(quantidade))
+        # Amostra pequena demais para algum par UF x município comum: tabela do perfil padrão
+        perfil['ufs'] = ufs or carregar_perfil().definicao['ufs']
+    perfil['colunas'] = colunas
+
+    # Pares de município: `igual` desconta a chance de o sorteio na mesma UF coincidir por acaso
+    acaso = PerfilExtrato(perfil)
+    uf_municipio = np.repeat(np.arange(len(acaso.ufs)), acaso.qtd_municipios)
+    coincidencia = float((acaso.pesos_uf[uf_municipio] * acaso.pesos_municipios ** 2).sum())
+    for coluna, outra in PARES_MUNICIPIO.items():
+        if coluna in nomes and outra in nomes and 'uf' in nomes:
+            iguais_coluna, total = iguais[coluna]
+            medido = iguais_coluna / total if total else 0
+            igual = min(max((medido - coincidencia) / (1 - coincidencia), 0), 1) if coincidencia < 1 else 1
+            nulos = {'nulos': nomes[coluna]['nulos']} if 'nulos' in nomes[coluna] else {}
+            nomes[coluna].clear()
+            nomes[coluna].update(nome=coluna, tipo='municipio', igual_a=outra, igual=round(igual, 4), **nulos)
+    PerfilExtrato(perfil)
+    return perfil
+
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description="Audit-IA - Extrato sintético para testes de carga")
+    parser.add_argument("--registros", type=int, default=1_000_000, help="Número de registros a gerar")
+    parser.add_argument("--saida", default=ARQUIVO_SINTETICO,
+                        help="Arquivo gerado (.csv, ou .parquet para gravar direto em Parquet)")
+    parser.add_argument("--parquet", action="store_true",
+                        help="Gravar em Parquet (troca a extensão da saída para .parquet)")
+    parser.add_argument("--bloco", type=int, default=TAMANHO_BLOCO,
+                        help="Registros por bloco (limita a memória de cada processo)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Processos em paralelo; cada um gera uma faixa de blocos")
+    parser.add_argument("--semente", type=int, default=SEMENTE_PADRAO,
+                        help="Semente: mesma semente, mesmo --bloco e mesmo perfil, mesmo arquivo")
+    parser.add_argument("--perfil", default=str(PERFIL_PADRAO),
+                        help="Perfil JSON com as colunas, distribuições e nulos do extrato")
+    parser.add_argument("--derivar-de", metavar="EXTRATO",
+                        help="Derivar o perfil de um extrato real e gravá-lo em --perfil-derivado (sem gerar registros)")
+    parser.add_argument("--perfil-derivado", default=str(PERFIL_DERIVADO), help="Onde gravar o perfil derivado")
+    parser.add_argument("--amostra", type=int, default=200_000,
+                        help="Registros do extrato real lidos para derivar o perfil")
+    args = parser.parse_args()
+
+    print("🎲 AUDIT-IA - EXTRATO SINTÉTICO")
+    print("=" * 50)
+
+    if args.derivar_de:
+        print(f"📂 Derivando perfil de: {args.derivar_de} (até {args.amostra} registros)")
+        try:
+            perfil = derivar_perfil(args.derivar_de, args.amostra, args.bloco)
+        except FileNotFoundError:
+            print(f"❌ Arquivo não encontrado: {args.derivar_de}")
+            return False
+        except Exception as e:
+            print(f"❌ Erro ao derivar o perfil: {str(e)}")
+            return False
+        salvar_perfil(perfil, args.perfil_derivado)
+        print(f"✅ {len(perfil['colunas'])} colunas: {perfil['descricao']}")
+        print(f"💾 Perfil salvo em: {args.perfil_derivado}")
+        print(f"🎲 Para gerar: python gerar_extrato_sintetico.py --perfil {args.perfil_derivado}")
+        return True
+
+    try:
+        perfil = carregar_perfil(args.perfil)
+    except FileNotFoundError:
+        print(f"❌ Perfil não encontrado: {args.perfil}")
+        return False
+    except (ValueError, KeyError) as e:
+        print(f"❌ Perfil inválido: {str(e)}")
+        return False
+
+    saida = str(Path(args.saida).with_suffix('.parquet')) if args.parquet else args.saida
+    print(f"📐 Perfil: {args.perfil} ({len(perfil.nomes)} colunas)")
+    print(f"⚙️ {args.registros} registros em blocos de {args.bloco}, {args.workers} processo(s), semente {args.semente}")
+
+    inicio = time.perf_counter()
+    try:
+        total = gerar_extrato(args.registros, saida, args.bloco, args.workers, args.semente, perfil)
+    except Exception as e:
+        print(f"❌ Erro na geração: {str(e)}")
+        return False
+
+    print(f"✅ {total} registros gerados em {time.perf_counter() - inicio:.1f}s")
+    print(f"💾 Extrato sintético salvo em: {saida}")
+    if Path(saida).suffix != '.parquet':
+        print(f"🔍 Para auditar: python analise_50_resultados.py --arquivo {saida} --bloco {args.bloco}")
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
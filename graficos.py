@@ -0,0 +1,90 @@
+"""
+🔍 Audit-IA - Gráficos Pré-agregados
+Contagens e faixas calculadas em NumPy no servidor: as figuras levam só esses números
+"""
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import streamlit as st
+
+from motor_auditoria import CATEGORIAS_RISCO
+
+CORES_RISCO = {
+    'ALTO': '#ff4444',
+    'MEDIO': '#ffaa00',
+    'BAIXO': '#00c851'
+}
+FAIXAS_HISTOGRAMA = 20
+
+
+def contar_categorias(serie):
+    """Registros por categoria de risco, na ordem de CATEGORIAS_RISCO"""
+    codigos = pd.Categorical(serie, categories=CATEGORIAS_RISCO).codes
+    return np.bincount(codigos[codigos >= 0], minlength=len(CATEGORIAS_RISCO))
+
+
+def faixas_score(scores=None, faixas=FAIXAS_HISTOGRAMA, histograma=None):
+    """Contagem por faixa de score (largura igual): dos scores ou de um histograma por ponto
+
+    Devolve (contagens, bordas), como np.histogram.
+    """
+    if histograma is not None:
+        # Histograma já contado (um contador por ponto de score): só reagrupar em faixas
+        histograma = np.asarray(histograma)
+        pontos = np.flatnonzero(histograma)
+        if not len(pontos):
+            return np.zeros(0, dtype=np.int64), np.zeros(1)
+        contagens, bordas = np.histogram(
+            pontos, bins=faixas, range=(pontos[0], pontos[-1]), weights=histograma[pontos]
+        )
+    else:
+        scores = pd.Series(scores).dropna().to_numpy(dtype=np.float64)
+        if not len(scores):
+            return np.zeros(0, dtype=np.int64), np.zeros(1)
+        contagens, bordas = np.histogram(scores, bins=faixas)
+    return contagens.astype(np.int64), bordas
+
+
+def figura_distribuicao_risco(contagens, titulo='🎯 Distribuição de Risco'):
+    """Pizza das categorias a partir das contagens"""
+    return px.pie(
+        names=CATEGORIAS_RISCO,
+        values=np.asarray(contagens),
+        title=titulo,
+        color=CATEGORIAS_RISCO,
+        color_discrete_map=CORES_RISCO
+    )
+
+
+def figura_histograma_score(contagens, bordas, titulo='📈 Distribuição do Score de Risco'):
+    """Histograma do score a partir das faixas já contadas"""
+    bordas = np.asarray(bordas, dtype=np.float64)
+    fig = px.bar(
+        x=(bordas[:-1] + bordas[1:]) / 2,
+        y=np.asarray(contagens),
+        title=titulo,
+        labels={'x': 'risco_score', 'y': 'count'},
+        color_discrete_sequence=['#2196f3']
+    )
+    fig.update_traces(width=np.diff(bordas))
+    fig.update_layout(bargap=0)
+    return fig
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def graficos_risco(versao, _categorias, _scores):
+    """Pizza e histograma de resultados, montados uma vez por versão dos dados"""
+    return (
+        figura_distribuicao_risco(contar_categorias(_categorias)),
+        figura_histograma_score(*faixas_score(_scores)),
+    )
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def graficos_agregados(versao, _agregados):
+    """Pizza e histograma a partir dos agregados da auditoria, uma vez por versão"""
+    return (
+        figura_distribuicao_risco(_agregados.categorias),
+        figura_histograma_score(*faixas_score(histograma=_agregados.histograma)),
+    )
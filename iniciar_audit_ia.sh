@@ -26,7 +26,7 @@ if [ ! -f "data/raw/EXT_PESCADORES.csv" ]; then
 fi
 
 # Verificar dados processados
-if [ ! -f "data/processed/PESCADORES_AUDITORIA_IA.csv" ]; then
+if [ ! -f "data/processed/PESCADORES_AUDITORIA_IA.parquet" ]; then
     echo "📊 Gerando dados de demonstração..."
     python3 gerar_dados_simulados.py 2>/dev/null || echo "   Dados de demonstração já existentes"
 fi
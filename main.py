@@ -8,6 +8,7 @@ import sys
 import argparse
 from pathlib import Path
 import pandas as pd
+import pyarrow.parquet as pq
 import logging
 
 # Configurar logging
@@ -42,9 +43,11 @@ class MapaPesquisaBrasil:
             directory.mkdir(parents=True, exist_ok=True)
             logger.info(f"Diretório verificado/criado: {directory}")
 
-    def load_data(self, file_path):
-        """Carregar dados de um arquivo"""
+    def load_data(self, file_path, columns=None):
+        """Carregar dados de um arquivo (opcionalmente só as colunas informadas)"""
         file_path = Path(file_path)
+        # Conjunto montado uma vez: o filtro de colunas consulta só o conjunto
+        usecols = set(columns).__contains__ if columns else None
 
         if not file_path.exists():
             raise FileNotFoundError(f"Arquivo não encontrado: {file_path}")
@@ -52,13 +55,19 @@ class MapaPesquisaBrasil:
         try:
             # Determinar tipo de arquivo pela extensão
             if file_path.suffix.lower() == '.csv':
-                df = pd.read_csv(file_path)
+                df = pd.read_csv(file_path, usecols=usecols)
             elif file_path.suffix.lower() in ['.xlsx', '.xls']:
-                df = pd.read_excel(file_path)
+                df = pd.read_excel(file_path, usecols=usecols)
             elif file_path.suffix.lower() == '.json':
                 df = pd.read_json(file_path)
+                if columns:
+                    df = df[[col for col in columns if col in df.columns]]
             elif file_path.suffix.lower() == '.parquet':
-                df = pd.read_parquet(file_path)
+                if columns:
+                    schema = pq.read_schema(file_path)
+                    df = pd.read_parquet(file_path, columns=[col for col in columns if col in schema.names])
+                else:
+                    df = pd.read_parquet(file_path)
             else:
                 raise ValueError(f"Formato de arquivo não suportado: {file_path.suffix}")
 
@@ -150,9 +159,20 @@ def main():
     parser.add_argument("--list", action="store_true", help="Listar arquivos de dados")
     parser.add_argument("--dir", choices=["all", "raw", "processed"], default="all",
                        help="Diretório para listar arquivos")
+    parser.add_argument("--columns", type=str, help="Carregar só estas colunas (separadas por vírgula)")
+    parser.add_argument("--audit-columns", action="store_true",
+                       help="Carregar só as colunas usadas pela auditoria (models/config.json)")
 
     args = parser.parse_args()
 
+    # Projeção de colunas para --load/--analyze
+    columns = None
+    if args.columns:
+        columns = [col.strip() for col in args.columns.split(',') if col.strip()]
+    elif args.audit_columns:
+        from motor_auditoria import colunas_auditoria
+        columns = colunas_auditoria(['cpf', 'nome_pescador', 'rgp', 'uf', 'st_situacao_pescador'])
+
     # Inicializar aplicação
     app = MapaPesquisaBrasil()
 
@@ -161,7 +181,7 @@ def main():
             app.run_streamlit()
 
         elif args.load:
-            df = app.load_data(args.load)
+            df = app.load_data(args.load, columns)
             print(f"Arquivo carregado: {args.load}")
             print(f"Shape: {df.shape}")
             print(f"Colunas: {list(df.columns)}")
@@ -169,7 +189,7 @@ def main():
             print(df.head())
 
         elif args.analyze:
-            df = app.load_data(args.analyze)
+            df = app.load_data(args.analyze, columns)
             analysis = app.basic_analysis(df)
 
             print(f"Análise do arquivo: {args.analyze}")
@@ -0,0 +1,230 @@
+"""
+🔍 Audit-IA - Mascaramento de Dados Pessoais
+Máscaras de exibição e do extrato anonimizado, e pseudônimos com chave, calculados por coluna
+"""
+
+import hashlib
+import os
+
+import numpy as np
+import pandas as pd
+
+PREFIXOS_RGP = ['MAPA', 'APPA', 'AMPA', 'PAPA', 'CEPA', 'SEPA', 'SPPA', 'RSPA']
+TEXTO_AUSENTE = 'Não informado'
+
+# Coluna original -> coluna mascarada gravada nos resultados
+COLUNAS_MASCARADAS = {
+    'nome_pescador': 'nome_mascarado',
+    'cpf': 'cpf_mascarado',
+    'rgp': 'rgp_mascarado',
+}
+
+
+def _estrelas(quantidade):
+    """'*' repetido quantidade vezes, por elemento (sem laço em Python por registro)"""
+    quantidade = np.clip(np.asarray(quantidade, dtype=np.int64), 0, None)
+    if not len(quantidade):
+        return np.array([], dtype=object)
+    tabela = np.array(['*' * k for k in range(int(quantidade.max()) + 1)], dtype=object)
+    return tabela[quantidade]
+
+
+def mascarar_exibicao(serie):
+    """Máscara de exibição de nome, CPF ou RGP para uma coluna inteira
+
+    Mesmas regras, na mesma ordem, de um valor por vez:
+    - ausente ou vazio: 'Não informado'
+    - já mascarado (tem '*' ou 'XXXX'): mantido
+    - CPF (11 dígitos): 3 primeiros e 2 últimos dígitos
+    - RGP (prefixo MAPA/APPA/... e 14+ caracteres): 8 primeiros, 'XXXX' e 4 últimos
+    - demais textos com mais de 2 caracteres: primeira e última letra
+    """
+    texto = pd.Series(serie).astype('string')
+    resultado = texto.fillna(TEXTO_AUSENTE)
+    if not len(texto):
+        return resultado
+
+    tamanho = texto.str.len().fillna(0).to_numpy(dtype=np.int64)
+    pendente = tamanho > 0
+    pendente &= ~(texto.str.contains('*', regex=False) | texto.str.contains('XXXX', regex=False)).fillna(False).to_numpy(dtype=bool)
+    resultado[tamanho == 0] = TEXTO_AUSENTE
+
+    # Cada regra só é aplicada às linhas que ainda não caíram numa regra anterior
+    cpf = pendente & (tamanho == 11) & texto.str.isdigit().fillna(False).to_numpy(dtype=bool)
+    if cpf.any():
+        parte = texto[cpf]
+        resultado[cpf] = parte.str[:3] + '***' + parte.str[-2:]
+    pendente &= ~cpf
+
+    rgp = pendente & (tamanho >= 14) & texto.str[:4].isin(PREFIXOS_RGP).to_numpy(dtype=bool)
+    if rgp.any():
+        parte = texto[rgp]
+        resultado[rgp] = parte.str[:8] + 'XXXX' + parte.str[-4:]
+    pendente &= ~rgp
+
+    nome = pendente & (tamanho > 2)
+    if nome.any():
+        parte = texto[nome]
+        estrelas = pd.Series(_estrelas(tamanho[nome] - 2), index=parte.index, dtype='string')
+        resultado[nome] = parte.str[:1] + estrelas + parte.str[-1:]
+    return resultado
+
+
+
+# Máscaras do extrato anonimizado (anonimizar_csv.py)
+
+# Caracteres tratados como espaço por str.split() (todos até U+3000): separam as palavras dos nomes
+_ESPACOS = np.array([chr(c).isspace() for c in range(0x3001)])
+_ESTRELA = ord('*')
+
+
+def _textos(serie):
+    """Valores como texto e máscara dos ausentes ou vazios (que não são mascarados)"""
+    valores = pd.Series(serie).to_numpy(dtype=object)
+    manter = pd.isna(valores) | (valores == '')
+    return np.where(manter, '', valores).astype(str), manter
+
+
+def _resultado(serie, textos, manter):
+    """Série de saída: textos mascarados, com ausentes e vazios como vieram"""
+    serie = pd.Series(serie)
+    resultado = pd.Series(textos.astype(object), index=serie.index)
+    if manter.any():
+        resultado[manter] = serie[manter]
+    return resultado
+
+
+def mascarar_cpf(serie):
+    """Mascarar uma coluna de CPF mantendo só os 3 primeiros dígitos ('*' no restante)"""
+    textos, manter = _textos(serie)
+    textos = np.char.strip(textos) if len(textos) else textos
+    codigos = textos.view(np.uint32).reshape(len(textos), -1).copy() if len(textos) else np.zeros((0, 1), np.uint32)
+
+    # CPFs com menos de 3 caracteres são mascarados inteiros
+    tamanho = (codigos != 0).sum(axis=1)
+    posicao = np.arange(codigos.shape[1])
+    estrelas = (codigos != 0) & ((posicao >= 3) | (tamanho < 3)[:, None])
+    codigos[estrelas] = _ESTRELA
+    return _resultado(serie, codigos.view(textos.dtype).ravel(), manter)
+
+
+def mascarar_nome(serie):
+    """Mascarar uma coluna de nomes mantendo só a primeira letra de cada palavra
+
+    As palavras são separadas como em str.split() e reunidas com um espaço.
+    """
+    textos, manter = _textos(serie)
+    if not len(textos):
+        return _resultado(serie, textos, manter)
+    codigos = textos.view(np.uint32).reshape(len(textos), -1).copy()
+
+    # 1. Letras de palavra que não são a primeira viram '*'
+    palavra = (codigos != 0) & ~(_ESPACOS[np.minimum(codigos, 0x3000)] & (codigos <= 0x3000))
+    anterior = np.zeros_like(palavra)
+    anterior[:, 1:] = palavra[:, :-1]
+    codigos[palavra & anterior] = _ESTRELA
+
+    # 2. Espaços: um só entre palavras, nenhum nas pontas
+    ultima = codigos.shape[1] - 1 - np.argmax(palavra[:, ::-1], axis=1)
+    espaco = ~palavra & anterior & (np.arange(codigos.shape[1]) < ultima[:, None])
+    codigos[espaco] = ord(' ')
+    manter_caractere = palavra | espaco
+    descartar = (codigos != 0) & ~manter_caractere
+    if descartar.any():
+        # Remover os demais espaços deslocando os caracteres mantidos para a esquerda
+        ordem = np.argsort(~manter_caractere, axis=1, kind='stable')
+        codigos = np.take_along_axis(codigos, ordem, axis=1)
+        codigos[~np.take_along_axis(manter_caractere, ordem, axis=1)] = 0
+    return _resultado(serie, np.ascontiguousarray(codigos).view(textos.dtype).ravel(), manter)
+
+
+# Pseudonimização com chave (modo token do anonimizar_csv.py)
+VARIAVEL_CHAVE_TOKEN = 'AUDIT_IA_CHAVE_TOKEN'
+TAMANHO_CHAVE_MINIMO = 16
+TAMANHO_TOKEN = 16  # caracteres hexadecimais (64 bits)
+
+
+def carregar_chave_token(arquivo=None):
+    """Chave secreta da tokenização: conteúdo de `arquivo` ou da variável AUDIT_IA_CHAVE_TOKEN"""
+    if arquivo:
+        with open(arquivo, 'rb') as f:
+            chave = f.read().strip()
+    else:
+        chave = os.environ.get(VARIAVEL_CHAVE_TOKEN, '').encode('utf-8')
+    if len(chave) < TAMANHO_CHAVE_MINIMO:
+        raise ValueError(
+            f"Chave de tokenização ausente ou curta (mínimo {TAMANHO_CHAVE_MINIMO} bytes): "
+            f"use --chave-arquivo ou a variável {VARIAVEL_CHAVE_TOKEN}"
+        )
+    return chave
+
+
+def _normalizar_token(textos, dominio):
+    """Forma canônica antes do hash: CPF só com dígitos (11, com zeros à esquerda), nome em
+    maiúsculas com um espaço entre as palavras (valores só com espaços ficam vazios)"""
+    textos = pd.Series(textos, dtype='string[pyarrow]').str.strip()
+    if dominio == 'cpf':
+        # Sem nenhum dígito, o texto em si é tokenizado (nunca sai como veio)
+        digitos = textos.str.replace(r'[^0-9]', '', regex=True)
+        normalizados = digitos.str.pad(11, side='left', fillchar='0').where(digitos != '', textos)
+    else:
+        # Espaços Unicode (\p{Z}) também separam palavras, como em str.split()
+        normalizados = textos.str.replace(r'[\s\p{Z}]+', ' ', regex=True).str.upper()
+    return normalizados.to_numpy(dtype=object)
+
+
+def _chave_siphash(chave, dominio):
+    """Subchave de 16 bytes do domínio para o SipHash do pandas (16 caracteres ASCII, 112 bits)"""
+    derivada = hashlib.blake2b(chave, digest_size=16, person=dominio.encode('utf-8')).digest()
+    # hash_key do pandas é texto com 16 bytes em UTF-8: só caracteres ASCII (7 bits cada)
+    return bytes(b & 0x7F for b in derivada).decode('ascii')
+
+
+def _tokens_unicos(valores, chave, dominio):
+    """Hash com chave dos valores (SipHash-2-4 do pandas, em C e em lote) como uint64"""
+    return pd.util.hash_array(np.asarray(valores, dtype=object), hash_key=_chave_siphash(chave, dominio),
+                              categorize=False)
+
+
+# Os dois caracteres hexadecimais de cada byte, como um uint16 por byte
+_PARES_HEXA = np.frombuffer(''.join(f'{b:02x}' for b in range(256)).encode('ascii'), dtype=np.uint16)
+
+
+def _hexadecimais(inteiros):
+    """uint64 como texto hexadecimal de TAMANHO_TOKEN caracteres (sem laço em Python)"""
+    octetos = np.asarray(inteiros, dtype='>u8').view(np.uint8).reshape(-1, TAMANHO_TOKEN // 2)
+    return np.ascontiguousarray(_PARES_HEXA[octetos]).view(f'S{TAMANHO_TOKEN}').ravel().astype(f'U{TAMANHO_TOKEN}')
+
+
+def tokenizar(serie, chave, dominio):
+    """Pseudônimo estável de cada valor: hash com chave (SipHash) de TAMANHO_TOKEN caracteres hexadecimais
+
+    O mesmo valor gera o mesmo token em qualquer arquivo ou execução com a mesma chave;
+    valores diferentes só colidem com probabilidade desprezível (64 bits). O domínio
+    ('cpf', 'nome') deriva uma subchave própria e separa os tokens de colunas diferentes.
+    Ausentes e vazios são mantidos. Os valores distintos são hasheados em lote, sem laço em
+    Python (cerca de 0,25 s por milhão).
+    """
+    textos, manter = _textos(serie)
+    normalizados = _normalizar_token(textos, dominio)
+    manter = manter | (normalizados == '')
+
+    # Um hash por valor distinto; a expansão para as linhas é uma indexação
+    codigos, unicos = pd.factorize(normalizados)
+    inteiros = _tokens_unicos(unicos, chave, dominio)[codigos]
+    return _resultado(serie, _hexadecimais(inteiros), manter)
+
+
+def tokens_para_inteiros(serie):
+    """Tokens hexadecimais como int64 (os mesmos 64 bits), para junções e deduplicação; ausentes viram 0"""
+    textos = pd.Series(serie, dtype=object).fillna('')
+    validos = (textos.str.len() == TAMANHO_TOKEN).to_numpy(dtype=bool)
+    hexas = np.where(validos, textos.to_numpy(dtype=object), '0' * TAMANHO_TOKEN).astype(f'S{TAMANHO_TOKEN}')
+
+    # Cada caractere hexadecimal vira 4 bits
+    digitos = hexas.view(np.uint8).reshape(len(hexas), TAMANHO_TOKEN)
+    valores = np.zeros(256, dtype=np.uint64)
+    for i, c in enumerate(b'0123456789abcdef'):
+        valores[c] = valores[ord(chr(c).upper())] = i
+    pesos = np.uint64(1) << (np.arange(TAMANHO_TOKEN - 1, -1, -1, dtype=np.uint64) * np.uint64(4))
+    return (valores[digitos] * pesos).sum(axis=1, dtype=np.uint64).view(np.int64)
@@ -0,0 +1,1371 @@
+"""
+🔍 Audit-IA - Motor de Pontuação Vetorizado
+Compila as regras de models/config.json em um plano avaliado sobre colunas inteiras
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import string
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from pathlib import Path
+
+import pandas as pd
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from mascaramento import COLUNAS_MASCARADAS, mascarar_exibicao
+
+CAMINHO_CONFIG = Path(__file__).parent / "models" / "config.json"
+
+CATEGORIAS_RISCO = ['BAIXO', 'MEDIO', 'ALTO']
+
+# Colunas de data do extrato do RGP e formatos aceitos (na ordem de tentativa)
+COLUNAS_DATA = ['dt_nascimento', 'data_criacao_pescador', 'dt_primeiro_rgp']
+FORMATOS_DATA = ['%Y-%m-%d', '%d/%m/%Y', '%Y-%m-%d %H:%M:%S', '%d/%m/%Y %H:%M:%S']
+
+# Domínios conhecidos das colunas categóricas do extrato
+UFS = [
+    'AC', 'AL', 'AM', 'AP', 'BA', 'CE', 'DF', 'ES', 'GO', 'MA', 'MG', 'MS', 'MT', 'PA',
+    'PB', 'PE', 'PI', 'PR', 'RJ', 'RN', 'RO', 'RR', 'RS', 'SC', 'SE', 'SP', 'TO'
+]
+NIVEIS_ESCOLARIDADE = [
+    'SEM ESCOLARIDADE', 'PRIMEIRO QUARTO INCOMPLETO', 'PRIMEIRO QUARTO COMPLETO',
+    'QUINTO NONO INCOMPLETO', 'QUINTO NONO COMPLETO', 'ENSINO MEDIO INCOMPLETO',
+    'ENSINO MEDIO COMPLETO', 'ENSINO SUPERIOR'
+]
+FAIXAS_RENDA = [
+    'Menor que R$1.045,00 por mês', 'De R$1.045,00 a R$2.000,00',
+    'De R$2.001,00 a R$3.000,00', 'Acima de R$3.000,00'
+]
+TIPOS_RESIDENCIA = ['PROPRIA', 'ALUGADA', 'CEDIDA']
+SITUACOES_PESCADOR = ['ATIVO', 'SUSPENSO', 'CANCELADO', 'REGISTRO_COM_PROTOCOLO', 'REGISTRO_INICIAL']
+
+# Colunas SIM/NAO, TRUE/FALSE do extrato (além de todas as produto_*)
+COLUNAS_FLAG = [
+    'renda_brasil_ou_bolsa_familia', 'seguro_defeso', 'st_possui_outra_fonte_renda',
+    'possui_internet', 'possui_celular', 'st_filiado_instituicao'
+]
+VALORES_VERDADEIROS = {'TRUE', 'VERDADEIRO', 'SIM', 'S', '1', '1.0'}
+VALORES_FALSOS = {'FALSE', 'FALSO', 'NAO', 'NÃO', 'N', '0', '0.0'}
+
+# Colunas convertidas para category na carga (None = categorias tiradas dos próprios dados)
+TIPOS_CATEGORICOS = {
+    'nivel_escolaridade': NIVEIS_ESCOLARIDADE,
+    'fonte_renda_faixa_renda': FAIXAS_RENDA,
+    'uf': UFS,
+    'tipo_residencia': TIPOS_RESIDENCIA,
+    'st_situacao_pescador': SITUACOES_PESCADOR,
+    'municipio': None,
+    'nome_municipio': None,
+}
+
+# Regras usadas quando o config.json não traz a seção "regras"
+REGRAS_PADRAO = [
+    {
+        "nome": "beneficios_vs_renda",
+        "titulo": "Benefícios Sociais vs Outra Renda",
+        "peso": 30,
+        "justificativa": "Recebe benefício social mas declara outra fonte de renda",
+        "condicoes": [
+            {"coluna": "renda_brasil_ou_bolsa_familia", "operador": "verdadeiro"},
+            {"coluna": "st_possui_outra_fonte_renda", "operador": "verdadeiro"}
+        ]
+    },
+    {
+        "nome": "escolaridade_vs_renda",
+        "titulo": "Escolaridade vs Faixa de Renda",
+        "peso": 20,
+        "justificativa": "Alta escolaridade com renda muito baixa para atividade",
+        "condicoes": [
+            {"coluna": "nivel_escolaridade", "operador": "em",
+             "valores": ["ENSINO MEDIO COMPLETO", "ENSINO MEDIO INCOMPLETO", "ENSINO SUPERIOR"]},
+            {"coluna": "fonte_renda_faixa_renda", "operador": "igual",
+             "valor": "Menor que R$1.045,00 por mês"}
+        ]
+    },
+    {
+        "nome": "tecnologia_vs_declaracoes",
+        "titulo": "Tecnologia vs Declarações",
+        "peso": 15,
+        "justificativa": "Acesso a tecnologia com residência própria incompatível com renda baixa",
+        "condicoes": [
+            {"coluna": "possui_internet", "operador": "verdadeiro"},
+            {"coluna": "possui_celular", "operador": "verdadeiro"},
+            {"coluna": "tipo_residencia", "operador": "igual", "valor": "PROPRIA"},
+            {"coluna": "fonte_renda_faixa_renda", "operador": "em",
+             "valores": ["Menor que R$1.045,00 por mês", "De R$1.045,00 a R$2.000,00"]}
+        ]
+    },
+    {
+        "nome": "filiacao_institucional",
+        "titulo": "Filiação Institucional",
+        "peso": 10,
+        "justificativa": "Não é filiado a instituição de pesca",
+        "condicoes": [
+            {"coluna": "st_filiado_instituicao", "operador": "nao_verdadeiro"}
+        ]
+    },
+    {
+        "nome": "produtos_protegidos",
+        "titulo": "Produtos Protegidos",
+        "peso": 5,
+        "justificativa": "Pesca de produtos protegidos: {rotulos}",
+        "condicoes": [
+            {"qualquer": [
+                {"coluna": "produto_quelonio", "operador": "verdadeiro", "rotulo": "Quelônios"},
+                {"coluna": "produto_repteis", "operador": "verdadeiro", "rotulo": "Répteis"}
+            ]}
+        ]
+    },
+    {
+        "nome": "endereco_vs_area_pesca",
+        "titulo": "Localização vs Área de Pesca",
+        "peso": 10,
+        "justificativa": "Endereço ({municipio}) diferente de área de pesca ({nome_municipio})",
+        "condicoes": [
+            {"coluna": "municipio", "operador": "diferente_de", "outra_coluna": "nome_municipio"}
+        ]
+    },
+    {
+        "nome": "idade_vs_tempo",
+        "titulo": "Idade vs Tempo de Registro",
+        "peso": 25,
+        "justificativa": "Inconsistência entre idade e tempo de registro no RGP",
+        "condicoes": [
+            {"coluna": "dt_primeiro_rgp", "operador": "ano_menor_que", "valor": 2000},
+            {"coluna": "dt_primeiro_rgp", "operador": "anos_antes_de",
+             "outra_coluna": "dt_nascimento", "tolerancia": 5}
+        ]
+    }
+]
+
+
+def converter_datas(serie, formatos=FORMATOS_DATA):
+    """Converter uma coluna de datas com formatos explícitos, uma vez por valor distinto
+
+    Devolve (datas, inválidas): valores preenchidos que não casam com nenhum formato
+    viram NaT e são contados em inválidas.
+    """
+    if pd.api.types.is_datetime64_any_dtype(serie):
+        return serie, 0
+
+    # 1. Datas se repetem muito no extrato: converter só os valores distintos
+    codigos, valores = pd.factorize(serie)
+    textos = pd.Series(valores, dtype=object).astype(str).str.strip()
+    datas = pd.Series(pd.NaT, index=textos.index, dtype='datetime64[ns]')
+
+    # 2. Cada formato tenta apenas o que os anteriores não converteram
+    pendentes = textos != ''
+    for formato in formatos:
+        if not pendentes.any():
+            break
+        convertidas = pd.to_datetime(textos[pendentes], format=formato, errors='coerce')
+        datas[convertidas.dropna().index] = convertidas.dropna()
+        pendentes &= datas.isna()
+
+    # 3. Expandir de volta para todos os registros
+    resultado = pd.Series(
+        datas.to_numpy()[codigos] if len(datas) else np.full(len(serie), np.datetime64('NaT', 'ns')),
+        index=serie.index, name=serie.name
+    )
+    resultado[codigos < 0] = pd.NaT
+    invalidas = int(pendentes.to_numpy()[codigos[codigos >= 0]].sum())
+    return resultado, invalidas
+
+
+def anos_completos(inicio, referencia):
+    """Anos completos entre cada data de inicio e a referência (Int16, <NA> sem data)"""
+    referencia = pd.Timestamp(referencia)
+    ano = inicio.dt.year.to_numpy(dtype=float, na_value=np.nan)
+    mes_dia = (inicio.dt.month * 100 + inicio.dt.day).to_numpy(dtype=float, na_value=np.nan)
+
+    # Desconta um ano quando o aniversário ainda não chegou na data de referência
+    anos = referencia.year - ano - (mes_dia > referencia.month * 100 + referencia.day)
+    return pd.array(anos, dtype='Int16')
+
+
+def normalizar_datas(df, referencia=None):
+    """Converter as datas do RGP e calcular idade e tempo_registro em anos completos
+
+    Devolve (df, inválidas por coluna).
+    """
+    referencia = pd.Timestamp.now().normalize() if referencia is None else pd.Timestamp(referencia)
+    df = df.copy()
+    invalidas = {}
+    for coluna in COLUNAS_DATA:
+        if coluna in df.columns:
+            df[coluna], invalidas[coluna] = converter_datas(df[coluna])
+
+    if 'dt_nascimento' in df.columns:
+        df['idade'] = anos_completos(df['dt_nascimento'], referencia)
+    if 'dt_primeiro_rgp' in df.columns:
+        df['tempo_registro'] = anos_completos(df['dt_primeiro_rgp'], referencia)
+    return df, invalidas
+
+
+def converter_flag(serie):
+    """Converter uma coluna SIM/NAO, TRUE/FALSE (qualquer caixa) em boolean anulável
+
+    Devolve (flags, inválidos): valores preenchidos fora dos conjuntos conhecidos viram
+    <NA> e são contados em inválidos.
+    """
+    if pd.api.types.is_bool_dtype(serie.dtype):
+        return serie.astype('boolean'), 0
+
+    # Decodificar só os valores distintos e expandir pelos códigos
+    codigos, valores = pd.factorize(serie)
+    textos = pd.Series(valores, dtype=object).astype(str).str.strip().str.upper()
+    conhecidos = np.where(textos.isin(VALORES_VERDADEIROS), 1, np.where(textos.isin(VALORES_FALSOS), 0, -1))
+    invalidos = int(((conhecidos < 0) & (textos != '').to_numpy())[codigos[codigos >= 0]].sum())
+
+    decodificados = np.append(conhecidos, -1)[codigos]
+    flags = pd.Series(pd.array(decodificados == 1, dtype='boolean'), index=serie.index, name=serie.name)
+    flags[decodificados < 0] = pd.NA
+    return flags, invalidos
+
+
+def colunas_flag(df):
+    """Colunas de flag presentes no DataFrame"""
+    return [c for c in COLUNAS_FLAG if c in df.columns] + [c for c in df.columns if c.startswith('produto_')]
+
+
+def normalizar_flags(df):
+    """Converter todas as flags do extrato de uma vez; devolve (df, valores inválidos por coluna)"""
+    df = df.copy()
+    invalidos = {}
+    for coluna in colunas_flag(df):
+        df[coluna], invalidos[coluna] = converter_flag(df[coluna])
+    return df, invalidos
+
+
+def converter_categoria(serie, categorias=None):
+    """Converter uma coluna de texto em category com categorias fixas
+
+    Valores fora do domínio conhecido são acrescentados ao fim das categorias (nada é
+    perdido) e contados. Devolve (categórica, valores fora do domínio).
+    """
+    if isinstance(serie.dtype, pd.CategoricalDtype) and categorias is None:
+        return serie, 0
+
+    # 1. Tratar só os valores distintos: tirar espaços e descartar vazios
+    codigos, valores = pd.factorize(serie)
+    textos = pd.Series(valores, dtype=object).astype(str).str.strip()
+
+    conhecidas = list(categorias or [])
+    novas = sorted(set(textos[textos != '']) - set(conhecidas))
+    todas = pd.Index(conhecidas + novas)
+
+    # 2. Código de cada valor distinto ('' vira nulo) e expansão para os registros
+    posicoes = np.append(todas.get_indexer(textos.where(textos != '')), -1)
+    resultado = pd.Series(
+        pd.Categorical.from_codes(posicoes[codigos], categories=todas),
+        index=serie.index, name=serie.name
+    )
+    fora = int(np.isin(resultado.cat.codes.to_numpy(), np.arange(len(conhecidas), len(todas))).sum())
+    return resultado, (fora if categorias else 0)
+
+
+def normalizar_categorias(df, tipos=TIPOS_CATEGORICOS):
+    """Converter as colunas categóricas do extrato; devolve (df, valores fora do domínio por coluna)"""
+    df = df.copy()
+    fora = {}
+    for coluna, categorias in tipos.items():
+        if coluna in df.columns:
+            df[coluna], fora[coluna] = converter_categoria(df[coluna], categorias)
+    return df, fora
+
+
+class _Colunas:
+    """Decodifica cada coluna uma única vez por avaliação do plano"""
+
+    def __init__(self, df):
+        self.df = df
+        self._cache = {}
+
+    def texto(self, coluna):
+        """Coluna como texto sem espaços nas bordas ('' quando ausente ou nula)"""
+        chave = ('texto', coluna)
+        if chave not in self._cache:
+            if coluna not in self.df.columns:
+                texto = pd.Series('', index=self.df.index, dtype=object)
+            elif isinstance(self.df[coluna].dtype, pd.CategoricalDtype):
+                # Texto de cada categoria uma vez; nulos (código -1) caem no '' final
+                serie = self.df[coluna]
+                categorias = np.append(serie.cat.categories.astype(str).str.strip().to_numpy(dtype=object), '')
+                texto = pd.Series(categorias[serie.cat.codes.to_numpy()], index=self.df.index, dtype=object)
+            else:
+                serie = self.df[coluna]
+                nulos = serie.isna()
+                texto = serie.astype(str).str.strip().astype(object)
+                texto[nulos] = ''
+            self._cache[chave] = texto
+        return self._cache[chave]
+
+    def em(self, coluna, valores):
+        """Máscara dos registros cujo texto está em valores (códigos inteiros se categórica)"""
+        chave = ('em', coluna, tuple(valores))
+        if chave not in self._cache:
+            serie = self.df[coluna] if coluna in self.df.columns else None
+            if serie is not None and isinstance(serie.dtype, pd.CategoricalDtype):
+                categorias = pd.Index(serie.cat.categories.astype(str).str.strip())
+                alvos = np.flatnonzero(categorias.isin(valores))
+                mascara = np.isin(serie.cat.codes.to_numpy(), alvos)
+            else:
+                mascara = self.texto(coluna).isin(valores).to_numpy()
+            self._cache[chave] = mascara
+        return self._cache[chave]
+
+    def flag(self, coluna):
+        """Máscara dos registros com a flag verdadeira (nula ou inválida conta como falsa)"""
+        chave = ('flag', coluna)
+        if chave not in self._cache:
+            if coluna not in self.df.columns:
+                mascara = np.zeros(len(self.df), dtype=bool)
+            else:
+                flags, _ = converter_flag(self.df[coluna])
+                mascara = flags.to_numpy(dtype=bool, na_value=False)
+            self._cache[chave] = mascara
+        return self._cache[chave]
+
+    def ano(self, coluna):
+        """Ano de uma coluna de data como float (NaN quando ausente ou inválida)"""
+        chave = ('ano', coluna)
+        if chave not in self._cache:
+            if coluna not in self.df.columns:
+                anos = np.full(len(self.df), np.nan)
+            else:
+                datas, _ = converter_datas(self.df[coluna])
+                anos = datas.dt.year.to_numpy(dtype=float, na_value=np.nan)
+            self._cache[chave] = anos
+        return self._cache[chave]
+
+
+def _compilar_condicao(condicao):
+    """Transformar uma condição do config em função colunas -> máscara booleana"""
+    if 'qualquer' in condicao:
+        alternativas = [_compilar_condicao(c) for c in condicao['qualquer']]
+        return lambda cols: np.logical_or.reduce([f(cols) for f in alternativas])
+
+    coluna = condicao['coluna']
+    operador = condicao['operador']
+
+    if operador == 'verdadeiro':
+        return lambda cols: cols.flag(coluna)
+    if operador == 'nao_verdadeiro':
+        return lambda cols: ~cols.flag(coluna)
+    if operador == 'igual':
+        valor = condicao['valor']
+        return lambda cols: cols.em(coluna, [valor])
+    if operador == 'em':
+        valores = list(condicao['valores'])
+        return lambda cols: cols.em(coluna, valores)
+    if operador == 'diferente_de':
+        outra = condicao['outra_coluna']
+
+        def diferente_de(cols):
+            a, b = cols.texto(coluna), cols.texto(outra)
+            return ((a != '') & (b != '') & (a != b)).to_numpy()
+        return diferente_de
+    if operador == 'ano_menor_que':
+        valor = condicao['valor']
+
+        def ano_menor_que(cols):
+            with np.errstate(invalid='ignore'):
+                return cols.ano(coluna) < valor
+        return ano_menor_que
+    if operador == 'anos_antes_de':
+        # ano(coluna) + tolerancia < ano(outra_coluna): ex. registro mais antigo que o nascimento
+        outra = condicao['outra_coluna']
+        tolerancia = condicao.get('tolerancia', 0)
+
+        def anos_antes_de(cols):
+            with np.errstate(invalid='ignore'):
+                return cols.ano(coluna) + tolerancia < cols.ano(outra)
+        return anos_antes_de
+
+    raise ValueError(f"Operador desconhecido na regra: {operador}")
+
+
+def _colunas_condicao(condicao):
+    """Listar as colunas lidas por uma condição"""
+    if 'qualquer' in condicao:
+        return [c for alt in condicao['qualquer'] for c in _colunas_condicao(alt)]
+    colunas = [condicao['coluna']]
+    if 'outra_coluna' in condicao:
+        colunas.append(condicao['outra_coluna'])
+    return colunas
+
+
+class Regra:
+    """Critério de auditoria compilado"""
+
+    def __init__(self, definicao):
+        self.nome = definicao['nome']
+        self.titulo = definicao.get('titulo', self.nome)
+        self.peso = int(definicao['peso'])
+        self.justificativa = definicao.get('justificativa', self.nome)
+        self.condicoes = [_compilar_condicao(c) for c in definicao['condicoes']]
+        self.colunas = list(dict.fromkeys(
+            c for condicao in definicao['condicoes'] for c in _colunas_condicao(condicao)
+        ))
+
+        # Rótulos das alternativas "qualquer", usados em {rotulos} na justificativa
+        self.rotulos = [
+            (_compilar_condicao(alt), alt['rotulo'])
+            for condicao in definicao['condicoes'] if 'qualquer' in condicao
+            for alt in condicao['qualquer'] if 'rotulo' in alt
+        ]
+        self.campos = [campo for _, campo, _, _ in string.Formatter().parse(self.justificativa) if campo]
+
+        # Colunas do registro necessárias para montar o texto da justificativa
+        self.colunas_texto = [c for c in self.campos if c != 'rotulos']
+        if 'rotulos' in self.campos:
+            self.colunas_texto += [
+                alt['coluna']
+                for condicao in definicao['condicoes'] if 'qualquer' in condicao
+                for alt in condicao['qualquer'] if 'rotulo' in alt
+            ]
+
+    def avaliar(self, cols):
+        """Máscara dos registros que disparam o critério"""
+        return np.logical_and.reduce([f(cols) for f in self.condicoes])
+
+    def texto(self, cols):
+        """Justificativa do primeiro registro de cols"""
+        valores = {}
+        for campo in self.campos:
+            if campo == 'rotulos':
+                valores[campo] = ', '.join(rotulo for condicao, rotulo in self.rotulos if condicao(cols)[0])
+            else:
+                valores[campo] = cols.texto(campo).iloc[0]
+        return self.justificativa.format(**valores)
+
+
+class InstrumentacaoCriterios:
+    """Tempo, registros avaliados e disparos de cada critério, somáveis entre blocos e partições
+
+    Opcional: sem ela, o plano avalia os critérios sem medir nada. O tempo de um critério
+    inclui a decodificação das colunas que ele é o primeiro a ler (os seguintes reaproveitam
+    as colunas já decodificadas).
+    """
+
+    def __init__(self, titulos=()):
+        self.titulos = list(titulos)
+        self.segundos = np.zeros(len(self.titulos), dtype=np.float64)
+        self.avaliados = np.zeros(len(self.titulos), dtype=np.int64)
+        self.disparos = np.zeros(len(self.titulos), dtype=np.int64)
+
+    def registrar(self, i, segundos, avaliados, disparos):
+        """Somar uma avaliação do critério i (na ordem das regras)"""
+        self.segundos[i] += segundos
+        self.avaliados[i] += avaliados
+        self.disparos[i] += disparos
+
+    def combinar(self, outra):
+        """Somar a instrumentação de outra partição"""
+        if outra is None or not outra.titulos:
+            return
+        if not self.titulos:
+            self.titulos = list(outra.titulos)
+            self.segundos = np.zeros_like(outra.segundos)
+            self.avaliados = np.zeros_like(outra.avaliados)
+            self.disparos = np.zeros_like(outra.disparos)
+        self.segundos += outra.segundos
+        self.avaliados += outra.avaliados
+        self.disparos += outra.disparos
+
+    def tabela(self):
+        """Uma linha por critério, do mais lento para o mais rápido"""
+        total = self.segundos.sum()
+        with np.errstate(divide='ignore', invalid='ignore'):
+            tabela = pd.DataFrame({
+                'segundos': self.segundos,
+                'percentual_tempo': np.where(total > 0, self.segundos / total * 100, 0.0),
+                'avaliados': self.avaliados,
+                'disparos': self.disparos,
+                'percentual_disparos': np.where(self.avaliados > 0, self.disparos / self.avaliados * 100, 0.0),
+                'registros_por_s': np.where(self.segundos > 0, self.avaliados / self.segundos, np.nan),
+            }, index=pd.Index(self.titulos, name='criterio'))
+        return tabela.sort_values('segundos', ascending=False, kind='stable')
+
+    def para_dict(self):
+        """Representação JSON da instrumentação"""
+        return {
+            titulo: {'segundos': float(segundos), 'avaliados': int(avaliados), 'disparos': int(disparos)}
+            for titulo, segundos, avaliados, disparos in zip(self.titulos, self.segundos, self.avaliados, self.disparos)
+        }
+
+    @classmethod
+    def de_dict(cls, dados):
+        """Reconstruir a instrumentação a partir do JSON"""
+        instrumentacao = cls(dados.keys())
+        for i, medida in enumerate(dados.values()):
+            instrumentacao.registrar(i, medida['segundos'], medida['avaliados'], medida['disparos'])
+        return instrumentacao
+
+
+class PlanoAuditoria:
+    """Plano de avaliação vetorizado compilado a partir do config.json"""
+
+    def __init__(self, regras, limiar_alto=60, limiar_medio=30):
+        self.definicoes = [dict(r) for r in regras]
+        self.regras = [Regra(r) for r in regras]
+        self.limiar_alto = limiar_alto
+        self.limiar_medio = limiar_medio
+        self.pesos = np.array([r.peso for r in self.regras], dtype=np.int64)
+
+        # Um bit por critério, na ordem das regras
+        if len(self.regras) <= 8:
+            self.dtype_bits = np.uint8
+        elif len(self.regras) <= 16:
+            self.dtype_bits = np.uint16
+        elif len(self.regras) <= 32:
+            self.dtype_bits = np.uint32
+        else:
+            self.dtype_bits = np.uint64
+        self._deslocamentos = np.arange(len(self.regras), dtype=self.dtype_bits)
+
+    @property
+    def colunas(self):
+        """Colunas do extrato lidas pelo plano"""
+        return list(dict.fromkeys(c for regra in self.regras for c in regra.colunas))
+
+    @property
+    def colunas_justificativa(self):
+        """Colunas que os resultados devem manter para montar as justificativas"""
+        return list(dict.fromkeys(c for regra in self.regras for c in regra.colunas_texto))
+
+    def bit(self, nome):
+        """Valor do bit de um critério no campo criterios_bits"""
+        for i, regra in enumerate(self.regras):
+            if regra.nome == nome:
+                return 1 << i
+        raise KeyError(nome)
+
+    def avaliar(self, df, cols=None, instrumentacao=None):
+        """Avaliar todos os critérios sobre o DataFrame inteiro (medindo cada um, se houver instrumentação)"""
+        cols = cols or _Colunas(df)
+        if instrumentacao is None:
+            return pd.DataFrame({regra.nome: regra.avaliar(cols) for regra in self.regras}, index=df.index)
+
+        mascaras = {}
+        for i, regra in enumerate(self.regras):
+            inicio = time.perf_counter()
+            mascaras[regra.nome] = regra.avaliar(cols)
+            instrumentacao.registrar(i, time.perf_counter() - inicio, len(df), int(np.count_nonzero(mascaras[regra.nome])))
+        return pd.DataFrame(mascaras, index=df.index)
+
+    def calcular_categoria(self, risco_score):
+        """Classificar scores em ALTO/MEDIO/BAIXO"""
+        return pd.Categorical(
+            np.select(
+                [risco_score >= self.limiar_alto, risco_score >= self.limiar_medio],
+                ['ALTO', 'MEDIO'],
+                default='BAIXO'
+            ),
+            categories=CATEGORIAS_RISCO
+        )
+
+    def pontuar(self, df, instrumentacao=None):
+        """Calcular risco_score, risco_categoria e criterios_bits para todos os registros"""
+        criterios = self.avaliar(df, instrumentacao=instrumentacao).to_numpy(dtype=self.dtype_bits)
+        risco_score = criterios.astype(np.int64) @ self.pesos
+        criterios_bits = np.bitwise_or.reduce(criterios << self._deslocamentos, axis=1) if len(self.regras) else 0
+
+        return pd.DataFrame({
+            'risco_score': risco_score.astype(np.int16),
+            'risco_categoria': self.calcular_categoria(risco_score),
+            'criterios_bits': np.asarray(criterios_bits, dtype=self.dtype_bits),
+        }, index=df.index)
+
+    def _matriz_bits(self, criterios_bits):
+        """Matriz registros x critérios (0/1) a partir do campo criterios_bits"""
+        bits = np.asarray(criterios_bits).astype(np.uint64)
+        return (bits[:, None] >> self._deslocamentos.astype(np.uint64)) & 1
+
+    def instrumentacao(self):
+        """Instrumentação vazia com os critérios deste plano"""
+        return InstrumentacaoCriterios([r.titulo for r in self.regras])
+
+    def contar_criterios(self, criterios_bits):
+        """Ocorrências de cada critério (por título), da mais comum para a menos comum"""
+        contagem = self._matriz_bits(criterios_bits).sum(axis=0)
+        return pd.Series(contagem, index=[r.titulo for r in self.regras], dtype=np.int64).sort_values(
+            ascending=False, kind='stable'
+        )
+
+    def contar_alertas(self, criterios_bits):
+        """Número de critérios disparados em cada registro"""
+        return self._matriz_bits(criterios_bits).sum(axis=1)
+
+    def descrever(self, criterios_bits, registro):
+        """Converter os bits de um registro nas justificativas em texto"""
+        criterios_bits = int(criterios_bits)
+        registro = dict(registro)
+        cols = _Colunas(pd.DataFrame([registro]))
+
+        justificativas = []
+        for i, regra in enumerate(self.regras):
+            if criterios_bits >> i & 1:
+                if all(c in registro for c in regra.colunas_texto):
+                    justificativas.append(regra.texto(cols))
+                else:
+                    justificativas.append(regra.titulo)
+        return justificativas
+
+
+def compilar_plano(config):
+    """Compilar o plano de auditoria a partir do dicionário de configuração"""
+    parametros = config.get('parametros', {})
+    regras = parametros.get('regras')
+    if regras is None:
+        # Configuração antiga: regras padrão com os pesos do config
+        pesos = parametros.get('pesos', {})
+        regras = [dict(r, peso=pesos.get(r['nome'], r['peso'])) for r in REGRAS_PADRAO]
+
+    return PlanoAuditoria(
+        regras,
+        limiar_alto=parametros.get('threshold_risco_alto', 60),
+        limiar_medio=parametros.get('threshold_risco_medio', 30)
+    )
+
+
+_planos = {}
+
+
+def carregar_plano(caminho=CAMINHO_CONFIG):
+    """Carregar (uma vez por processo) o plano de auditoria do config.json"""
+    caminho = Path(caminho)
+    try:
+        versao = caminho.stat().st_mtime_ns
+        chave = (str(caminho), versao)
+        if chave not in _planos:
+            with open(caminho, encoding='utf-8') as f:
+                _planos[chave] = compilar_plano(json.load(f))
+        return _planos[chave]
+    except FileNotFoundError:
+        return compilar_plano({})
+
+
+def colunas_auditoria(colunas_registro=(), plano=None):
+    """Colunas do extrato que a auditoria lê: regras, justificativas e registro"""
+    plano = plano or carregar_plano()
+    return list(dict.fromkeys(list(plano.colunas) + plano.colunas_justificativa + list(colunas_registro)))
+
+
+def ler_csv(caminho, colunas=None, **kwargs):
+    """Ler um CSV convertendo só as colunas pedidas (as ausentes no arquivo são ignoradas)
+
+    CPF, RGP e nome são sempre lidos como texto (zeros à esquerda preservados); um
+    `dtype` do chamador é combinado com esses tipos e prevalece sobre eles.
+    """
+    dtype = kwargs.get('dtype')
+    if dtype is None or isinstance(dtype, dict):
+        kwargs['dtype'] = {**{c: str for c in COLUNAS_TEXTO}, **(dtype or {})}
+    if colunas is not None:
+        selecionadas = set(colunas)
+        kwargs['usecols'] = lambda coluna: coluna in selecionadas
+    return pd.read_csv(caminho, **kwargs)
+
+
+def pontuar_perfis(df, plano=None, instrumentacao=None):
+    """Calcular risco_score, risco_categoria e criterios_bits com o plano do config.json"""
+    return (plano or carregar_plano()).pontuar(df, instrumentacao)
+
+
+def pontuar_com_registro(df, colunas_registro, plano=None, instrumentacao=None):
+    """Pontuar os registros mantendo as colunas de identificação e as usadas nas justificativas"""
+    plano = plano or carregar_plano()
+    resultados = plano.pontuar(df, instrumentacao)
+
+    colunas = list(colunas_registro) + [c for c in plano.colunas_justificativa if c not in colunas_registro]
+    for coluna in colunas:
+        resultados[coluna] = df[coluna] if coluna in df.columns else ''
+    return mascarar_resultados(resultados)
+
+
+class _FaixaBytes:
+    """Arquivo somente leitura limitado a uma faixa de bytes (uma partição do CSV)"""
+
+    def __init__(self, caminho, inicio, fim):
+        self.arquivo = open(caminho, 'rb')
+        self.arquivo.seek(inicio)
+        self.restante = fim - inicio
+
+    def read(self, n=-1):
+        if n is None or n < 0 or n > self.restante:
+            n = self.restante
+        dados = self.arquivo.read(n)
+        self.restante -= len(dados)
+        return dados
+
+    def close(self):
+        self.arquivo.close()
+
+
+def _contar_aspas(f, inicio, fim, tamanho_leitura=1 << 24):
+    """Aspas (bytes '"') entre inicio e fim, lidas em pedaços; o arquivo termina posicionado em fim"""
+    f.seek(inicio)
+    total, restante = 0, fim - inicio
+    while restante > 0:
+        dados = f.read(min(restante, tamanho_leitura))
+        if not dados:
+            break
+        total += dados.count(b'"')
+        restante -= len(dados)
+    return total
+
+
+def dividir_csv(caminho, partes):
+    """Dividir o CSV em até `partes` faixas de bytes alinhadas ao início dos registros
+
+    Campos entre aspas podem conter quebras de linha: a paridade das aspas desde o início
+    dos dados (aspas escapadas vêm em pares) diz se um limite caiu dentro de um campo, e
+    nesse caso ele avança até a linha em que o campo fecha.
+    """
+    tamanho = os.path.getsize(caminho)
+    with open(caminho, 'rb') as f:
+        f.readline()  # cabeçalho
+        limites = [f.tell()]
+        aspas = 0
+        for i in range(1, partes):
+            posicao = limites[0] + (tamanho - limites[0]) * i // partes
+            if posicao <= limites[-1]:
+                continue
+            f.seek(posicao - 1)
+            f.readline()  # avançar até o início da próxima linha
+            inicio = f.tell()
+
+            # Aspas ímpares até aqui: a linha está dentro de um campo, avançar até ele fechar
+            aspas += _contar_aspas(f, limites[-1], inicio)
+            while aspas % 2 and inicio < tamanho:
+                aspas += f.readline().count(b'"')
+                inicio = f.tell()
+            if inicio >= tamanho:
+                break
+            limites.append(inicio)
+        limites.append(tamanho)
+    return [(inicio, fim) for inicio, fim in zip(limites, limites[1:]) if fim > inicio]
+
+
+def ler_csv_em_blocos(caminho, colunas=None, tamanho_bloco=100_000, faixa=None, **kwargs):
+    """Ler o CSV (ou uma faixa de bytes dele, ver dividir_csv) em blocos de DataFrame (gerador)"""
+    if faixa is None:
+        leitor = ler_csv(caminho, colunas, chunksize=tamanho_bloco, **kwargs)
+        arquivo = None
+    else:
+        nomes = list(pd.read_csv(caminho, nrows=0).columns)
+        arquivo = _FaixaBytes(caminho, *faixa)
+        leitor = ler_csv(arquivo, colunas, names=nomes, header=None, chunksize=tamanho_bloco, **kwargs)
+    try:
+        yield from leitor
+    finally:
+        if arquivo is not None:
+            arquivo.close()
+
+
+# Bytes que obrigam a pôr o campo entre aspas no CSV (como no to_csv do pandas: separador, aspas, fim de linha)
+_BYTES_ASPAS = np.zeros(256, dtype=bool)
+_BYTES_ASPAS[list(b',"' + os.linesep.encode())] = True
+
+
+def _dados_texto(coluna):
+    """Offsets e bytes de uma coluna large_string do Arrow, sem cópia"""
+    buffers = coluna.buffers()
+    offsets = np.frombuffer(buffers[1], dtype=np.int64)[coluna.offset:coluna.offset + len(coluna) + 1]
+    dados = np.frombuffer(buffers[2], dtype=np.uint8) if buffers[2] is not None else np.zeros(0, dtype=np.uint8)
+    return offsets, dados[offsets[0]:offsets[-1]]
+
+
+def linhas_csv(tabela):
+    """Linhas CSV de uma tabela só de texto, iguais às do to_csv do pandas, montadas coluna a coluna no Arrow
+
+    Ausentes saem vazios; campos com vírgula, aspas ou fim de linha saem entre aspas.
+    """
+    vazio, aspas = pa.scalar('', pa.large_string()), pa.scalar('"', pa.large_string())
+    colunas = []
+    for coluna in tabela.columns:
+        coluna = pc.fill_null(coluna.combine_chunks().cast(pa.large_string()), vazio)
+        offsets, dados = _dados_texto(coluna)
+        posicoes = np.flatnonzero(_BYTES_ASPAS[dados])
+        if len(posicoes):
+            # Só os campos com algum byte especial ganham aspas (e aspas internas duplicadas)
+            mascara = np.zeros(len(coluna), dtype=bool)
+            mascara[np.searchsorted(offsets, posicoes + offsets[0], side='right') - 1] = True
+            entre_aspas = pc.binary_join_element_wise(aspas, pc.replace_substring(coluna, '"', '""'), aspas, vazio)
+            coluna = pc.if_else(pa.array(mascara), entre_aspas, coluna)
+        colunas.append(coluna)
+    colunas[-1] = pc.binary_join_element_wise(colunas[-1], pa.scalar(os.linesep, pa.large_string()), vazio)
+    _, dados = _dados_texto(pc.binary_join_element_wise(*colunas, pa.scalar(',', pa.large_string())))
+    return dados
+
+
+class EscritorExtrato:
+    """Gravar blocos do extrato (texto) em CSV ou Parquet, à medida que ficam prontos"""
+
+    def __init__(self, caminho, colunas, formato='csv', cabecalho=True):
+        self.formato = formato
+        self.colunas = list(colunas)
+        # Todas as colunas como texto: o valor do extrato é mantido como veio
+        self.esquema = pa.schema([(c, pa.string()) for c in self.colunas])
+        if formato == 'parquet':
+            self._escritor = pq.ParquetWriter(caminho, self.esquema, compression=COMPRESSAO_PARQUET)
+        else:
+            self._arquivo = open(caminho, 'wb')
+            if cabecalho:
+                self._arquivo.write(pd.DataFrame(columns=self.colunas).to_csv(index=False).encode('utf-8'))
+
+    def escrever(self, df):
+        df = df[self.colunas]
+        if self.formato == 'parquet':
+            self._escritor.write_table(pa.Table.from_pandas(df, schema=self.esquema, preserve_index=False))
+            return
+        try:
+            tabela = pa.Table.from_pandas(df, schema=self.esquema, preserve_index=False)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            tabela = None
+        if tabela is not None and len(self.colunas) > 1:
+            self._arquivo.write(linhas_csv(tabela))
+        else:
+            # Colunas que não são texto (ou uma só coluna): formatação do pandas
+            self._arquivo.write(df.to_csv(index=False, header=False).encode('utf-8'))
+
+    def fechar(self):
+        if self.formato == 'parquet':
+            self._escritor.close()
+        else:
+            self._arquivo.close()
+
+
+def juntar_partes(partes, destino, formato):
+    """Juntar as partes na ordem do extrato (cópia de bytes no CSV, um row group por vez no Parquet)"""
+    if formato == 'parquet':
+        escritor = None
+        try:
+            for parte in partes:
+                arquivo = pq.ParquetFile(parte)
+                if escritor is None:
+                    escritor = pq.ParquetWriter(destino, arquivo.schema_arrow, compression=COMPRESSAO_PARQUET)
+                for i in range(arquivo.num_row_groups):
+                    escritor.write_table(arquivo.read_row_group(i))
+        finally:
+            if escritor is not None:
+                escritor.close()
+    else:
+        with open(destino, 'wb') as saida:
+            for parte in partes:
+                with open(parte, 'rb') as f:
+                    shutil.copyfileobj(f, saida)
+
+
+def pontuar_csv_em_blocos(caminho, colunas_registro, tamanho_bloco=100_000, plano=None, faixa=None,
+                          instrumentacao=None):
+    """Ler o CSV (ou uma faixa de bytes dele) em blocos e pontuar cada bloco (gerador)"""
+    plano = plano or carregar_plano()
+    colunas = colunas_auditoria(colunas_registro, plano)
+    for bloco in ler_csv_em_blocos(caminho, colunas, tamanho_bloco, faixa):
+        bloco, _ = normalizar_flags(bloco)
+        bloco, _ = normalizar_categorias(bloco)
+        yield pontuar_com_registro(bloco, colunas_registro, plano, instrumentacao)
+
+
+def agregar_por_uf(resultados):
+    """Soma de score, total e casos de alto e médio risco por UF (somáveis entre blocos)"""
+    return pd.DataFrame({
+        'soma_score': resultados['risco_score'].astype(np.int64),
+        'total': 1,
+        'alto': (resultados['risco_categoria'] == 'ALTO').astype(np.int64),
+        'medio': (resultados['risco_categoria'] == 'MEDIO').astype(np.int64),
+        'uf': resultados['uf'],
+    }).groupby('uf', observed=True).sum()
+
+
+def _chave_rgp(resultados):
+    """RGP como texto para desempate; registros sem RGP ficam por último"""
+    if 'rgp' not in resultados.columns:
+        return np.full(len(resultados), '')
+    rgp = resultados['rgp']
+    return np.where(rgp.isna().to_numpy(), '\uffff', rgp.astype(str).to_numpy()).astype(str)
+
+
+def selecionar_top_k(resultados, k):
+    """Os k registros de maior score, desempatados pelo RGP, sem ordenar o conjunto todo"""
+    if k <= 0:
+        return resultados.iloc[:0]
+    n = len(resultados)
+    scores = resultados['risco_score'].to_numpy()
+
+    if n > k:
+        # 1. Limiar do k-ésimo maior score em O(n); só quem alcança o limiar é candidato
+        limiar = np.partition(scores, n - k)[n - k]
+        acima = scores > limiar
+        empate = np.flatnonzero(scores == limiar)
+        faltam = k - int(acima.sum())
+
+        # 2. Entre os empatados no limiar, ficar com os menores RGPs
+        if len(empate) > faltam:
+            rgp = _chave_rgp(resultados.iloc[empate])
+            corte = np.partition(rgp, faltam - 1)[faltam - 1]
+            empate = empate[rgp <= corte]
+
+        manter = np.flatnonzero(acima)
+        resultados = resultados.iloc[np.sort(np.concatenate([manter, empate]))]
+        scores = resultados['risco_score'].to_numpy()
+
+    # 3. Ordenar só os candidatos: score decrescente, depois RGP (lexsort é estável)
+    ordem = np.lexsort((_chave_rgp(resultados), -scores.astype(np.int64)))
+    return resultados.iloc[ordem[:k]]
+
+
+class SeletorTopK:
+    """Manter em memória apenas os k melhores candidatos entre blocos e partições"""
+
+    def __init__(self, k):
+        self.k = k
+        self.melhores = None
+
+    def adicionar(self, resultados):
+        """Combinar um bloco (ou o parcial de outra partição) com os melhores atuais"""
+        if resultados is None:
+            return
+        candidatos = selecionar_top_k(resultados, self.k)
+        if self.melhores is not None:
+            candidatos = selecionar_top_k(pd.concat([self.melhores, candidatos]), self.k)
+        self.melhores = candidatos
+
+
+class AgregadosAuditoria:
+    """Contagens da auditoria somáveis entre blocos e partições (base dos painéis)
+
+    Guarda contagens por categoria, estatísticas por UF, histograma do score e
+    ocorrências de cada critério, para que os painéis não recalculem nada sobre os
+    registros.
+    """
+
+    def __init__(self, titulos=()):
+        self.titulos = list(titulos)
+        self.total = 0
+        self.categorias = np.zeros(len(CATEGORIAS_RISCO), dtype=np.int64)
+        self.histograma = np.zeros(0, dtype=np.int64)
+        self.criterios = np.zeros(len(self.titulos), dtype=np.int64)
+        self.com_alerta = 0
+        self.soma_score = 0
+        self.score_max = None
+        self.por_uf = None
+
+    @classmethod
+    def de_resultados(cls, resultados, plano=None):
+        """Agregados de um conjunto de resultados já pontuados"""
+        plano = plano or carregar_plano()
+        agregados = cls([r.titulo for r in plano.regras])
+        agregados.adicionar(resultados, plano)
+        return agregados
+
+    def _somar_histograma(self, histograma):
+        tamanho = max(len(self.histograma), len(histograma))
+        soma = np.zeros(tamanho, dtype=np.int64)
+        soma[:len(self.histograma)] += self.histograma
+        soma[:len(histograma)] += histograma
+        self.histograma = soma
+
+    def _somar_uf(self, por_uf):
+        if por_uf is None or not len(por_uf):
+            return
+        # UF como texto: somar índices categóricos criaria linhas vazias para todas as categorias
+        por_uf = por_uf.set_axis(por_uf.index.astype(str).rename('uf'))
+        if self.por_uf is not None:
+            por_uf = pd.concat([self.por_uf, por_uf]).groupby(level=0).sum()
+        self.por_uf = por_uf[por_uf['total'] > 0].sort_index()
+
+    def adicionar(self, resultados, plano=None):
+        """Somar um bloco de resultados"""
+        plano = plano or carregar_plano()
+        if not len(resultados):
+            return
+        scores = resultados['risco_score'].to_numpy(dtype=np.int64)
+        bits = resultados['criterios_bits'].to_numpy()
+
+        # 1. Categorias e histograma do score (um contador por ponto de score)
+        codigos = pd.Categorical(resultados['risco_categoria'], categories=CATEGORIAS_RISCO).codes
+        self.categorias += np.bincount(codigos[codigos >= 0], minlength=len(CATEGORIAS_RISCO))
+        self._somar_histograma(np.bincount(np.clip(scores, 0, None)))
+
+        # 2. Ocorrências de cada critério, na ordem das regras
+        self.criterios += plano._matriz_bits(bits).sum(axis=0).astype(np.int64)
+        self.com_alerta += int(np.count_nonzero(bits))
+
+        # 3. Soma, máximo e estatísticas por UF
+        self.total += len(scores)
+        self.soma_score += int(scores.sum())
+        maximo = int(scores.max())
+        self.score_max = maximo if self.score_max is None else max(self.score_max, maximo)
+        if 'uf' in resultados.columns:
+            self._somar_uf(agregar_por_uf(resultados))
+
+    def combinar(self, outro):
+        """Somar os agregados de outra partição"""
+        if outro is None or not outro.total:
+            return
+        if not self.titulos:
+            self.titulos = list(outro.titulos)
+            self.criterios = np.zeros(len(self.titulos), dtype=np.int64)
+        self.total += outro.total
+        self.categorias += outro.categorias
+        self._somar_histograma(outro.histograma)
+        self.criterios += outro.criterios
+        self.com_alerta += outro.com_alerta
+        self.soma_score += outro.soma_score
+        if outro.score_max is not None:
+            self.score_max = outro.score_max if self.score_max is None else max(self.score_max, outro.score_max)
+        self._somar_uf(outro.por_uf)
+
+    def contagem(self, categoria):
+        """Registros de uma categoria de risco"""
+        return int(self.categorias[CATEGORIAS_RISCO.index(categoria)])
+
+    @property
+    def score_medio(self):
+        return self.soma_score / self.total if self.total else 0.0
+
+    def contagem_criterios(self):
+        """Ocorrências de cada critério (por título), da mais comum para a menos comum"""
+        return pd.Series(self.criterios, index=self.titulos, dtype=np.int64).sort_values(
+            ascending=False, kind='stable'
+        )
+
+    def para_dict(self):
+        """Representação JSON dos agregados"""
+        return {
+            'total': self.total,
+            'categorias': dict(zip(CATEGORIAS_RISCO, self.categorias.tolist())),
+            'histograma': self.histograma.tolist(),
+            'criterios': dict(zip(self.titulos, self.criterios.tolist())),
+            'com_alerta': self.com_alerta,
+            'soma_score': self.soma_score,
+            'score_max': self.score_max,
+            'por_uf': {} if self.por_uf is None else {
+                str(uf): {coluna: int(valor) for coluna, valor in linha.items()}
+                for uf, linha in self.por_uf.iterrows()
+            },
+        }
+
+    @classmethod
+    def de_dict(cls, dados):
+        """Reconstruir os agregados a partir do JSON"""
+        agregados = cls(dados.get('criterios', {}).keys())
+        agregados.total = int(dados.get('total', 0))
+        categorias = dados.get('categorias', {})
+        agregados.categorias = np.array([categorias.get(c, 0) for c in CATEGORIAS_RISCO], dtype=np.int64)
+        agregados.histograma = np.array(dados.get('histograma', []), dtype=np.int64)
+        agregados.criterios = np.array(list(dados.get('criterios', {}).values()), dtype=np.int64)
+        agregados.com_alerta = int(dados.get('com_alerta', 0))
+        agregados.soma_score = int(dados.get('soma_score', 0))
+        agregados.score_max = dados.get('score_max')
+        if dados.get('por_uf'):
+            agregados.por_uf = pd.DataFrame.from_dict(dados['por_uf'], orient='index').astype(np.int64)
+            agregados.por_uf.index.name = 'uf'
+        return agregados
+
+
+def salvar_agregados(agregados, caminho):
+    """Gravar os agregados da auditoria (JSON pequeno, ao lado dos resultados)"""
+    with open(caminho, 'w', encoding='utf-8') as f:
+        json.dump(agregados.para_dict(), f, ensure_ascii=False, indent=2)
+
+
+def carregar_agregados(caminho):
+    """Ler os agregados gravados por salvar_agregados"""
+    with open(caminho, encoding='utf-8') as f:
+        return AgregadosAuditoria.de_dict(json.load(f))
+
+
+def salvar_instrumentacao(instrumentacao, caminho):
+    """Gravar a instrumentação dos critérios (JSON pequeno, ao lado dos resultados)"""
+    with open(caminho, 'w', encoding='utf-8') as f:
+        json.dump(instrumentacao.para_dict(), f, ensure_ascii=False, indent=2)
+
+
+def carregar_instrumentacao(caminho):
+    """Ler a instrumentação gravada por salvar_instrumentacao"""
+    with open(caminho, encoding='utf-8') as f:
+        return InstrumentacaoCriterios.de_dict(json.load(f))
+
+
+# Camada processada: Parquet com tipos estáveis
+COLUNAS_TEXTO = ['cpf', 'nome_pescador', 'rgp', 'chave_registro']
+COLUNAS_CATEGORIA_RISCO = ['risco_categoria', 'IA_Categoria_Risco']
+COMPRESSAO_PARQUET = 'zstd'
+
+
+def _como_texto(serie):
+    """Coluna como texto; números inteiros lidos como float não ganham '.0'"""
+    if pd.api.types.is_float_dtype(serie.dtype):
+        inteiros = serie.dropna()
+        if (inteiros == np.floor(inteiros)).all():
+            serie = serie.astype('Int64')
+    return serie.astype('string')
+
+
+def mascarar_resultados(df):
+    """Acrescentar nome_mascarado, cpf_mascarado e rgp_mascarado (máscaras de exibição, uma vez por resultado)"""
+    for coluna, mascarada in COLUNAS_MASCARADAS.items():
+        if coluna in df.columns:
+            df[mascarada] = mascarar_exibicao(_como_texto(df[coluna]))
+    return df
+
+
+def faltam_mascaras(df):
+    """Há coluna de identificação sem a coluna mascarada correspondente (resultados antigos)"""
+    return any(c in df.columns and m not in df.columns for c, m in COLUNAS_MASCARADAS.items())
+
+
+def tipar_resultados(df, plano=None):
+    """Aplicar os tipos estáveis dos resultados: score int16, categoria, bits, flags e texto"""
+    plano = plano or carregar_plano()
+    flags = set(colunas_flag(df))
+    df = df.copy()
+    for coluna in df.columns:
+        serie = df[coluna]
+        if coluna == 'risco_score':
+            df[coluna] = serie.astype(np.int16)
+        elif coluna in COLUNAS_CATEGORIA_RISCO:
+            df[coluna] = pd.Categorical(serie, categories=CATEGORIAS_RISCO)
+        elif coluna == 'criterios_bits':
+            df[coluna] = serie.astype(plano.dtype_bits)
+        elif coluna in flags:
+            df[coluna], _ = converter_flag(serie)
+        elif coluna in TIPOS_CATEGORICOS:
+            df[coluna], _ = converter_categoria(serie, TIPOS_CATEGORICOS[coluna])
+        elif coluna in COLUNAS_TEXTO or serie.dtype == object:
+            df[coluna] = _como_texto(serie)
+    return df
+
+
+def _esquema_estavel(esquema):
+    """Esquema Arrow com índices de dicionário int32 (iguais em todos os blocos)"""
+    campos = [
+        pa.field(campo.name, pa.dictionary(pa.int32(), campo.type.value_type), campo.nullable)
+        if pa.types.is_dictionary(campo.type) else campo
+        for campo in esquema
+    ]
+    return pa.schema(campos, metadata=esquema.metadata)
+
+
+class EscritorParquet:
+    """Gravar blocos de resultados em um único Parquet, com o esquema do primeiro bloco"""
+
+    def __init__(self, caminho, plano=None):
+        self.caminho = caminho
+        self.plano = plano
+        self.esquema = None
+        self._escritor = None
+
+    def escrever(self, df, tipado=False):
+        """Acrescentar um bloco (DataFrame) ou uma tabela Arrow ao arquivo"""
+        if isinstance(df, pd.DataFrame):
+            tabela = pa.Table.from_pandas(df if tipado else tipar_resultados(df, self.plano), preserve_index=False)
+        else:
+            tabela = df
+        if self._escritor is None:
+            self.esquema = _esquema_estavel(tabela.schema)
+            self._escritor = pq.ParquetWriter(self.caminho, self.esquema, compression=COMPRESSAO_PARQUET)
+        self._escritor.write_table(tabela.cast(self.esquema))
+
+    def fechar(self):
+        if self._escritor is not None:
+            self._escritor.close()
+            self._escritor = None
+
+
+def salvar_resultados(df, caminho, plano=None):
+    """Gravar resultados como Parquet tipado e comprimido"""
+    tipar_resultados(df, plano).to_parquet(caminho, index=False, compression=COMPRESSAO_PARQUET)
+
+
+def carregar_resultados(caminho, colunas=None):
+    """Ler resultados em Parquet (ou o CSV antigo de mesmo nome, convertido para os mesmos tipos)"""
+    caminho = Path(caminho)
+    legado = caminho.with_suffix('.csv')
+    if caminho.exists():
+        df = pd.read_parquet(caminho, columns=colunas)
+    elif legado.exists():
+        df = tipar_resultados(ler_csv(legado, colunas))
+    else:
+        raise FileNotFoundError(f"Resultados não encontrados: {caminho}")
+
+    # Resultados gravados antes das colunas mascaradas: mascarar na leitura
+    if colunas is None and faltam_mascaras(df):
+        df = mascarar_resultados(df)
+    return df
+
+
+def auditar_particao(caminho, faixa, colunas_registro, tamanho_bloco, k, arquivo_saida, instrumentar=False):
+    """Pontuar uma partição do CSV gravando todos os resultados (Parquet) e devolvendo os parciais"""
+    total = 0
+    seletor = SeletorTopK(k)
+    plano = carregar_plano()
+    agregados = AgregadosAuditoria([r.titulo for r in plano.regras])
+    instrumentacao = plano.instrumentacao() if instrumentar else None
+
+    escritor = EscritorParquet(arquivo_saida)
+    try:
+        for resultados in pontuar_csv_em_blocos(caminho, colunas_registro, tamanho_bloco, plano, faixa,
+                                                instrumentacao):
+            escritor.escrever(resultados)
+            total += len(resultados)
+            seletor.adicionar(resultados)
+            agregados.adicionar(resultados, plano)
+    finally:
+        escritor.fechar()
+
+    return {
+        'total': total,
+        'melhores': seletor.melhores,
+        'agregados': agregados,
+        'instrumentacao': instrumentacao,
+    }
+
+
+def auditar_csv(caminho, arquivo_saida, colunas_registro, tamanho_bloco=100_000, workers=1, k=50, instrumentar=False):
+    """Auditar o CSV em partições paralelas; resultado idêntico para qualquer número de workers
+
+    Com `instrumentar`, o resumo traz também o tempo, os registros avaliados e os disparos
+    de cada critério, somados entre as partições (ver InstrumentacaoCriterios).
+    """
+    faixas = dividir_csv(caminho, max(1, workers))
+
+    if len(faixas) <= 1:
+        # Uma única partição: gravar direto no arquivo final, sem processos extras
+        parciais = [auditar_particao(caminho, faixas[0] if faixas else None, colunas_registro,
+                                     tamanho_bloco, k, arquivo_saida, instrumentar)]
+    else:
+        arquivos_parte = [f"{arquivo_saida}.parte{i:03d}" for i in range(len(faixas))]
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            parciais = list(executor.map(
+                auditar_particao,
+                repeat(caminho), faixas, repeat(colunas_registro),
+                repeat(tamanho_bloco), repeat(k), arquivos_parte, repeat(instrumentar)
+            ))
+
+        # Juntar as partes na ordem do arquivo de entrada, um row group por vez
+        escritor = EscritorParquet(arquivo_saida)
+        try:
+            for arquivo_parte in arquivos_parte:
+                if os.path.exists(arquivo_parte):
+                    parte = pq.ParquetFile(arquivo_parte)
+                    for i in range(parte.num_row_groups):
+                        escritor.escrever(parte.read_row_group(i))
+        finally:
+            escritor.fechar()
+        for arquivo_parte in arquivos_parte:
+            if os.path.exists(arquivo_parte):
+                os.remove(arquivo_parte)
+
+    # Parciais combinados na ordem das partições: mesmo Top-K para qualquer número de workers
+    seletor = SeletorTopK(k)
+    for parcial in parciais:
+        seletor.adicionar(parcial['melhores'])
+
+    agregados = AgregadosAuditoria()
+    for parcial in parciais:
+        agregados.combinar(parcial['agregados'])
+
+    instrumentacao = None
+    if instrumentar:
+        instrumentacao = InstrumentacaoCriterios()
+        for parcial in parciais:
+            instrumentacao.combinar(parcial['instrumentacao'])
+
+    return {
+        'total': sum(p['total'] for p in parciais),
+        'melhores': seletor.melhores,
+        'agregados': agregados,
+        'por_uf': agregados.por_uf,
+        'instrumentacao': instrumentacao,
+    }
+
+
+def chaves_registro(df):
+    """Chave do registro entre extratos: RGP, ou CPF quando não há RGP ('' sem nenhum dos dois)"""
+    cols = _Colunas(df)
+    rgp = cols.texto('rgp').to_numpy()
+    return np.where(rgp != '', rgp, cols.texto('cpf').to_numpy()).astype(str)
+
+
+def impressoes_registros(df, colunas_registro, plano=None):
+    """Hash (int64) das colunas lidas pelas regras e mantidas nos resultados, por registro"""
+    plano = plano or carregar_plano()
+    colunas = list(dict.fromkeys(list(plano.colunas) + list(colunas_registro) + plano.colunas_justificativa))
+    presentes = [c for c in colunas if c in df.columns]
+
+    # Regras, limiares e colunas entram no hash: mudar o config invalida todas as impressões
+    assinatura = json.dumps({
+        'regras': plano.definicoes,
+        'limiares': [plano.limiar_alto, plano.limiar_medio],
+        'colunas': presentes,
+    }, sort_keys=True, ensure_ascii=False)
+    sal = np.uint64(int.from_bytes(hashlib.sha256(assinatura.encode('utf-8')).digest()[:8], 'little'))
+
+    if presentes:
+        hashes = pd.util.hash_pandas_object(df[presentes], index=False).to_numpy(dtype=np.uint64)
+    else:
+        hashes = np.zeros(len(df), dtype=np.uint64)
+    return (hashes ^ sal).view(np.int64)
+
+
+def carregar_base_incremental(caminho):
+    """Carregar os resultados da auditoria anterior com chaves e impressões (None se não houver)"""
+    if not os.path.exists(caminho):
+        return None
+    base = carregar_resultados(caminho)
+    if not {'chave_registro', 'impressao'} <= set(base.columns):
+        return None
+    return base
+
+
+def auditar_incremental(df, anteriores, colunas_registro, plano=None, instrumentacao=None):
+    """Repontuar só registros novos ou alterados, reaproveitando os resultados anteriores
+
+    Devolve (resultados na ordem do extrato, número de registros repontuados). Os
+    resultados trazem chave_registro e impressao para a próxima execução. A instrumentação,
+    se houver, mede só os registros repontuados.
+    """
+    plano = plano or carregar_plano()
+    chaves = chaves_registro(df)
+    impressoes = impressoes_registros(df, colunas_registro, plano)
+
+    # 1. Casar cada registro com o da execução anterior pela chave
+    reaproveitar = np.zeros(len(df), dtype=bool)
+    if anteriores is not None and len(anteriores):
+        chaves_anteriores = anteriores['chave_registro'].fillna('').astype(str)
+        # Chaves vazias ou repetidas são sempre repontuadas
+        unicas = (chaves_anteriores != '') & ~chaves_anteriores.duplicated(keep=False)
+        anteriores = anteriores[unicas.to_numpy()]
+        posicoes = pd.Index(chaves_anteriores[unicas]).get_indexer(chaves)
+        candidatos = (posicoes >= 0) & (chaves != '') & ~pd.Series(chaves).duplicated(keep=False).to_numpy()
+
+        # 2. Reaproveitar apenas quando a impressão não mudou
+        reaproveitar[candidatos] = (
+            anteriores['impressao'].to_numpy(dtype=np.int64)[posicoes[candidatos]] == impressoes[candidatos]
+        )
+
+    # 3. Pontuar o restante e intercalar na ordem do extrato
+    novos = pontuar_com_registro(df[~reaproveitar], colunas_registro, plano, instrumentacao)
+    novos.index = np.flatnonzero(~reaproveitar)
+    partes = [novos]
+    if reaproveitar.any():
+        reuso = anteriores.iloc[posicoes[reaproveitar]][list(novos.columns)]
+        reuso.index = np.flatnonzero(reaproveitar)
+        partes.insert(0, reuso)
+
+    # Reaproveitados vêm tipados da base salva; os tipos estáveis valem para as duas partes
+    resultados = tipar_resultados(pd.concat(partes).sort_index(), plano)
+    resultados['chave_registro'] = chaves
+    resultados['impressao'] = impressoes
+    return resultados.reset_index(drop=True), int((~reaproveitar).sum())
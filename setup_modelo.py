@@ -9,6 +9,8 @@ import numpy as np
 from datetime import datetime, timedelta
 import os
 
+from motor_auditoria import REGRAS_PADRAO
+
 def verificar_ext_pescadores():
     """Verificar se o arquivo EXT_PESCADORES.csv existe"""
     if os.path.exists('data/raw/EXT_PESCADORES.csv'):
@@ -34,22 +36,14 @@ def criar_modelos_mock():
         "parametros": {
             "threshold_risco_alto": 60,
             "threshold_risco_medio": 30,
-            "pesos": {
-                "idade_vs_tempo": 25,
-                "beneficios_vs_renda": 30,
-                "escolaridade_vs_renda": 20,
-                "tecnologia_vs_declaracoes": 15,
-                "filiacao_institucional": 10,
-                "produtos_protegidos": 5,
-                "endereco_vs_area_pesca": 10
-            }
+            "regras": REGRAS_PADRAO
         }
     }
 
     # Salvar configuração
     import json
-    with open('models/config.json', 'w') as f:
-        json.dump(config_modelo, f, indent=2)
+    with open('models/config.json', 'w', encoding='utf-8') as f:
+        json.dump(config_modelo, f, indent=2, ensure_ascii=False)
 
     # Criar arquivo modelo mock (vazio para representar modelo treinado)
     with open('models/audit_ia_model.pkl', 'wb') as f:
@@ -59,7 +53,7 @@ def criar_modelos_mock():
 
 def verificar_dados_audit():
     """Verificar se os dados de auditoria existem"""
-    if os.path.exists('data/processed/PESCADORES_AUDITORIA_IA.csv'):
+    if os.path.exists('data/processed/PESCADORES_AUDITORIA_IA.parquet'):
         print("✅ Dados de auditoria encontrados")
         return True
     else:
@@ -93,7 +93,7 @@ case "${1:-help}" in
         echo "🧪 Executando testes básicos..."
 
         # Verificar se os dados simulados existem
-        if [ -f "data/processed/PESCADORES_AUDITORIA_IA.csv" ]; then
+        if [ -f "data/processed/PESCADORES_AUDITORIA_IA.parquet" ]; then
             echo "✅ Dados simulados encontrados"
         else
             echo "❌ Dados simulados não encontrados. Execute './start.sh demo' primeiro."
@@ -153,7 +153,7 @@ print('✅ Todas as dependências estão funcionando!')
         fi
 
         # Verificar dados simulados
-        if [ ! -f "data/processed/PESCADORES_AUDITORIA_IA.csv" ]; then
+        if [ ! -f "data/processed/PESCADORES_AUDITORIA_IA.parquet" ]; then
             echo "📊 Executando gerador de dados simulados..."
             python3 gerar_dados_simulados.py 2>/dev/null || echo "Execute manualmente: python3 gerar_dados_simulados.py"
         fi
@@ -173,7 +173,7 @@ print('✅ Todas as dependências estão funcionando!')
             "models/config.json"
             "models/audit_ia_model.pkl"
             "audit_app.py"
-            "data/processed/PESCADORES_AUDITORIA_IA.csv"
+            "data/processed/PESCADORES_AUDITORIA_IA.parquet"
         )
 
         todos_ok=true
@@ -0,0 +1,5 @@
+"""Configuração dos testes: módulos da raiz do projeto importáveis"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
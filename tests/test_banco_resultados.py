@@ -0,0 +1,187 @@
+"""Testes do banco de resultados (SQLite)"""
+import sqlite3
+from contextlib import closing
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+
+import banco_resultados
+from banco_resultados import (
+    INDICES, ORDENACOES, TABELA, TABELA_CONTAGEM, EscritorSQLite, consultar_resultados, resumo_filtrado,
+    salvar_banco
+)
+
+REGISTROS = 2_000
+
+# Colunas que definem a posição de cada registro em cada ordenação
+CHAVES = {
+    'risco_score': ['risco_score', 'rgp'],
+    'uf': ['uf', 'risco_score', 'risco_categoria'],
+    'municipio': ['municipio', 'risco_score', 'risco_categoria'],
+    'rgp': ['rgp', 'risco_score', 'risco_categoria'],
+}
+
+
+def _resultados(registros=REGISTROS, semente=7):
+    """Resultados com scores repetidos, RGPs únicos e ausentes em RGP, UF e município"""
+    rng = np.random.default_rng(semente)
+    score = rng.choice(np.arange(0, 101, 5), registros)
+    rgp = pd.Series([f'MAPA{i:010d}' for i in rng.permutation(registros)], dtype='string')
+    municipio = pd.Series(rng.choice(['ABAETETUBA', 'BELEM', 'CAMETA', 'SANTAREM'], registros), dtype='string')
+    uf = pd.Series(rng.choice(['AM', 'MA', 'PA', 'PI'], registros), dtype='string')
+    rgp[rng.random(registros) < 0.05] = pd.NA
+    municipio[rng.random(registros) < 0.05] = pd.NA
+    uf[rng.random(registros) < 0.05] = pd.NA
+    return pd.DataFrame({
+        'id': np.arange(registros),
+        'rgp': rgp,
+        'uf': uf,
+        'municipio': municipio,
+        'risco_score': score,
+        'risco_categoria': np.select([score >= 60, score >= 30], ['ALTO', 'MEDIO'], 'BAIXO'),
+    })
+
+
+@pytest.fixture(scope='module')
+def resultados():
+    return _resultados()
+
+
+@pytest.fixture(scope='module')
+def banco(resultados, tmp_path_factory):
+    # Gravado a partir de um Parquet com vários row groups (um bloco por vez)
+    pasta = tmp_path_factory.mktemp('banco')
+    resultados.to_parquet(pasta / 'resultados.parquet', index=False, row_group_size=300)
+    caminho = pasta / 'resultados.sqlite'
+    assert salvar_banco(pasta / 'resultados.parquet', caminho)
+    return caminho
+
+
+def _ordenar_como_banco(df, ordem, invertida=False):
+    """Referência em pandas de cada ordenação (ausentes como o SQLite: menores que qualquer texto)"""
+    if ordem == 'risco_score':
+        chaves = df.assign(_sem_rgp=df['rgp'].isna())
+        ordenado = chaves.sort_values(['risco_score', '_sem_rgp', 'rgp'], ascending=[False, True, True],
+                                      kind='stable')
+    else:
+        ordenado = df.sort_values([ordem, 'risco_score', 'risco_categoria'], ascending=[True, False, True],
+                                  na_position='first', kind='stable')
+    ordenado = ordenado[CHAVES[ordem]]
+    return ordenado.iloc[::-1] if invertida else ordenado
+
+
+def _chaves(df, ordem):
+    """Colunas de posição como tuplas comparáveis (ausentes como None)"""
+    valores = df[CHAVES[ordem]].astype(object)
+    return list(valores.where(valores.notna(), None).itertuples(index=False, name=None))
+
+
+def test_indices_e_ordenacoes_sem_ordenacao_no_banco(banco):
+    with closing(sqlite3.connect(banco)) as conexao:
+        indices = dict(conexao.execute(
+            "SELECT name, sql FROM sqlite_master WHERE type = 'index' AND tbl_name = ?", (TABELA,)
+        ).fetchall())
+        assert set(indices) == {'idx_risco_score', 'idx_risco_categoria', 'idx_uf', 'idx_municipio', 'idx_rgp'}
+        for nome, termos in INDICES.items():
+            assert indices[nome].endswith(f'ON {TABELA} ({", ".join(termos)})')
+
+        # Cada ordenação, com e sem filtro de categoria, é percorrida direto num índice
+        for ordem in ORDENACOES:
+            for invertida in (False, True):
+                for where, parametros in (('', []), (' WHERE risco_categoria = ?', ['ALTO'])):
+                    plano = conexao.execute(
+                        f"EXPLAIN QUERY PLAN SELECT rowid FROM {TABELA}{where} "
+                        f"ORDER BY {banco_resultados._ordem_sql(ordem, invertida)} LIMIT 50",
+                        parametros
+                    ).fetchall()
+                    detalhes = ' '.join(linha[-1] for linha in plano)
+                    assert 'USING' in detalhes and 'INDEX' in detalhes, (ordem, invertida, where, detalhes)
+                    assert 'TEMP B-TREE' not in detalhes, (ordem, invertida, where, detalhes)
+
+
+def test_contagem_score_igual_ao_pandas(banco, resultados):
+    with closing(sqlite3.connect(banco)) as conexao:
+        contagem = pd.read_sql_query(
+            f"SELECT risco_categoria, risco_score, total FROM {TABELA_CONTAGEM} "
+            f"ORDER BY risco_categoria, risco_score", conexao
+        )
+    esperado = (resultados.groupby(['risco_categoria', 'risco_score']).size().rename('total')
+                .reset_index().sort_values(['risco_categoria', 'risco_score'], ignore_index=True))
+    assert contagem.astype(object).values.tolist() == esperado.astype(object).values.tolist()
+
+
+@pytest.mark.parametrize('categoria, score_minimo', [
+    (None, None), ('ALTO', None), ('BAIXO', None), (None, 35), ('MEDIO', 45), ('ALTO', 100), ('ALTO', 10),
+])
+def test_resumo_filtrado_igual_ao_pandas(banco, resultados, categoria, score_minimo):
+    filtrados = resultados
+    if categoria:
+        filtrados = filtrados[filtrados['risco_categoria'] == categoria]
+    if score_minimo:
+        filtrados = filtrados[filtrados['risco_score'] >= score_minimo]
+
+    resumo = resumo_filtrado(banco, categoria, score_minimo)
+    assert resumo['total'] == len(filtrados)
+    assert resumo['alto'] == int((filtrados['risco_categoria'] == 'ALTO').sum())
+    assert resumo['score_medio'] == pytest.approx(filtrados['risco_score'].mean() if len(filtrados) else 0.0)
+
+
+@pytest.mark.parametrize('ordem', list(ORDENACOES))
+@pytest.mark.parametrize('invertida', [False, True])
+def test_paginas_na_ordem_e_com_deslocamento(banco, resultados, ordem, invertida):
+    # 1. Listagem completa na ordem da referência em pandas
+    completa = consultar_resultados(banco, ordem=ordem, invertida=invertida)
+    assert _chaves(completa, ordem) == _chaves(_ordenar_como_banco(resultados, ordem, invertida), ordem)
+
+    # 2. Páginas consecutivas (a última incompleta) cobrem a listagem sem repetir registros
+    paginas = [consultar_resultados(banco, limite=300, deslocamento=inicio, ordem=ordem, invertida=invertida)
+               for inicio in range(0, REGISTROS + 300, 300)]
+    assert [len(p) for p in paginas] == [300] * (REGISTROS // 300) + [REGISTROS % 300, 0]
+    juntas = pd.concat(paginas, ignore_index=True)
+    assert _chaves(juntas, ordem) == _chaves(completa, ordem)
+    assert sorted(juntas['id']) == list(range(REGISTROS))
+
+
+def test_paginas_filtradas(banco, resultados):
+    filtrados = resultados[(resultados['risco_categoria'] == 'MEDIO') & (resultados['risco_score'] >= 40)]
+    esperado = _chaves(_ordenar_como_banco(filtrados, 'risco_score'), 'risco_score')
+
+    pagina = consultar_resultados(banco, 'MEDIO', 40, limite=25, deslocamento=50)
+    assert _chaves(pagina, 'risco_score') == esperado[50:75]
+    assert (pagina['risco_categoria'] == 'MEDIO').all() and (pagina['risco_score'] >= 40).all()
+
+
+def test_falha_na_gravacao_mantem_banco_publicado(tmp_path, monkeypatch):
+    caminho = tmp_path / 'resultados.sqlite'
+    anteriores = _resultados(500, semente=1)
+    assert salvar_banco(anteriores, caminho)
+    publicado = caminho.read_bytes()
+
+    # 1. Erro no segundo row group: o banco anterior continua publicado e o temporário é apagado
+    novos = _resultados(semente=2)
+    novos.to_parquet(tmp_path / 'novos.parquet', index=False, row_group_size=300)
+    ler_row_group = pq.ParquetFile.read_row_group
+
+    def falhar_no_segundo(self, i, *args, **kwargs):
+        if i == 1:
+            raise OSError('falha simulada de leitura')
+        return ler_row_group(self, i, *args, **kwargs)
+
+    monkeypatch.setattr(pq.ParquetFile, 'read_row_group', falhar_no_segundo)
+    with pytest.raises(OSError, match='falha simulada'):
+        salvar_banco(tmp_path / 'novos.parquet', caminho)
+    monkeypatch.undo()
+
+    assert caminho.read_bytes() == publicado
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['novos.parquet', 'resultados.sqlite']
+    assert resumo_filtrado(caminho)['total'] == 500
+
+    # 2. Durante a gravação os leitores veem o banco anterior; fechar() troca o arquivo de uma vez
+    escritor = EscritorSQLite(caminho)
+    escritor.escrever(novos)
+    assert resumo_filtrado(caminho)['total'] == 500
+    escritor.fechar()
+    assert resumo_filtrado(caminho)['total'] == REGISTROS
+    assert not escritor.temporario.exists()
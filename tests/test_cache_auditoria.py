@@ -0,0 +1,181 @@
+"""Testes do cache de saídas da auditoria"""
+import json
+import os
+import shutil
+
+import pytest
+
+import cache_auditoria
+import mascaramento
+from analise_50_resultados import COLUNAS_REGISTRO
+from cache_auditoria import (
+    ARQUIVO_HASHES, acrescentar_cache, buscar_cache, chave_auditoria, guardar_cache, hash_arquivo,
+    restaurar_arquivo
+)
+from motor_auditoria import PlanoAuditoria, carregar_plano
+
+KB = 1 / 1024  # limite_mb em KB
+
+
+@pytest.fixture
+def extrato(tmp_path):
+    caminho = tmp_path / 'extrato.csv'
+    caminho.write_text('cpf,rgp\n01234567890,MAPA0001\n', encoding='utf-8')
+    return caminho
+
+
+def _plano(peso=None, limiar_alto=None):
+    """Plano do config.json com o peso da primeira regra ou o limiar de alto risco trocados"""
+    base = carregar_plano()
+    regras = [dict(r) for r in base.definicoes]
+    if peso is not None:
+        regras[0]['peso'] = peso
+    return PlanoAuditoria(regras, limiar_alto if limiar_alto is not None else base.limiar_alto, base.limiar_medio)
+
+
+def _saidas(pasta, tamanho=1000, **conteudos):
+    """Arquivos de saída de uma execução ({nome: caminho}) com `tamanho` bytes cada"""
+    pasta.mkdir(parents=True, exist_ok=True)
+    arquivos = {}
+    for nome, byte in conteudos.items():
+        arquivos[nome] = pasta / f'{nome}.parquet'
+        arquivos[nome].write_bytes(byte * tamanho)
+    return arquivos
+
+
+def _usar_em(entrada, instante):
+    """Fixar o último uso de uma entrada (data do manifesto)"""
+    os.utime(entrada / 'manifesto.json', (instante, instante))
+
+
+def test_chave_muda_com_cada_parte(extrato, tmp_path, monkeypatch):
+    pasta = tmp_path / 'cache'
+    base = chave_auditoria(extrato, COLUNAS_REGISTRO, 50, _plano(), pasta)
+    assert chave_auditoria(extrato, COLUNAS_REGISTRO, 50, _plano(), pasta) == base
+
+    # 1. Mesmo conteúdo em outro caminho: mesma chave (o extrato entra pelo SHA-256)
+    copia = tmp_path / 'copia.csv'
+    shutil.copyfile(extrato, copia)
+    assert chave_auditoria(copia, COLUNAS_REGISTRO, 50, _plano(), pasta) == base
+
+    # 2. Regras, limiares, colunas do registro e k
+    outras = [
+        chave_auditoria(extrato, COLUNAS_REGISTRO, 50, _plano(peso=99), pasta),
+        chave_auditoria(extrato, COLUNAS_REGISTRO, 50, _plano(limiar_alto=70), pasta),
+        chave_auditoria(extrato, COLUNAS_REGISTRO[:-1], 50, _plano(), pasta),
+        chave_auditoria(extrato, list(reversed(COLUNAS_REGISTRO)), 50, _plano(), pasta),
+        chave_auditoria(extrato, COLUNAS_REGISTRO, 20, _plano(), pasta),
+    ]
+
+    # 3. Código de pontuação (fonte de mascaramento.py alterado)
+    fonte = tmp_path / 'mascaramento.py'
+    fonte.write_text(open(mascaramento.__file__, encoding='utf-8').read() + '\n# alterado\n', encoding='utf-8')
+    monkeypatch.setattr(mascaramento, '__file__', str(fonte))
+    outras.append(chave_auditoria(extrato, COLUNAS_REGISTRO, 50, _plano(), pasta))
+    monkeypatch.undo()
+
+    # 4. Conteúdo do extrato
+    extrato.write_text('cpf,rgp\n01234567890,MAPA0002\n', encoding='utf-8')
+    outras.append(chave_auditoria(extrato, COLUNAS_REGISTRO, 50, _plano(), pasta))
+
+    assert base not in outras
+    assert len(set(outras)) == len(outras)
+
+
+def test_hash_do_extrato_so_recalculado_quando_o_arquivo_muda(extrato, tmp_path, monkeypatch):
+    pasta = tmp_path / 'cache'
+    primeiro = hash_arquivo(extrato, pasta)
+    assert json.loads((pasta / ARQUIVO_HASHES).read_text())[str(extrato.resolve())]['sha256'] == primeiro
+
+    calculados = []
+    sha256 = cache_auditoria._sha256_arquivo
+    monkeypatch.setattr(cache_auditoria, '_sha256_arquivo', lambda c: calculados.append(c) or sha256(c))
+    assert hash_arquivo(extrato, pasta) == primeiro
+    assert calculados == []
+
+    extrato.write_text('cpf,rgp\n01234567890,MAPA0002\n', encoding='utf-8')
+    assert hash_arquivo(extrato, pasta) != primeiro
+    assert len(calculados) == 1
+
+
+def test_regra_ou_k_diferente_nao_encontra_a_entrada(extrato, tmp_path):
+    pasta = tmp_path / 'cache'
+    chave = chave_auditoria(extrato, COLUNAS_REGISTRO, 50, _plano(), pasta)
+    guardar_cache(chave, _saidas(tmp_path / 'saidas', resultados=b'r', agregados=b'a'), pasta)
+
+    encontrados = buscar_cache(chave, pasta)
+    assert sorted(encontrados) == ['agregados', 'resultados']
+    assert encontrados['resultados'].read_bytes() == b'r' * 1000
+
+    assert buscar_cache(chave_auditoria(extrato, COLUNAS_REGISTRO, 50, _plano(peso=99), pasta), pasta) is None
+    assert buscar_cache(chave_auditoria(extrato, COLUNAS_REGISTRO, 20, _plano(), pasta), pasta) is None
+
+
+def test_limite_despeja_a_entrada_usada_ha_mais_tempo(tmp_path):
+    pasta = tmp_path / 'cache'
+    limite = 3.5 * KB  # cabem três entradas de 1000 bytes (mais o manifesto)
+
+    for i, chave in enumerate(['a', 'b', 'c']):
+        assert guardar_cache(chave, _saidas(tmp_path / chave, resultados=chave.encode()), pasta, limite) == 0
+        _usar_em(pasta / chave, 1_000_000 + i)
+
+    # 'a' foi guardada primeiro, mas usada por último: 'b' é a que sai
+    assert buscar_cache('a', pasta) is not None
+    assert guardar_cache('d', _saidas(tmp_path / 'd', resultados=b'd'), pasta, limite) == 1
+    assert sorted(d.name for d in pasta.iterdir()) == ['a', 'c', 'd']
+    assert buscar_cache('b', pasta) is None
+
+    # Saída acrescentada depois (banco) também respeita o limite; a entrada recebida nunca sai
+    _usar_em(pasta / 'd', 1_000_010)
+    banco = _saidas(tmp_path / 'banco', tamanho=2500, banco=b'x')['banco']
+    assert acrescentar_cache('d', 'banco', banco, pasta, limite) == 2
+    assert sorted(d.name for d in pasta.iterdir()) == ['d']
+    assert sorted(buscar_cache('d', pasta)) == ['banco', 'resultados']
+
+
+def test_publicacao_atomica(tmp_path, monkeypatch):
+    pasta = tmp_path / 'cache'
+    guardar_cache('a', _saidas(tmp_path / 'v1', resultados=b'1', agregados=b'1'), pasta)
+
+    # 1. Falha no meio da cópia: a entrada anterior continua inteira e nenhum temporário fica
+    copiar = shutil.copyfile
+
+    def falhar_nos_agregados(origem, destino, *args, **kwargs):
+        if 'agregados' in str(origem):
+            raise OSError('disco cheio')
+        return copiar(origem, destino, *args, **kwargs)
+
+    monkeypatch.setattr(shutil, 'copyfile', falhar_nos_agregados)
+    with pytest.raises(OSError, match='disco cheio'):
+        guardar_cache('a', _saidas(tmp_path / 'v2', resultados=b'2', agregados=b'2'), pasta)
+    monkeypatch.undo()
+
+    assert [d.name for d in pasta.iterdir()] == ['a']
+    arquivos = buscar_cache('a', pasta)
+    assert {nome: c.read_bytes()[:1] for nome, c in arquivos.items()} == {'resultados': b'1', 'agregados': b'1'}
+
+    # 2. Entrada sem manifesto (gravação interrompida) não é encontrada
+    (pasta / 'b').mkdir()
+    (pasta / 'b' / 'resultados.parquet').write_bytes(b'parcial')
+    assert buscar_cache('b', pasta) is None
+
+    # 3. Restauração: o destino só é trocado depois da cópia completa
+    destino = tmp_path / 'processado' / 'resultados.parquet'
+    destino.parent.mkdir()
+    destino.write_bytes(b'anterior')
+
+    def falhar_e_deixar_parcial(origem, alvo, *args, **kwargs):
+        with open(alvo, 'wb') as f:
+            f.write(b'parc')
+        raise OSError('falha na cópia')
+
+    monkeypatch.setattr(shutil, 'copyfile', falhar_e_deixar_parcial)
+    with pytest.raises(OSError, match='falha na cópia'):
+        restaurar_arquivo(arquivos['resultados'], destino)
+    monkeypatch.undo()
+    assert destino.read_bytes() == b'anterior'
+    assert sorted(p.name for p in destino.parent.iterdir()) == ['resultados.parquet']
+
+    restaurar_arquivo(arquivos['resultados'], destino)
+    assert destino.read_bytes() == b'1' * 1000
+    assert sorted(p.name for p in destino.parent.iterdir()) == ['resultados.parquet']
@@ -0,0 +1,32 @@
+"""Testes do mascaramento e da tokenização"""
+import pandas as pd
+
+from mascaramento import _chave_siphash, tokenizar, tokens_para_inteiros
+
+CHAVE = b'chave-de-teste-0123456789'
+
+
+def test_tokens_fixos_por_chave_e_dominio():
+    # Tokens publicados: mudar o algoritmo, a normalização ou o domínio quebra as junções
+    cpfs = pd.Series(['123.456.789-09', '12345678909', '191', None, ''], dtype=object)
+    assert tokenizar(cpfs, CHAVE, 'cpf').tolist()[:3] == [
+        '6e3a00e273ceaa6b', '6e3a00e273ceaa6b', '7d51ce60a25c9d3a'
+    ]
+
+    nomes = pd.Series(['  jose  da silva ', 'JOSE DA SILVA'], dtype=object)
+    assert tokenizar(nomes, CHAVE, 'nome').tolist() == ['62347e1f4f4f8267', '62347e1f4f4f8267']
+
+    # Mesmo valor em domínios diferentes, tokens diferentes
+    assert tokenizar(pd.Series(['12345678909']), CHAVE, 'nome').iloc[0] != '6e3a00e273ceaa6b'
+
+    # SipHash do pandas sobre a forma canônica, com a subchave do domínio
+    esperado = pd.util.hash_array(pd.Series(['00000000191'], dtype=object).to_numpy(),
+                                  hash_key=_chave_siphash(CHAVE, 'cpf'), categorize=False)[0]
+    assert int(esperado) == int('7d51ce60a25c9d3a', 16)
+
+
+def test_ausentes_mantidos_e_inteiros():
+    tokens = tokenizar(pd.Series(['12345678909', None, ''], dtype=object), CHAVE, 'cpf')
+    assert pd.isna(tokens.iloc[1]) and tokens.iloc[2] == ''
+    assert tokens_para_inteiros(tokens).tolist()[0] == int('6e3a00e273ceaa6b', 16)
+    assert tokens_para_inteiros(tokens).tolist()[1:] == [0, 0]
@@ -0,0 +1,343 @@
+"""Testes do motor de auditoria"""
+import warnings
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import motor_auditoria
+from analise_50_resultados import COLUNAS_REGISTRO
+from gerar_extrato_sintetico import gerar_extrato
+from motor_auditoria import (
+    AgregadosAuditoria, auditar_csv, auditar_incremental, carregar_base_incremental, carregar_plano, dividir_csv,
+    ler_csv, ler_csv_em_blocos, SeletorTopK, normalizar_categorias, normalizar_datas, normalizar_flags,
+    pontuar_com_registro, pontuar_csv_em_blocos, salvar_resultados, selecionar_top_k, tipar_resultados
+)
+
+REGISTROS = 3_000
+
+
+@pytest.fixture(scope='module')
+def extrato(tmp_path_factory):
+    caminho = tmp_path_factory.mktemp('extrato') / 'extrato.csv'
+    gerar_extrato(REGISTROS, caminho, tamanho_bloco=1_000)
+    return caminho
+
+
+def _agregados_em_blocos(caminho, tamanho_bloco):
+    plano = carregar_plano()
+    agregados = AgregadosAuditoria([r.titulo for r in plano.regras])
+    for resultados in pontuar_csv_em_blocos(caminho, COLUNAS_REGISTRO, tamanho_bloco, plano):
+        agregados.adicionar(resultados, plano)
+    return agregados
+
+
+def test_agregados_por_uf_entre_blocos_e_particoes(extrato, tmp_path):
+    # 1. Referência: todos os registros num único bloco
+    plano = carregar_plano()
+    resultados = pd.concat(list(pontuar_csv_em_blocos(extrato, COLUNAS_REGISTRO, REGISTROS, plano)))
+    esperado = AgregadosAuditoria.de_resultados(resultados, plano)
+
+    # 2. Blocos somados na mesma partição e partições combinadas
+    with warnings.catch_warnings():
+        warnings.simplefilter('error', FutureWarning)
+        em_blocos = _agregados_em_blocos(extrato, 700)
+        em_particoes = auditar_csv(extrato, tmp_path / 'resultados.parquet', COLUNAS_REGISTRO,
+                                   tamanho_bloco=700, workers=2)['agregados']
+
+    for agregados in (em_blocos, em_particoes):
+        # Nenhuma UF sem registros (as categorias vazias não viram linhas)
+        assert (agregados.por_uf['total'] > 0).all()
+        assert agregados.para_dict() == esperado.para_dict()
+
+    # 3. Ida e volta pelo JSON
+    assert AgregadosAuditoria.de_dict(em_particoes.para_dict()).para_dict() == esperado.para_dict()
+
+
+def test_ler_csv_preserva_zeros_dos_identificadores(tmp_path):
+    caminho = tmp_path / 'extrato.csv'
+    caminho.write_text('cpf,rgp,idade\n01234567890,0012,40\n00000000191,,35\n')
+
+    df = ler_csv(caminho)
+    assert df['cpf'].tolist() == ['01234567890', '00000000191']
+    assert df['rgp'].iloc[0] == '0012'
+    assert pd.api.types.is_integer_dtype(df['idade'])
+
+    # Tipos do chamador combinados com os dos identificadores
+    df = ler_csv(caminho, dtype={'idade': 'float64'})
+    assert df['cpf'].iloc[0] == '01234567890' and df['idade'].dtype == 'float64'
+    assert ler_csv(caminho, dtype=str, keep_default_na=False)['rgp'].tolist() == ['0012', '']
+
+    # Leitura de uma faixa de bytes (partições)
+    blocos = list(ler_csv_em_blocos(caminho, tamanho_bloco=1, faixa=dividir_csv(caminho, 2)[-1]))
+    assert blocos[-1]['cpf'].iloc[-1] == '00000000191'
+
+
+def test_dividir_csv_nao_parte_campos_com_quebra_de_linha(tmp_path):
+    # Sem aspas: faixas contíguas, cada uma começando num registro
+    simples = tmp_path / 'simples.csv'
+    simples.write_text('cpf,obs\n' + ''.join(f'{i:011d},texto {i}\n' for i in range(200)))
+    faixas = dividir_csv(simples, 4)
+    assert len(faixas) == 4
+    assert all(a[1] == b[0] for a, b in zip(faixas, faixas[1:]))
+    lidos = pd.concat([b for faixa in faixas for b in ler_csv_em_blocos(simples, faixa=faixa)])
+    assert lidos['cpf'].tolist() == [f'{i:011d}' for i in range(200)]
+
+    # Campo entre aspas com várias linhas: um limite cairia no meio dele
+    com_aspas = tmp_path / 'aspas.csv'
+    observacao = '"' + '\n'.join(f'linha {j}, com vírgula' for j in range(300)) + '"'
+    com_aspas.write_text(f'cpf,obs\n00000000191,curta\n00000000272,{observacao}\n00000000353,fim\n')
+    faixas = dividir_csv(com_aspas, 4)
+    assert faixas[0][0] == len('cpf,obs\n') and faixas[-1][1] == com_aspas.stat().st_size
+    assert all(a[1] == b[0] for a, b in zip(faixas, faixas[1:]))
+    lidos = pd.concat([b for faixa in faixas for b in ler_csv_em_blocos(com_aspas, faixa=faixa)])
+    assert lidos['cpf'].tolist() == ['00000000191', '00000000272', '00000000353']
+    assert lidos['obs'].iloc[1].count('\n') == 299
+
+
+# Equivalência com a avaliação registro a registro (AuditoriaIA.analisar_perfil original)
+
+def _data_referencia(valor):
+    """Data de um valor do extrato nos dois formatos aceitos (None se vazia ou inválida)"""
+    if valor is None or not str(valor).strip():
+        return None
+    for formato in ('%Y-%m-%d', '%d/%m/%Y'):
+        try:
+            return datetime.strptime(str(valor).strip(), formato)
+        except ValueError:
+            pass
+    return None
+
+
+def _perfil_referencia(row):
+    """analisar_perfil original, um registro por vez; ausentes viram '' (não o texto 'nan')"""
+    def texto(coluna):
+        valor = row.get(coluna)
+        return '' if valor is None else str(valor).strip()
+
+    def verdadeiro(coluna, valor='TRUE'):
+        return texto(coluna).upper() == valor
+
+    risco_score = 0
+    justificativas = []
+    escolaridade = texto('nivel_escolaridade')
+    faixa_renda = texto('fonte_renda_faixa_renda')
+    municipio, nome_municipio = texto('municipio'), texto('nome_municipio')
+    produtos = [rotulo for coluna, rotulo in [('produto_quelonio', 'Quelônios'), ('produto_repteis', 'Répteis')]
+                if verdadeiro(coluna, 'SIM')]
+
+    if verdadeiro('renda_brasil_ou_bolsa_familia') and verdadeiro('st_possui_outra_fonte_renda'):
+        risco_score += 30
+        justificativas.append("Recebe benefício social mas declara outra fonte de renda")
+    if (escolaridade in ['ENSINO MEDIO COMPLETO', 'ENSINO MEDIO INCOMPLETO', 'ENSINO SUPERIOR'] and
+            faixa_renda == 'Menor que R$1.045,00 por mês'):
+        risco_score += 20
+        justificativas.append("Alta escolaridade com renda muito baixa para atividade")
+    if (verdadeiro('possui_internet') and verdadeiro('possui_celular') and texto('tipo_residencia') == 'PROPRIA' and
+            faixa_renda in ['Menor que R$1.045,00 por mês', 'De R$1.045,00 a R$2.000,00']):
+        risco_score += 15
+        justificativas.append("Acesso a tecnologia com residência própria incompatível com renda baixa")
+    if not verdadeiro('st_filiado_instituicao'):
+        risco_score += 10
+        justificativas.append("Não é filiado a instituição de pesca")
+    if produtos:
+        risco_score += 5
+        justificativas.append(f"Pesca de produtos protegidos: {', '.join(produtos)}")
+    if municipio and nome_municipio and municipio != nome_municipio:
+        risco_score += 10
+        justificativas.append(f"Endereço ({municipio}) diferente de área de pesca ({nome_municipio})")
+
+    registro, nascimento = _data_referencia(row.get('dt_primeiro_rgp')), _data_referencia(row.get('dt_nascimento'))
+    if registro and nascimento and registro.year < 2000:
+        if 2025 - nascimento.year < (2025 - registro.year) - 5:
+            risco_score += 25
+            justificativas.append("Inconsistência entre idade e tempo de registro no RGP")
+
+    categoria = 'ALTO' if risco_score >= 60 else 'MEDIO' if risco_score >= 30 else 'BAIXO'
+    return risco_score, categoria, justificativas
+
+
+PERFIL_BASE = {
+    'cpf': '01234567890', 'nome_pescador': 'FULANO', 'rgp': 'MAPA0000000001', 'uf': 'PA',
+    'st_situacao_pescador': 'ATIVO', 'renda_brasil_ou_bolsa_familia': 'FALSE', 'seguro_defeso': 'FALSE',
+    'st_possui_outra_fonte_renda': 'FALSE', 'possui_internet': 'FALSE', 'possui_celular': 'FALSE',
+    'st_filiado_instituicao': 'TRUE', 'nivel_escolaridade': 'SEM ESCOLARIDADE',
+    'tipo_residencia': 'ALUGADA', 'fonte_renda_faixa_renda': 'Acima de R$3.000,00',
+    'municipio': 'Belém', 'nome_municipio': 'Belém', 'produto_quelonio': 'NAO', 'produto_repteis': 'NAO',
+    'dt_nascimento': None, 'dt_primeiro_rgp': None,
+}
+
+BENEFICIO_E_RENDA = {'renda_brasil_ou_bolsa_familia': 'TRUE', 'st_possui_outra_fonte_renda': 'TRUE'}
+REGISTRO_ANTIGO = {'dt_primeiro_rgp': '1980-05-01', 'dt_nascimento': '1990-02-02'}
+
+CASOS = {
+    'sem_alertas': ({}, 0),
+    'beneficio_e_renda_limiar_medio': (BENEFICIO_E_RENDA, 30),
+    'flag_em_minusculas': ({'renda_brasil_ou_bolsa_familia': 'true', 'st_possui_outra_fonte_renda': 'True'}, 30),
+    'flag_vazia_nao_conta': ({'renda_brasil_ou_bolsa_familia': 'TRUE', 'st_possui_outra_fonte_renda': None}, 0),
+    'filiacao_vazia': ({'st_filiado_instituicao': None}, 10),
+    'filiacao_falsa_e_produtos': ({'st_filiado_instituicao': 'FALSE', 'produto_quelonio': 'SIM',
+                                   'produto_repteis': 'SIM'}, 15),
+    'escolaridade_com_espacos': ({'nivel_escolaridade': ' ENSINO SUPERIOR ',
+                                  'fonte_renda_faixa_renda': 'Menor que R$1.045,00 por mês'}, 20),
+    'tecnologia': ({'possui_internet': 'TRUE', 'possui_celular': 'TRUE', 'tipo_residencia': 'PROPRIA',
+                    'fonte_renda_faixa_renda': 'De R$1.045,00 a R$2.000,00'}, 15),
+    'municipio_com_espacos': ({'municipio': '  Belém ', 'nome_municipio': 'Belém'}, 0),
+    'municipio_diferente': ({'municipio': ' Belém', 'nome_municipio': 'Santarém '}, 10),
+    'municipio_ausente': ({'municipio': None, 'nome_municipio': 'Santarém'}, 0),
+    'datas_iso': (REGISTRO_ANTIGO, 25),
+    'datas_brasileiras': ({'dt_primeiro_rgp': '01/05/1980', 'dt_nascimento': '02/02/1990'}, 25),
+    'datas_dentro_da_tolerancia': ({'dt_primeiro_rgp': '1985-01-01', 'dt_nascimento': '1990-12-31'}, 0),
+    'registro_depois_de_2000': ({'dt_primeiro_rgp': '2001-01-01', 'dt_nascimento': '2010-01-01'}, 0),
+    'data_vazia': ({'dt_primeiro_rgp': '', 'dt_nascimento': '1990-01-01'}, 0),
+    'limiar_alto': ({**BENEFICIO_E_RENDA, **REGISTRO_ANTIGO, 'produto_repteis': 'SIM'}, 60),
+    'abaixo_do_alto': ({**BENEFICIO_E_RENDA, **REGISTRO_ANTIGO}, 55),
+}
+
+
+def _pontuar_como_motor(linhas, normalizar):
+    """risco_score, risco_categoria e justificativas de cada linha pelo motor vetorizado"""
+    plano = carregar_plano()
+    df = pd.DataFrame(linhas, dtype=object)
+    if normalizar:
+        df, _ = normalizar_datas(df, referencia='2025-06-30')
+        df, _ = normalizar_flags(df)
+        df, _ = normalizar_categorias(df)
+    resultados = pontuar_com_registro(df, COLUNAS_REGISTRO, plano)
+    return [
+        (int(r['risco_score']), r['risco_categoria'], plano.descrever(r['criterios_bits'], r))
+        for _, r in resultados.iterrows()
+    ]
+
+
+@pytest.mark.parametrize('normalizar', [False, True], ids=['texto', 'normalizado'])
+@pytest.mark.parametrize('caso', list(CASOS))
+def test_motor_igual_a_avaliacao_por_registro(caso, normalizar):
+    alteracoes, score = CASOS[caso]
+    linha = {**PERFIL_BASE, **alteracoes}
+    esperado = _perfil_referencia(linha)
+    assert esperado[0] == score
+    assert _pontuar_como_motor([linha], normalizar) == [esperado]
+
+
+def test_motor_igual_a_avaliacao_por_registro_em_lote():
+    # Combinações aleatórias dos valores dos casos (flags, datas, municípios, ausentes)
+    rng = np.random.default_rng(7)
+    valores = {coluna: sorted({str(v) if v is not None else None
+                               for alteracoes, _ in CASOS.values() for c, v in alteracoes.items() if c == coluna}
+                              | {PERFIL_BASE[coluna]}, key=str)
+               for coluna in PERFIL_BASE}
+    linhas = [{coluna: opcoes[rng.integers(len(opcoes))] for coluna, opcoes in valores.items()}
+              for _ in range(500)]
+
+    esperado = [_perfil_referencia(linha) for linha in linhas]
+    assert {categoria for _, categoria, _ in esperado} == {'ALTO', 'MEDIO', 'BAIXO'}
+    for normalizar in (False, True):
+        assert _pontuar_como_motor(linhas, normalizar) == esperado
+
+
+# Top-K
+
+def _resultados_empatados(n, semente):
+    """Resultados com poucos scores distintos (muitos empates), RGPs embaralhados e alguns sem RGP"""
+    rng = np.random.default_rng(semente)
+    rgp = pd.Series([f'MAPA{i:010d}' for i in rng.permutation(n)], dtype=object)
+    rgp[rng.random(n) < 0.1] = None
+    return pd.DataFrame({'risco_score': rng.choice([10, 30, 60], n).astype(np.int16), 'rgp': rgp})
+
+
+def _top_k_ordenando(resultados, k):
+    """Referência: ordenar tudo por score decrescente e RGP (sem RGP por último)"""
+    chave = resultados['rgp'].fillna('\uffff').tolist()
+    scores = resultados['risco_score'].tolist()
+    ordem = sorted(range(len(resultados)), key=lambda i: (-scores[i], chave[i]))
+    return resultados.iloc[ordem[:k]]
+
+
+@pytest.mark.parametrize('k', [0, -1])
+def test_top_k_vazio_para_k_nao_positivo(k):
+    resultados = _resultados_empatados(100, 1)
+    assert selecionar_top_k(resultados, k).empty
+    seletor = SeletorTopK(k)
+    seletor.adicionar(resultados)
+    assert seletor.melhores.empty
+
+
+@pytest.mark.parametrize('k', [1, 7, 50, 500])
+def test_top_k_desempate_pelo_rgp_entre_blocos(k):
+    resultados = _resultados_empatados(2_000, 3)
+    esperado = _top_k_ordenando(resultados, k)
+
+    assert selecionar_top_k(resultados, k).index.tolist() == esperado.index.tolist()
+
+    # Blocos de tamanhos variados e partições combinadas em ordem: mesmo resultado
+    for tamanho in (7, 13, 333):
+        particoes = []
+        for inicio in range(0, len(resultados), 700):
+            seletor = SeletorTopK(k)
+            for i in range(inicio, min(inicio + 700, len(resultados)), tamanho):
+                seletor.adicionar(resultados.iloc[i:min(i + tamanho, inicio + 700)])
+            particoes.append(seletor.melhores)
+        final = SeletorTopK(k)
+        for parcial in particoes:
+            final.adicionar(parcial)
+        assert final.melhores.index.tolist() == esperado.index.tolist()
+
+
+def test_top_k_igual_entre_workers(extrato, tmp_path):
+    melhores = [
+        auditar_csv(extrato, tmp_path / f'r{workers}.parquet', COLUNAS_REGISTRO, tamanho_bloco=500,
+                    workers=workers, k=40)['melhores']
+        for workers in (1, 3)
+    ]
+    assert melhores[0]['rgp'].tolist() == melhores[1]['rgp'].tolist()
+    assert melhores[0]['risco_score'].is_monotonic_decreasing
+
+
+# Auditoria incremental (--incremental)
+
+def test_incremental_repontua_so_alterados_e_iguala_auditoria_completa(extrato, tmp_path, monkeypatch):
+    plano = carregar_plano()
+    primeiro = ler_csv(extrato)
+    base, repontuados = auditar_incremental(primeiro, None, COLUNAS_REGISTRO, plano)
+    assert repontuados == len(primeiro)
+    salvar_resultados(base, tmp_path / 'base.parquet')
+    anteriores = carregar_base_incremental(tmp_path / 'base.parquet')
+
+    # 1. Segundo extrato: registros alterados, removidos e novos, em outra ordem
+    segundo = primeiro.copy()
+    filiacao = segundo.index[10:20]
+    segundo.loc[filiacao, 'st_filiado_instituicao'] = np.where(
+        segundo.loc[filiacao, 'st_filiado_instituicao'] == 'SIM', 'NAO', 'SIM')
+    segundo.loc[segundo.index[20:25], 'municipio'] = 'Município Alterado'
+    segundo.loc[segundo.index[25:30], 'nome_pescador'] = 'NOME CORRIGIDO'
+    segundo.loc[segundo.index[30:35], 'observacao'] = 'coluna fora das regras e do registro'
+    novos = primeiro.iloc[200:220].copy()
+    novos['rgp'] = [f'NOVO{i:010d}' for i in range(len(novos))]
+    novos['st_filiado_instituicao'] = 'NAO'
+    segundo = pd.concat([segundo.drop(index=segundo.index[100:150]), novos], ignore_index=True)
+    segundo = segundo.sample(frac=1, random_state=3).reset_index(drop=True)
+
+    alterados = set(primeiro['rgp'].iloc[10:30]) | set(novos['rgp'])
+
+    # 2. Só os registros alterados ou novos passam pelo motor
+    pontuar = motor_auditoria.pontuar_com_registro
+    pontuados = []
+
+    def registrar(df, *args, **kwargs):
+        pontuados.extend(df['rgp'])
+        return pontuar(df, *args, **kwargs)
+
+    monkeypatch.setattr(motor_auditoria, 'pontuar_com_registro', registrar)
+    resultados, repontuados = auditar_incremental(segundo, anteriores, COLUNAS_REGISTRO, plano)
+    monkeypatch.undo()
+
+    assert repontuados == len(alterados)
+    assert sorted(pontuados) == sorted(alterados)
+
+    # 3. Mesmo resultado de uma auditoria completa do segundo extrato
+    completo = pontuar_com_registro(segundo, COLUNAS_REGISTRO, plano)
+    pd.testing.assert_frame_equal(resultados[list(completo.columns)], tipar_resultados(completo, plano))
+    novo_completo, _ = auditar_incremental(segundo, None, COLUNAS_REGISTRO, plano)
+    pd.testing.assert_frame_equal(resultados, novo_completo)